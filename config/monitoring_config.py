@@ -25,6 +25,7 @@ LOG_FILES = {
     "training": LOGS_DIR / "{time:YYYY-MM-DD}_training.log",
     "prediction": LOGS_DIR / "{time:YYYY-MM-DD}_prediction.log",
     "retraining": LOGS_DIR / "{time:YYYY-MM-DD}_retraining.log",
+    "monitoring": LOGS_DIR / "{time:YYYY-MM-DD}_monitoring.log",
 }
 
 # Configurações do Prometheus
@@ -62,5 +63,179 @@ BUSINESS_CONFIG = {
     }
 }
 
-# Criar diretórios se não existirem
-LOGS_DIR.mkdir(exist_ok=True)
+# Configurações de predição em lote
+PREDICTION_CONFIG = {
+    # Reprocessa apenas clientes novos/alterados desde a última execução
+    "incremental": os.getenv("PREDICAO_INCREMENTAL", "false").lower() == "true",
+    # Fingerprints por cliente (hash das features + versão do modelo)
+    "fingerprints_path": BASE_DIR / "outputs" / "predicoes_fingerprints.csv",
+    # Modelo usado na predição: "principal" ou "compacto"
+    "modelo": os.getenv("PREDICAO_MODELO", "principal"),
+    "modelos": {
+        "principal": BASE_DIR / "models" / "pipeline_modelo_treinado.joblib",
+        "compacto": BASE_DIR / "models" / "pipeline_modelo_compacto.joblib",
+    },
+}
+
+# Configurações de treinamento
+TRAINING_CONFIG = {
+    # Semente da divisão treino-teste (fixa para permitir reuso do cache entre execuções)
+    "random_state": int(os.getenv("TRAINING_RANDOM_STATE", "42")),
+    # Cache em disco das etapas de pré-processamento do pipeline
+    "cache_ativo": os.getenv("TRAINING_CACHE", "true").lower() == "true",
+    "cache_dir": Path(os.getenv("TRAINING_CACHE_DIR", str(BASE_DIR / "cache" / "pipeline"))),
+    # Política do conjunto de treino: "todos", "janela" ou "reservatorio"
+    "politica_dados": os.getenv("TRAINING_DATA_POLICY", "todos"),
+    "janela_linhas": int(os.getenv("TRAINING_WINDOW_ROWS", "50000")),
+    "janela_dias": int(os.getenv("TRAINING_WINDOW_DAYS")) if os.getenv("TRAINING_WINDOW_DAYS") else None,
+    "coluna_tempo": os.getenv("TRAINING_TIME_COLUMN", "data_ingestao"),
+    "tamanho_amostra": int(os.getenv("TRAINING_SAMPLE_SIZE", "50000")),
+    "tamanho_lote_leitura": 100_000,
+    # Imputação numérica: "knn" (KNNImputer força bruta) ou "arvore" (KD-Tree em blocos)
+    "imputacao": os.getenv("TRAINING_IMPUTATION", "knn"),
+    "imputacao_max_referencia": int(os.getenv("TRAINING_IMPUTATION_MAX_REF", "200000")),
+    # Modo de baixa memória: float32 + poda de colunas sem variância antes do SMOTE
+    "baixa_memoria": os.getenv("TRAINING_LOW_MEMORY", "false").lower() == "true",
+    # Poda adicional por importância (SelectFromModel) no modo de baixa memória
+    "poda_importancia": os.getenv("TRAINING_IMPORTANCE_PRUNING", "false").lower() == "true",
+    # Busca de hiperparâmetros do RandomForest por successive halving
+    "busca_hiperparametros": os.getenv("TRAINING_HYPERPARAM_SEARCH", "false").lower() == "true",
+    # Recurso da busca: "n_samples" (subamostras crescentes) ou "arvores" (n_estimators crescente)
+    "busca_recurso": os.getenv("TRAINING_SEARCH_RESOURCE", "n_samples"),
+    "busca_candidatos": int(os.getenv("TRAINING_SEARCH_CANDIDATES", "24")),
+    "busca_fator": int(os.getenv("TRAINING_SEARCH_FACTOR", "3")),
+    # Intervalos de confiança bootstrap das métricas de validação (0 desativa)
+    "bootstrap_reamostragens": int(os.getenv("TRAINING_BOOTSTRAP_RESAMPLES", "2000")),
+    "bootstrap_nivel": float(os.getenv("TRAINING_BOOTSTRAP_LEVEL", "0.95")),
+    # Modelo compacto (aluno) gerado junto com o pipeline principal
+    "modelo_compacto": os.getenv("TRAINING_COMPACT_MODEL", "false").lower() == "true",
+    # Método: "destilacao" (regressor nas probabilidades do professor) ou "poda" (subconjunto de árvores)
+    "compacto_metodo": os.getenv("TRAINING_COMPACT_METHOD", "destilacao"),
+    "compacto_arvores": int(os.getenv("TRAINING_COMPACT_TREES", "50")),
+    "compacto_profundidade": int(os.getenv("TRAINING_COMPACT_DEPTH", "10")),
+}
+
+# Armazém append-only dos dados de treino (partições Parquet + índice de hashes)
+DATA_STORE_CONFIG = {
+    # Fonte dos dados de treino: "csv" (data/raw/dados_treino.csv) ou "armazem"
+    "fonte": os.getenv("TRAINING_DATA_SOURCE", "csv"),
+    "diretorio": BASE_DIR / "data" / "store",
+    # Versão do dataset usada no treino (None = mais recente)
+    "versao": int(os.getenv("TRAINING_DATA_VERSION")) if os.getenv("TRAINING_DATA_VERSION") else None,
+}
+
+# Configurações de retreinamento
+RETRAINING_CONFIG = {
+    # Fração das árvores mais antigas substituídas por árvores ajustadas nos dados novos
+    "fracao_substituicao": float(os.getenv("RETRAINING_REPLACE_FRACTION", "0.2")),
+    # Linhas do histórico (amostra de reservatório) usadas como doadoras ao reajustar a imputação
+    "doadores_imputacao": int(os.getenv("RETRAINING_IMPUTATION_DONORS", "20000")),
+    # Reservatório persistente dos doadores, atualizado a cada lote ingerido
+    "diretorio_doadores": Path(os.getenv("RETRAINING_DONORS_DIR", str(BASE_DIR / "data" / "doadores"))),
+}
+
+# Monitoramento online (rótulos reais juntados às predições servidas)
+ONLINE_MONITORING_CONFIG = {
+    # Tamanho da janela deslizante de predições rotuladas
+    "janela": int(os.getenv("ONLINE_MONITORING_WINDOW", "10000")),
+    # Faixas de score do histograma usado na AUC aproximada
+    "n_faixas": int(os.getenv("ONLINE_MONITORING_BINS", "200")),
+    "estado_path": BASE_DIR / "outputs" / "monitoramento_online.npz",
+    "tamanho_lote": 50_000,
+}
+
+# Registro local de modelos e snapshots de predição (endereçado por conteúdo)
+REGISTRY_CONFIG = {
+    "ativo": os.getenv("MODEL_REGISTRY", "true").lower() == "true",
+    "diretorio": Path(os.getenv("MODEL_REGISTRY_DIR", str(BASE_DIR / "registry"))),
+}
+
+# API
+API_CONFIG = {
+    # Token exigido no header X-Admin-Token pelos endpoints /admin (sem token = endpoints desativados)
+    "admin_token": os.getenv("API_ADMIN_TOKEN"),
+    # previsao_churn dos endpoints /churn com o limiar ajustado do modelo (padrão: risco > 0.5)
+    "limiar_ajustado": os.getenv("API_USE_TUNED_THRESHOLD", "false").lower() == "true",
+}
+
+# Shadow scoring na API (modelo desafiante pontuado fora do caminho da requisição)
+SHADOW_CONFIG = {
+    "ativo": os.getenv("SHADOW_ENABLED", "false").lower() == "true",
+    "modelo_path": Path(os.getenv("SHADOW_MODEL_PATH", str(BASE_DIR / "models" / "pipeline_modelo_compacto.joblib"))),
+    # Versão exibida nas métricas (padrão: nome do arquivo + data de modificação)
+    "versao": os.getenv("SHADOW_MODEL_VERSION"),
+    # Features dos clientes usadas pelo desafiante
+    "features_path": Path(os.getenv("SHADOW_FEATURES_PATH", str(BASE_DIR / "data" / "raw" / "dados_novos_1.csv"))),
+    "fracao": float(os.getenv("SHADOW_SAMPLE_FRACTION", "0.1")),
+    "tamanho_fila": int(os.getenv("SHADOW_QUEUE_SIZE", "1000")),
+    "tamanho_lote": int(os.getenv("SHADOW_BATCH_SIZE", "64")),
+}
+
+# Profiler sob demanda da API (POST /admin/profiler)
+PROFILER_CONFIG = {
+    "duracao_maxima": float(os.getenv("PROFILER_MAX_SECONDS", "120")),
+    "intervalo_minimo_ms": float(os.getenv("PROFILER_MIN_INTERVAL_MS", "1")),
+    "top_alocacoes": int(os.getenv("PROFILER_TOP_ALLOCATIONS", "25")),
+    "frames_alocacao": int(os.getenv("PROFILER_ALLOCATION_FRAMES", "10")),
+}
+
+# Tracing por requisição da API (spans em arquivo OTLP/JSON rotativo)
+TRACING_CONFIG = {
+    "ativo": os.getenv("TRACING_ENABLED", "false").lower() == "true",
+    # Fração das requisições com spans detalhados
+    "taxa_amostragem": float(os.getenv("TRACING_SAMPLE_RATE", "0.05")),
+    # Requisições a partir desta latência sempre exportam o span raiz (exemplars)
+    "lento_ms": float(os.getenv("TRACING_SLOW_MS", "250")),
+    # Fração máxima da latência gasta com tracing (acima disso a amostragem é reduzida)
+    "custo_maximo": float(os.getenv("TRACING_MAX_OVERHEAD", "0.05")),
+    "max_spans": int(os.getenv("TRACING_MAX_SPANS", "64")),
+    "arquivo": Path(os.getenv("TRACING_FILE", str(LOGS_DIR / "traces" / "spans.jsonl"))),
+    "tamanho_maximo_mb": float(os.getenv("TRACING_FILE_MAX_MB", "50")),
+    "arquivos_mantidos": int(os.getenv("TRACING_FILE_BACKUPS", "5")),
+    "tamanho_lote": int(os.getenv("TRACING_BATCH_SIZE", "512")),
+    "tamanho_fila": int(os.getenv("TRACING_QUEUE_SIZE", "10000")),
+}
+
+# Controle de admissão da API (503 com Retry-After em vez de fila sem limite)
+ADMISSION_CONFIG = {
+    "ativo": os.getenv("ADMISSION_ENABLED", "false").lower() == "true",
+    # Requisições simultâneas e fila de espera de cada rota sem limite próprio
+    "concorrencia_padrao": int(os.getenv("ADMISSION_MAX_CONCURRENCY", "16")),
+    "fila_padrao": int(os.getenv("ADMISSION_QUEUE_SIZE", "32")),
+    # Limites próprios: "rota=concorrencia:fila,..." (template da rota, como no /docs)
+    "limites_rotas": os.getenv("ADMISSION_ROUTE_LIMITS", "/churn/todas/predicoes=2:4,/recarregar=1:1"),
+    # Espera máxima na fila antes do 503
+    "espera_maxima_ms": float(os.getenv("ADMISSION_MAX_WAIT_MS", "500")),
+    "retry_after_s": int(os.getenv("ADMISSION_RETRY_AFTER_S", "1")),
+    # Rotas que nunca são descartadas
+    "rotas_prioritarias": os.getenv("ADMISSION_PRIORITY_ROUTES", "/health,/metrics").split(","),
+}
+
+# Cache HTTP condicional (ETag derivado da versão do snapshot + caminho + query)
+HTTP_CACHE_CONFIG = {
+    "ativo": os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true",
+    "rotas": os.getenv("HTTP_CACHE_ROUTES", "/churn/{id_cliente},/churn/todas/predicoes").split(","),
+    # max-age=0 + must-revalidate: clientes sempre revalidam (304 barato) e nunca
+    # servem dados de um snapshot já trocado
+    "cache_control": os.getenv("HTTP_CACHE_CONTROL", "public, max-age=0, must-revalidate"),
+}
+
+# Orçamento de inicialização da API (verificado por scripts/verificar_inicializacao.py)
+STARTUP_BUDGET = {
+    # import do módulo api_churn (sem o startup)
+    "importacao_s": float(os.getenv("STARTUP_BUDGET_IMPORT_S", "1.0")),
+    # maior grupo de módulos importado na inicialização
+    "modulo_s": float(os.getenv("STARTUP_BUDGET_MODULE_S", "0.5")),
+    # evento de startup completo (snapshot, métricas de ML, monitoramento online)
+    "startup_s": float(os.getenv("STARTUP_BUDGET_STARTUP_S", "2.0")),
+    # do início do processo ao primeiro /health saudável
+    "primeiro_health_s": float(os.getenv("STARTUP_BUDGET_FIRST_HEALTH_S", "5.0")),
+    # bibliotecas que não podem ser carregadas na inicialização (só sob demanda)
+    "modulos_proibidos": os.getenv("STARTUP_FORBIDDEN_MODULES", "sklearn,imblearn,joblib,scipy").split(","),
+}
+
+# Paralelismo do treinamento (CV × floresta × transformadores × BLAS)
+PARALLELISM_CONFIG = {
+    # Orçamento total de núcleos (None = todos os núcleos disponíveis ao processo)
+    "orcamento_cpu": int(os.getenv("TRAINING_CPU_BUDGET")) if os.getenv("TRAINING_CPU_BUDGET") else None,
+}
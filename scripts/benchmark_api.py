@@ -0,0 +1,246 @@
+"""
+Micro-benchmark em processo de todos os endpoints da API
+
+Monta `app` (src/api_churn.py) via httpx.ASGITransport, sem container e sem rede,
+com snapshots sintéticos de predição de tamanho configurável. Para cada endpoint
+e tamanho de snapshot mede vazão e distribuição de latência (HistogramaLatencia
+do teste de carga):
+- /churn/{id} com ID existente (hit) e inexistente (miss)
+- /churn/todas/predicoes com vários valores de `limite`
+- /health, /metrics e /recarregar
+
+O resultado é comparado com um baseline salvo: se a mediana da latência subir ou
+a vazão cair além da tolerância, o script termina com código 1.
+
+Uso:
+    python scripts/benchmark_api.py --tamanhos 10000 100000 --salvar-baseline
+    python scripts/benchmark_api.py --tamanhos 10000 100000 --tolerancia 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+# /metrics só é exposto com ENABLE_METRICS=true; o snapshot sintético não deve vir do registro
+os.environ.setdefault("ENABLE_METRICS", "true")
+os.environ["MODEL_REGISTRY"] = "false"
+os.environ["SHADOW_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+
+from test_api_load import HistogramaLatencia  # noqa: E402
+from utils.dados_sinteticos import classificar_risco  # noqa: E402
+
+SAIDA_PADRAO = BASE_DIR / "outputs" / "benchmarks" / "api.json"
+BASELINE_PADRAO = BASE_DIR / "outputs" / "benchmarks" / "api_baseline.json"
+LIMITES_LISTA = (10, 100, 1000)
+
+
+def gerar_snapshot(n_linhas: int, caminho: Path, seed: int = 0) -> np.ndarray:
+    """Snapshot sintético no formato de outputs/predicoes.csv; retorna os IDs"""
+    rng = np.random.default_rng(seed)
+    ids = 15_000_000 + rng.choice(10 * n_linhas, n_linhas, replace=False)
+    preds = rng.beta(2, 5, n_linhas)
+    pd.DataFrame({"id_cliente": ids, "preds": preds, "Classificação": classificar_risco(preds)}).to_csv(caminho, index=False)
+    return ids
+
+
+def carregar_api(diretorio: Path):
+    """Importa a API apontando os caminhos de dados para o diretório do benchmark"""
+    from utils.logger import logger
+    from config.monitoring_config import LOG_CONFIG
+
+    import api_churn
+
+    # logs vão para um arquivo do benchmark (mantém o custo de formatação, sem poluir o terminal)
+    logger.remove()
+    logger.add(diretorio / "api.log", format=LOG_CONFIG["format"], level=LOG_CONFIG["level"], enqueue=True)
+
+    api_churn.PREDICOES_PATH = diretorio / "predicoes.csv"
+    api_churn.METRICAS_PATH = diretorio / "metricas_desempenho_evasao.csv"
+    api_churn.METADATA_PATH = diretorio / "model_metadata.json"
+    return api_churn
+
+
+def montar_casos(ids: np.ndarray, iteracoes: int) -> dict:
+    """{caso: (gerador de requisição, status esperado, iterações)}"""
+    rng = np.random.default_rng(1)
+    id_inexistente = int(ids.max()) + 1
+
+    casos = {
+        "consulta_hit": (lambda: ("GET", f"/churn/{int(rng.choice(ids))}"), 200, iteracoes),
+        "consulta_miss": (lambda: ("GET", f"/churn/{id_inexistente}"), 404, iteracoes),
+    }
+    for limite in LIMITES_LISTA:
+        casos[f"lista_limite_{limite}"] = (
+            lambda limite=limite: ("GET", f"/churn/todas/predicoes?limite={limite}"), 200, max(iteracoes // 10, 10)
+        )
+    casos["health"] = (lambda: ("GET", "/health"), 200, iteracoes)
+    casos["metrics"] = (lambda: ("GET", "/metrics"), 200, max(iteracoes // 10, 10))
+    # relê o CSV do snapshot: poucas iterações
+    casos["recarregar"] = (lambda: ("POST", "/recarregar"), 200, max(iteracoes // 100, 5))
+    return casos
+
+
+async def medir_caso(cliente: httpx.AsyncClient, requisicao, status_esperado: int, iteracoes: int,
+                     concorrencia: int = 1, aquecimento: int = 5) -> dict:
+    """Executa `iteracoes` requisições (em `concorrencia` workers) e mede vazão e latência"""
+    for _ in range(aquecimento):
+        metodo, caminho = requisicao()
+        await cliente.request(metodo, caminho)
+
+    histograma = HistogramaLatencia()
+    inesperados = {}
+    restantes = [iteracoes]
+
+    async def worker():
+        while restantes[0] > 0:
+            restantes[0] -= 1
+            metodo, caminho = requisicao()
+            inicio = time.perf_counter()
+            response = await cliente.request(metodo, caminho)
+            histograma.registrar((time.perf_counter() - inicio) * 1000)
+            if response.status_code != status_esperado:
+                inesperados[response.status_code] = inesperados.get(response.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "iteracoes": iteracoes,
+        "vazao": iteracoes / duracao,
+        "status_inesperados": inesperados,
+        **histograma.resumo(),
+    }
+
+
+async def executar_benchmark(tamanhos, iteracoes: int, concorrencia: int, casos_filtro=None) -> dict:
+    with tempfile.TemporaryDirectory(prefix="benchmark_api_") as tmp:
+        diretorio = Path(tmp)
+        api_churn = carregar_api(diretorio)
+        transporte = httpx.ASGITransport(app=api_churn.app)
+        resultados = {}
+
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark") as cliente:
+            for tamanho in tamanhos:
+                print(f"\n📦 Snapshot sintético: {tamanho:,} predições")
+                ids = gerar_snapshot(tamanho, diretorio / "predicoes.csv")
+                api_churn.carregar_predicoes()
+
+                for caso, (requisicao, status_esperado, n) in montar_casos(ids, iteracoes).items():
+                    if casos_filtro and caso not in casos_filtro:
+                        continue
+                    medida = await medir_caso(cliente, requisicao, status_esperado, n, concorrencia)
+                    resultados[f"{caso}@{tamanho}"] = medida
+                    alerta = f" ⚠️ status {medida['status_inesperados']}" if medida["status_inesperados"] else ""
+                    print(
+                        f"   • {caso:<20} {medida['vazao']:9.1f} req/s | P50 {medida['p50_ms']:8.3f} ms | "
+                        f"P99 {medida['p99_ms']:8.3f} ms{alerta}"
+                    )
+
+    return {
+        "data": datetime.now().isoformat(),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "processador": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {"tamanhos": list(tamanhos), "iteracoes": iteracoes, "concorrencia": concorrencia},
+        "casos": resultados,
+    }
+
+
+def comparar_baseline(resultado: dict, baseline: dict, tolerancia: float) -> list:
+    """
+    Regressões em relação ao baseline
+
+    Um caso regride se a mediana da latência ficar mais de `tolerancia` acima
+    do baseline ou se a vazão ficar mais de `tolerancia` abaixo.
+    """
+    regressoes = []
+    for caso, atual in resultado["casos"].items():
+        base = baseline["casos"].get(caso)
+        if base is None:
+            continue
+        variacao_p50 = atual["p50_ms"] / base["p50_ms"] - 1
+        variacao_vazao = atual["vazao"] / base["vazao"] - 1
+        if variacao_p50 > tolerancia or variacao_vazao < -tolerancia:
+            regressoes.append({
+                "caso": caso,
+                "p50_ms": atual["p50_ms"], "p50_baseline_ms": base["p50_ms"], "variacao_p50": variacao_p50,
+                "vazao": atual["vazao"], "vazao_baseline": base["vazao"], "variacao_vazao": variacao_vazao,
+            })
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark em processo dos endpoints da API")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000], help="tamanhos do snapshot sintético")
+    parser.add_argument("--iteracoes", type=int, default=1000, help="requisições por caso (listas, /metrics e /recarregar usam menos)")
+    parser.add_argument("--concorrencia", type=int, default=1, help="requisições simultâneas por caso")
+    parser.add_argument("--casos", nargs="+", default=None, help="executa apenas estes casos (ex.: consulta_hit health)")
+    parser.add_argument("--baseline", default=str(BASELINE_PADRAO), help="arquivo de baseline")
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava o resultado como novo baseline")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="regressão relativa tolerada (0.2 = 20%%)")
+    parser.add_argument("--saida", default=str(SAIDA_PADRAO), help="arquivo JSON de resultados")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("⏱️  BENCHMARK EM PROCESSO - API DE PREDIÇÃO DE CHURN")
+    print("="*70)
+    resultado = asyncio.run(executar_benchmark(args.tamanhos, args.iteracoes, args.concorrencia, args.casos))
+
+    saida = Path(args.saida)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 Resultados: {saida}")
+
+    baseline_path = Path(args.baseline)
+    if args.salvar_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(resultado, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📌 Baseline salvo em: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"ℹ️  Sem baseline em {baseline_path} - use --salvar-baseline para criar")
+        return
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("ambiente") != resultado["ambiente"]:
+        print("⚠️  Baseline gerado em outro ambiente - comparação pouco confiável")
+
+    regressoes = comparar_baseline(resultado, baseline, args.tolerancia)
+    falhas = [caso for caso, medida in resultado["casos"].items() if medida["status_inesperados"]]
+    print("\n" + "="*70)
+    print(f"📊 COMPARAÇÃO COM O BASELINE ({baseline['data'][:19]}, tolerância {args.tolerancia:.0%})")
+    print("="*70)
+    for r in regressoes:
+        print(
+            f"❌ {r['caso']:<28} P50 {r['p50_baseline_ms']:.3f} → {r['p50_ms']:.3f} ms ({r['variacao_p50']:+.1%}) | "
+            f"vazão {r['vazao_baseline']:.1f} → {r['vazao']:.1f} req/s ({r['variacao_vazao']:+.1%})"
+        )
+    for caso in falhas:
+        print(f"❌ {caso:<28} status inesperados: {resultado['casos'][caso]['status_inesperados']}")
+    if regressoes or falhas:
+        sys.exit(1)
+    print("✅ Nenhuma regressão além da tolerância")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark de carregamento do modelo: joblib vs artefato mmap
+
+Cada medição roda em um subprocesso novo (imports e caches isolados) e reporta
+tempo de carregamento, memória residente e memória compartilhada com outros
+processos (Shared/Pss de /proc/self/smaps_rollup, quando disponível).
+
+Uso:
+    python scripts/benchmark_carregamento_modelo.py [--repeticoes 5] [--saida outputs/benchmarks/carregamento_modelo.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+MODEL_PATH = BASE_DIR / "models" / "pipeline_modelo_treinado.joblib"
+
+
+def _memoria_compartilhada_mb():
+    """Lê Rss/Pss/Shared de /proc/self/smaps_rollup (Linux)"""
+    valores = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r", encoding="ascii") as f:
+            for linha in f:
+                partes = linha.split()
+                if partes[0] in ("Rss:", "Pss:", "Shared_Clean:", "Shared_Dirty:"):
+                    valores[partes[0].rstrip(":").lower()] = int(partes[1]) / 1024
+    except OSError:
+        pass
+    return valores
+
+
+def medir_interno(formato: str):
+    """Executado no subprocesso: importa dependências, carrega e imprime JSON"""
+    import time
+    inicio_imports = time.perf_counter()
+    import sklearn.ensemble  # noqa: F401
+    import imblearn.pipeline  # noqa: F401
+    tempo_imports = time.perf_counter() - inicio_imports
+
+    from utils.model_loader import carregar_modelo
+    _, estatisticas = carregar_modelo(
+        MODEL_PATH, usar_mmap=(formato == "mmap"), retornar_estatisticas=True
+    )
+    estatisticas["tempo_imports_segundos"] = tempo_imports
+    estatisticas["smaps"] = _memoria_compartilhada_mb()
+    print("RESULTADO:" + json.dumps(estatisticas))
+
+
+def medir(formato: str, repeticoes: int):
+    """Roda `repeticoes` subprocessos e agrega os resultados"""
+    resultados = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, __file__, "--interno", formato],
+            capture_output=True, text=True, check=True, cwd=BASE_DIR,
+        ).stdout
+        linha = next(l for l in saida.splitlines() if l.startswith("RESULTADO:"))
+        resultados.append(json.loads(linha[len("RESULTADO:"):]))
+
+    tempos = sorted(r["tempo_carregamento_segundos"] for r in resultados)
+    return {
+        "formato": resultados[0]["formato"],
+        "repeticoes": repeticoes,
+        "tempo_mediano_ms": tempos[len(tempos) // 2] * 1000,
+        "tempo_minimo_ms": tempos[0] * 1000,
+        "rss_delta_mb": resultados[-1]["rss_delta_mb"],
+        "tempo_imports_ms": resultados[-1]["tempo_imports_segundos"] * 1000,
+        "smaps_mb": resultados[-1]["smaps"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", default="outputs/benchmarks/carregamento_modelo.json")
+    parser.add_argument("--interno", choices=["joblib", "mmap"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        medir_interno(args.interno)
+        return
+
+    print("="*70)
+    print("⏱️  BENCHMARK DE CARREGAMENTO DO MODELO")
+    print("="*70)
+
+    relatorio = {"modelo": str(MODEL_PATH), "resultados": []}
+    for formato in ("joblib", "mmap"):
+        resultado = medir(formato, args.repeticoes)
+        relatorio["resultados"].append(resultado)
+        print(
+            f"   • {resultado['formato']:>6}: mediana {resultado['tempo_mediano_ms']:8.1f} ms | "
+            f"mín {resultado['tempo_minimo_ms']:8.1f} ms | RSS +{resultado['rss_delta_mb']:7.1f} MB | "
+            f"imports {resultado['tempo_imports_ms']:7.1f} ms"
+        )
+
+    saida = Path(args.saida)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n✅ Relatório salvo em: {saida}")
+
+
+if __name__ == "__main__":
+    main()
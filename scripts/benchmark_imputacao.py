@@ -0,0 +1,128 @@
+"""
+Benchmark de imputação: KNNImputer (força bruta) vs ArvoreKNNImputer
+
+Gera dados numéricos sintéticos a partir de data/raw/dados_treino.csv, mascara
+uma fração das células e mede, para cada tamanho:
+- tempo de fit e de transform
+- pico de memória (tracemalloc)
+- qualidade: RMSE normalizado (pelo desvio padrão da coluna) nas células mascaradas
+
+O KNNImputer só é executado até --max-linhas-knn linhas (custo quadrático).
+
+Uso:
+    python scripts/benchmark_imputacao.py [--tamanhos 10000 100000 1000000 5000000]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+from utils.imputacao import ArvoreKNNImputer  # noqa: E402
+
+NUMERICAS = ["idade", "saldo_conta", "salario_estimado", "escore_credito"]
+
+
+def gerar_dados(n_linhas: int, seed: int = 0) -> np.ndarray:
+    """Reamostra as colunas numéricas do treino com ruído gaussiano (5% do desvio)"""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(BASE_DIR / "data" / "raw" / "dados_treino.csv")[NUMERICAS].to_numpy(dtype=float)
+    dados = base[rng.integers(0, len(base), n_linhas)]
+    dados += rng.normal(0, 1, dados.shape) * base.std(axis=0) * 0.05
+    return dados
+
+
+def mascarar(dados: np.ndarray, taxa: float, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    mascara = rng.random(dados.shape) < taxa
+    mascarados = dados.copy()
+    mascarados[mascara] = np.nan
+    return mascarados, mascara
+
+
+def medir(imputador, X_fit, X_transform):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    imputador.fit(X_fit)
+    tempo_fit = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    imputado = imputador.transform(X_transform)
+    tempo_transform = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.asarray(imputado), tempo_fit, tempo_transform, pico / 1024 ** 2
+
+
+def rmse_normalizado(verdadeiro, imputado, mascara):
+    desvio = verdadeiro.std(axis=0)
+    erros = ((imputado - verdadeiro) / desvio)[mascara]
+    return float(np.sqrt(np.mean(erros ** 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de imputação KNN")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--taxa-ausentes", type=float, default=0.05)
+    parser.add_argument("--max-linhas-knn", type=int, default=20_000)
+    parser.add_argument("--max-referencia", type=int, default=200_000)
+    parser.add_argument("--saida", default="outputs/benchmarks/imputacao.json")
+    args = parser.parse_args()
+
+    from sklearn.impute import KNNImputer
+
+    print("="*70)
+    print("🧮 BENCHMARK DE IMPUTAÇÃO")
+    print("="*70)
+
+    resultados = []
+    for n in args.tamanhos:
+        verdadeiro = gerar_dados(n)
+        # doadores do fit: treino completo (sem ausentes), como no dataset atual
+        X_fit = verdadeiro
+        X_transform, mascara = mascarar(verdadeiro, args.taxa_ausentes)
+
+        metodos = {"arvore": ArvoreKNNImputer(n_neighbors=10, max_referencia=args.max_referencia)}
+        if n <= args.max_linhas_knn:
+            metodos["knn"] = KNNImputer(n_neighbors=10)
+
+        imputados = {}
+        for nome, imputador in metodos.items():
+            imputado, tempo_fit, tempo_transform, pico_mb = medir(imputador, X_fit, X_transform)
+            imputados[nome] = imputado
+            resultado = {
+                "linhas": n,
+                "metodo": nome,
+                "tempo_fit_segundos": tempo_fit,
+                "tempo_transform_segundos": tempo_transform,
+                "linhas_por_segundo": n / max(tempo_transform, 1e-9),
+                "pico_memoria_mb": pico_mb,
+                "rmse_normalizado": rmse_normalizado(verdadeiro, imputado, mascara),
+            }
+            resultados.append(resultado)
+            print(
+                f"   • {n:>9,} linhas | {nome:>6} | fit {tempo_fit:7.2f}s | transform {tempo_transform:7.2f}s | "
+                f"pico {pico_mb:8.1f} MB | RMSE norm. {resultado['rmse_normalizado']:.4f}"
+            )
+
+        if "knn" in imputados:
+            diferenca = rmse_normalizado(imputados["knn"], imputados["arvore"], mascara)
+            print(f"     ↳ diferença árvore vs knn (RMSE norm. nas células imputadas): {diferenca:.4f}")
+            resultados.append({"linhas": n, "metodo": "arvore_vs_knn", "rmse_normalizado": diferenca})
+
+    saida = Path(args.saida)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps({"taxa_ausentes": args.taxa_ausentes, "resultados": resultados},
+                                ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n✅ Relatório salvo em: {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark de pontuação do modelo: custo por etapa do pipeline e por tamanho de lote
+
+Carrega o pipeline (models/pipeline_modelo_treinado.joblib por padrão) e executa
+cada etapa isoladamente (imputação, transformação, features polinomiais,
+classificador) sobre lotes de 1 a 1 milhão de linhas de dados sintéticos no
+esquema do treino. Para cada etapa e tamanho reporta:
+- linhas/s e latência por linha (mediana de repetições)
+- pico de memória alocada (tracemalloc, em uma execução separada)
+- fração do custo total do predict_proba
+
+A entrada de cada etapa é a saída da etapa anterior, calculada uma única vez no
+maior lote e fatiada para os menores. O relatório JSON é nomeado pela versão do
+modelo e pode ser comparado com o de outra versão (--comparar).
+
+Uso:
+    python scripts/benchmark_modelo.py
+    python scripts/benchmark_modelo.py --tamanhos 1 100 10000 1000000 --taxa-ausentes 0.05
+    python scripts/benchmark_modelo.py --modelo models/pipeline_modelo_compacto.joblib --versao compacto \\
+        --comparar outputs/benchmarks/modelo_20250101_120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+from utils.dados_sinteticos import GeradorSintetico  # noqa: E402
+from utils.incremental import resolver_versao_modelo  # noqa: E402
+from utils.model_loader import carregar_modelo  # noqa: E402
+
+MODEL_PATH = BASE_DIR / "models" / "pipeline_modelo_treinado.joblib"
+METADATA_PATH = BASE_DIR / "outputs" / "model_metadata.json"
+DADOS_TREINO = BASE_DIR / "data" / "raw" / "dados_treino.csv"
+TAMANHOS_PADRAO = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def etapas_pontuacao(pipeline) -> list:
+    """
+    Etapas executadas no predict_proba: [(nome, função sobre a entrada)]
+
+    Etapas sem transform (ex.: SMOTE) só atuam no fit e são ignoradas.
+    """
+    etapas = [
+        (nome, etapa.transform)
+        for nome, etapa in pipeline.steps[:-1]
+        if etapa not in (None, "passthrough") and hasattr(etapa, "transform")
+    ]
+    nome_final, estimador = pipeline.steps[-1]
+    etapas.append((nome_final, estimador.predict_proba))
+    return etapas
+
+
+def medir_tempo(funcao, X, tempo_minimo: float, max_repeticoes: int) -> dict:
+    """Mediana de repetições até somar `tempo_minimo` (pelo menos 3, salvo chamadas longas)"""
+    tempos = []
+    while len(tempos) < max_repeticoes:
+        inicio = time.perf_counter()
+        funcao(X)
+        tempos.append(time.perf_counter() - inicio)
+        if tempos[-1] >= tempo_minimo or (len(tempos) >= 3 and sum(tempos) >= tempo_minimo):
+            break
+    return {"segundos": statistics.median(tempos), "repeticoes": len(tempos)}
+
+
+def medir_memoria(funcao, X) -> float:
+    """Pico de memória alocada (MB) durante uma chamada"""
+    tracemalloc.start()
+    try:
+        funcao(X)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico / 1024 ** 2
+
+
+def executar_benchmark(pipeline, X: pd.DataFrame, tamanhos, tempo_minimo: float = 0.5,
+                       max_repeticoes: int = 50, memoria: bool = True) -> dict:
+    """
+    Mede cada etapa do pipeline e o predict_proba completo para cada tamanho de lote
+
+    Returns:
+        {"etapas": {nome: {tamanho: medidas}}, "total": {tamanho: medidas}}
+    """
+    etapas = etapas_pontuacao(pipeline)
+
+    # entradas de cada etapa no maior lote (fatiadas para os demais tamanhos)
+    entradas = [X]
+    for _, funcao in etapas[:-1]:
+        entradas.append(funcao(entradas[-1]))
+
+    def medidas(funcao, entrada, n):
+        tempo = medir_tempo(funcao, entrada, tempo_minimo, max_repeticoes)
+        resultado = {
+            **tempo,
+            "linhas_por_s": n / tempo["segundos"],
+            "latencia_por_linha_us": tempo["segundos"] / n * 1e6,
+        }
+        if memoria:
+            resultado["pico_memoria_mb"] = medir_memoria(funcao, entrada)
+        return resultado
+
+    resultado = {"etapas": {nome: {} for nome, _ in etapas}, "total": {}}
+    for n in tamanhos:
+        print(f"\n📦 Lote de {n:,} linhas")
+        for (nome, funcao), entrada in zip(etapas, entradas):
+            medida = medidas(funcao, entrada.iloc[:n], n)
+            resultado["etapas"][nome][str(n)] = medida
+            print(
+                f"   • {nome:<16} {medida['linhas_por_s']:>14,.0f} linhas/s | "
+                f"{medida['latencia_por_linha_us']:>12.2f} µs/linha"
+                + (f" | pico {medida['pico_memoria_mb']:9.2f} MB" if memoria else "")
+            )
+
+        total = medidas(pipeline.predict_proba, X.iloc[:n], n)
+        soma_etapas = sum(resultado["etapas"][nome][str(n)]["segundos"] for nome, _ in etapas)
+        for nome, _ in etapas:
+            resultado["etapas"][nome][str(n)]["fracao"] = resultado["etapas"][nome][str(n)]["segundos"] / soma_etapas
+        resultado["total"][str(n)] = total
+        print(f"   = {'predict_proba':<16} {total['linhas_por_s']:>14,.0f} linhas/s | "
+              f"{total['latencia_por_linha_us']:>12.2f} µs/linha")
+    return resultado
+
+
+def comparar(atual: dict, anterior: dict):
+    """Razão atual/anterior da latência por linha, por etapa e tamanho"""
+    print("\n" + "="*70)
+    print(f"📊 COMPARAÇÃO: {atual['model_version']} x {anterior['model_version']} (latência por linha)")
+    print("="*70)
+    grupos = {**{nome: v for nome, v in atual["etapas"].items()}, "predict_proba": atual["total"]}
+    grupos_anteriores = {**anterior["etapas"], "predict_proba": anterior["total"]}
+    for nome, por_tamanho in grupos.items():
+        if nome not in grupos_anteriores:
+            print(f"   • {nome:<16} (etapa nova)")
+            continue
+        razoes = [
+            f"{n}: {medida['latencia_por_linha_us'] / grupos_anteriores[nome][n]['latencia_por_linha_us']:.2f}x"
+            for n, medida in por_tamanho.items()
+            if n in grupos_anteriores[nome]
+        ]
+        print(f"   • {nome:<16} " + " | ".join(razoes))
+    for nome in set(grupos_anteriores) - set(grupos):
+        print(f"   • {nome:<16} (etapa removida)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de pontuação do modelo por etapa e tamanho de lote")
+    parser.add_argument("--modelo", default=str(MODEL_PATH), help="pipeline a medir")
+    parser.add_argument("--versao", default=None, help="versão do modelo no relatório (padrão: model_metadata.json)")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO, help="tamanhos de lote")
+    parser.add_argument("--tempo-minimo", type=float, default=0.5, help="tempo mínimo medido por etapa e tamanho (s)")
+    parser.add_argument("--max-repeticoes", type=int, default=50, help="repetições máximas por medição")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória (mais rápido)")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument("--taxa-ausentes", type=float, default=0.0,
+                        help="fração de células numéricas mascaradas (exercita o KNNImputer; o treino não tem ausentes)")
+    parser.add_argument("--saida", default=None, help="relatório JSON (padrão: outputs/benchmarks/modelo_<versao>.json)")
+    parser.add_argument("--comparar", default=None, help="relatório de outra versão para comparação")
+    args = parser.parse_args()
+
+    from sklearn import set_config
+    set_config(transform_output="pandas")
+
+    print("="*70)
+    print("⏱️  BENCHMARK DE PONTUAÇÃO DO MODELO")
+    print("="*70)
+
+    pipeline = carregar_modelo(args.modelo)
+    versao = args.versao or resolver_versao_modelo(METADATA_PATH, args.modelo)
+    print(f"\n🤖 Modelo: {args.modelo} (versão {versao})")
+    for nome, etapa in pipeline.steps:
+        print(f"   • {nome}: {type(etapa).__name__}")
+
+    tamanhos = sorted(set(args.tamanhos))
+    gerador = GeradorSintetico(seed=args.seed).ajustar(pd.read_csv(DADOS_TREINO))
+    dados = pd.concat(gerador.gerar(tamanhos[-1], seed=args.seed))
+    X = dados.set_index("id_cliente").drop(columns=["saiu"])
+    if args.taxa_ausentes > 0:
+        rng = np.random.default_rng(args.seed)
+        for coluna in X.select_dtypes("number").columns:
+            X[coluna] = X[coluna].mask(rng.random(len(X)) < args.taxa_ausentes)
+    print(f"🧪 Dados sintéticos: {len(X):,} linhas | ausentes: {args.taxa_ausentes:.0%} das células numéricas")
+
+    resultado = executar_benchmark(
+        pipeline, X, tamanhos, args.tempo_minimo, args.max_repeticoes, memoria=not args.sem_memoria
+    )
+    relatorio = {
+        "model_version": versao,
+        "modelo": str(args.modelo),
+        "data": datetime.now().isoformat(),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "tamanhos": tamanhos,
+        "taxa_ausentes": args.taxa_ausentes,
+        **resultado,
+    }
+
+    nome_seguro = "".join(c if c.isalnum() or c in "-_." else "_" for c in versao)
+    saida = Path(args.saida or BASE_DIR / "outputs" / "benchmarks" / f"modelo_{nome_seguro}.json")
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 Relatório: {saida}")
+
+    if args.comparar:
+        comparar(relatorio, json.loads(Path(args.comparar).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
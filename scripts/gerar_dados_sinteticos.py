@@ -0,0 +1,95 @@
+"""
+Gera clientes sintéticos no esquema de data/raw/dados_treino.csv para testes de escala
+
+Aprende de dados_treino.csv a proporção de `saiu`, as marginais (frequências das
+categorias inclusive), as correlações (cópula gaussiana por classe) e as taxas de
+ausentes, e grava N linhas em blocos (memória limitada ao tamanho do bloco).
+Opcionalmente grava o snapshot de predições correspondente (formato de
+outputs/predicoes.csv) para os benchmarks da API.
+
+Uso:
+    python scripts/gerar_dados_sinteticos.py 10000000 --saida data/sintetico/dados_10M.csv
+    python scripts/gerar_dados_sinteticos.py 1000000 --predicoes data/sintetico/predicoes_1M.csv
+    python scripts/gerar_dados_sinteticos.py 100000 --predicoes data/sintetico/predicoes.csv --modelo models/pipeline_modelo_treinado.joblib
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+from utils.dados_sinteticos import GeradorSintetico, gerar_snapshot_predicoes  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de clientes sintéticos para testes de escala")
+    parser.add_argument("linhas", type=int, help="número de linhas a gerar")
+    parser.add_argument("--origem", default=str(BASE_DIR / "data" / "raw" / "dados_treino.csv"),
+                        help="dados usados para aprender as distribuições")
+    parser.add_argument("--saida", default=str(BASE_DIR / "data" / "sintetico" / "dados_sinteticos.csv"),
+                        help="CSV de clientes gerado")
+    parser.add_argument("--predicoes", default=None, help="grava também o snapshot de predições neste CSV")
+    parser.add_argument("--modelo", default=None,
+                        help="pipeline usado para pontuar o snapshot (padrão: scores sorteados por classe)")
+    parser.add_argument("--tamanho-bloco", type=int, default=500_000, help="linhas por bloco")
+    parser.add_argument("--id-inicial", type=int, default=None, help="primeiro id_cliente (padrão: maior id da origem + 1)")
+    parser.add_argument("--seed", type=int, default=42, help="semente (mesma semente + mesmo bloco = mesmos dados)")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("🧪 GERADOR DE DADOS SINTÉTICOS")
+    print("="*70)
+
+    origem = pd.read_csv(args.origem)
+    gerador = GeradorSintetico(seed=args.seed).ajustar(origem)
+    print(f"\n📚 Distribuições aprendidas de {args.origem} ({len(origem):,} linhas)")
+    print(f"   • Proporção de saiu=1: {gerador.proporcao_alvo:.2%}")
+    print(f"   • Categóricas: {', '.join(gerador.categorias)}")
+
+    modelo = None
+    if args.predicoes and args.modelo:
+        from sklearn import set_config
+        from utils.model_loader import carregar_modelo
+
+        set_config(transform_output="pandas")
+        modelo = carregar_modelo(args.modelo)
+        print(f"   • Snapshot pontuado com o modelo: {args.modelo}")
+
+    saida = Path(args.saida)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida_predicoes = Path(args.predicoes) if args.predicoes else None
+    if saida_predicoes is not None:
+        saida_predicoes.parent.mkdir(parents=True, exist_ok=True)
+    rng_predicoes = np.random.default_rng(args.seed + 1)
+
+    print(f"\n🏭 Gerando {args.linhas:,} linhas em blocos de {args.tamanho_bloco:,}...")
+    inicio = time.perf_counter()
+    geradas = 0
+    for i, bloco in enumerate(gerador.gerar(args.linhas, args.tamanho_bloco, args.seed, args.id_inicial)):
+        modo, cabecalho = ("w", True) if i == 0 else ("a", False)
+        bloco.to_csv(saida, mode=modo, header=cabecalho, index=False)
+        if saida_predicoes is not None:
+            gerar_snapshot_predicoes(bloco, rng_predicoes, modelo).to_csv(
+                saida_predicoes, mode=modo, header=cabecalho, index=False
+            )
+        geradas += len(bloco)
+        decorrido = time.perf_counter() - inicio
+        print(f"   • {geradas:>12,} linhas | {geradas / decorrido:>10,.0f} linhas/s")
+
+    print("\n" + "="*70)
+    print(f"✅ {geradas:,} linhas em {time.perf_counter() - inicio:.1f}s")
+    print(f"💾 Clientes: {saida}")
+    if saida_predicoes is not None:
+        print(f"💾 Predições: {saida_predicoes}")
+        print("   Para a API: copie para outputs/predicoes.csv e chame POST /recarregar")
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Consulta e rollback do registro local de modelos e snapshots
+
+Uso:
+    python scripts/registro_modelos.py listar
+    python scripts/registro_modelos.py restaurar [versao]   # padrão: versão anterior
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+from config.monitoring_config import REGISTRY_CONFIG  # noqa: E402
+from utils.registro import RegistroModelos, id_entrada  # noqa: E402
+
+# artefato do registro -> caminho de trabalho usado pelos scripts
+DESTINOS = {
+    "modelo": BASE_DIR / "models" / "pipeline_modelo_treinado.joblib",
+    "modelo_mmap": BASE_DIR / "models" / "pipeline_modelo_treinado.mmap",
+    "modelo_compacto": BASE_DIR / "models" / "pipeline_modelo_compacto.joblib",
+    "metadata": BASE_DIR / "outputs" / "model_metadata.json",
+    "predicoes": BASE_DIR / "outputs" / "predicoes.csv",
+    "fingerprints": BASE_DIR / "outputs" / "predicoes_fingerprints.csv",
+}
+
+
+def listar(registro: RegistroModelos):
+    atual = registro.atual()
+    print("="*70)
+    print(f"📦 REGISTRO DE MODELOS ({registro.diretorio})")
+    print("="*70)
+    for manifesto in registro.versoes():
+        entrada = id_entrada(manifesto)
+        marcador = "➡️ " if entrada == atual else "   "
+        print(f"{marcador}{entrada:<48} {manifesto['criado_em'][:19]}  "
+              f"{', '.join(sorted(manifesto['artefatos']))}")
+
+
+def restaurar(registro: RegistroModelos, versao=None):
+    versao = versao or registro.anterior()
+    if versao is None:
+        print("❌ Nenhuma versão anterior no histórico")
+        sys.exit(1)
+    registro.restaurar(versao, DESTINOS)
+    if "predicoes" in registro.manifesto(versao)["artefatos"]:
+        registro.definir_atual(versao, motivo="rollback")
+    print(f"✅ Versão {versao} restaurada")
+    print("   Para a API: POST /recarregar (ou POST /admin/rollback)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro local de modelos e snapshots")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("listar", help="lista as versões registradas")
+    parser_restaurar = sub.add_parser("restaurar", help="restaura os artefatos de uma versão")
+    parser_restaurar.add_argument("versao", nargs="?", default=None, help="versão (padrão: anterior)")
+    args = parser.parse_args()
+
+    registro = RegistroModelos(REGISTRY_CONFIG["diretorio"])
+    if args.comando == "listar":
+        listar(registro)
+    else:
+        restaurar(registro, args.versao)
+
+
+if __name__ == "__main__":
+    main()
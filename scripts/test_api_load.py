@@ -1,13 +1,49 @@
 """
 Script para teste de carga da API de predição de churn
 Simula consultas para gerar métricas no Prometheus
+
+Gerador de carga em malha aberta (open-loop) com asyncio + httpx:
+- as requisições são disparadas a uma taxa constante de chegada (--taxa), sem
+  esperar a resposta anterior; uma API lenta acumula fila em vez de reduzir a carga
+- cada requisição guarda o instante previsto de envio e o instante real: a
+  latência corrigida (resposta - instante previsto) não sofre de coordinated
+  omission; a latência de serviço (resposta - envio real) é reportada à parte
+- as latências vão para um histograma de faixas logarítmicas (estilo HDR,
+  precisão relativa fixa), por endpoint e no total
+- os endpoints são sorteados por peso (--mix consulta=8,lista=1,health=1)
+- o resultado é salvo em JSON (--saida)
+
+Modo de capacidade (--capacidade): aumenta a taxa em degraus (x --fator) até violar
+os SLOs de ALERT_THRESHOLDS (api_latency_p95 sobre a latência corrigida e
+api_error_rate), depois faz busca binária entre o último degrau aprovado e o
+primeiro reprovado. Cada passo roda com aquecimento e só é aprovado em regime
+estável (respostas acompanhando a taxa de envio). O resultado e a curva de
+latência vão para outputs/capacidade/, com um histórico entre versões.
+
+Uso:
+    python scripts/test_api_load.py --taxa 200 --duracao 30
+    python scripts/test_api_load.py --taxa 500 --duracao 60 --aquecimento 10 --mix consulta=9,health=1
+    python scripts/test_api_load.py --capacidade --taxa-inicial 50 --duracao 20 --aquecimento 5
 """
-import requests
-import time
+import argparse
+import asyncio
+import json
+import math
+import os
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+import time
 from datetime import datetime
-import os
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+
+from config.monitoring_config import ALERT_THRESHOLDS  # noqa: E402
+
 
 # Resolução dinâmica do host da API:
 # Prioridade 1: variável de ambiente API_URL
@@ -37,183 +73,607 @@ def _resolve_service_url(port: int) -> str:
 
 # Configuração
 API_URL = _resolve_api_url()
-NUM_REQUESTS = 100  # Total de requisições
-CONCURRENT_WORKERS = 10  # Requisições paralelas
-DELAY_BETWEEN_BATCHES = 0.5  # Segundos
-ID_CLIENTES = []
+TAXA_PADRAO = 50  # Requisições por segundo (taxa de chegada)
+DURACAO_PADRAO = 20  # Segundos
+MIX_PADRAO = {"consulta": 8, "lista": 1, "health": 1}
+SAIDA_PADRAO = BASE_DIR / "outputs" / "benchmarks" / "carga_api.json"
+CAPACIDADE_DIR = BASE_DIR / "outputs" / "capacidade"
+ESTABILIDADE_MINIMA = 0.95  # respostas/s sobre envios/s para considerar o passo em regime estável
+
+
+class HistogramaLatencia:
+    """
+    Histograma de latências com faixas logarítmicas (estilo HDR)
+
+    Cada faixa cobre [minimo * fator^i, minimo * fator^(i+1)), com fator = 1 + precisao:
+    o erro relativo de qualquer percentil é no máximo `precisao`, com memória fixa
+    e registro O(1), independentemente do número de amostras.
+
+    Args:
+        minimo_ms: menor latência distinguível (valores abaixo caem na primeira faixa)
+        maximo_ms: maior latência registrável (valores acima caem na última faixa)
+        precisao: erro relativo máximo por faixa
+    """
+
+    def __init__(self, minimo_ms: float = 0.01, maximo_ms: float = 120_000.0, precisao: float = 0.01):
+        self.minimo_ms = minimo_ms
+        self.maximo_ms = maximo_ms
+        self.precisao = precisao
+        self._log_fator = math.log1p(precisao)
+        self.n_faixas = int(math.ceil(math.log(maximo_ms / minimo_ms) / self._log_fator)) + 1
+        self.contagens = np.zeros(self.n_faixas, dtype=np.int64)
+        self.total = 0
+        self.soma = 0.0
+        self.menor = math.inf
+        self.maior = 0.0
+
+    def _faixa(self, valor_ms: float) -> int:
+        if valor_ms <= self.minimo_ms:
+            return 0
+        return min(int(math.log(valor_ms / self.minimo_ms) / self._log_fator), self.n_faixas - 1)
+
+    def registrar(self, valor_ms: float):
+        self.contagens[self._faixa(valor_ms)] += 1
+        self.total += 1
+        self.soma += valor_ms
+        self.menor = min(self.menor, valor_ms)
+        self.maior = max(self.maior, valor_ms)
+
+    def mesclar(self, outro: "HistogramaLatencia"):
+        """Soma as contagens de outro histograma com os mesmos parâmetros"""
+        if (outro.minimo_ms, outro.maximo_ms, outro.precisao) != (self.minimo_ms, self.maximo_ms, self.precisao):
+            raise ValueError("Histogramas com parâmetros diferentes não podem ser mesclados")
+        self.contagens += outro.contagens
+        self.total += outro.total
+        self.soma += outro.soma
+        self.menor = min(self.menor, outro.menor)
+        self.maior = max(self.maior, outro.maior)
+
+    def percentil(self, p: float) -> float:
+        """Limite superior da faixa que contém o percentil p (0-100), limitado ao maior valor visto"""
+        if self.total == 0:
+            return float("nan")
+        alvo = max(1, int(math.ceil(p / 100 * self.total)))
+        faixa = int(np.searchsorted(np.cumsum(self.contagens), alvo))
+        return min(self.minimo_ms * math.exp((faixa + 1) * self._log_fator), self.maior)
+
+    def resumo(self, percentis=(50, 90, 95, 99, 99.9)) -> dict:
+        if self.total == 0:
+            return {"contagem": 0}
+        return {
+            "contagem": self.total,
+            "media_ms": self.soma / self.total,
+            "minimo_ms": self.menor,
+            "maximo_ms": self.maior,
+            **{f"p{p:g}_ms": self.percentil(p) for p in percentis},
+        }
+
+    def para_dict(self) -> dict:
+        """Representação esparsa (faixas não vazias) para o JSON de resultados"""
+        faixas = np.flatnonzero(self.contagens)
+        return {
+            "minimo_ms": self.minimo_ms,
+            "maximo_ms": self.maximo_ms,
+            "precisao": self.precisao,
+            "faixas": {int(i): int(self.contagens[i]) for i in faixas},
+        }
+
+
+def montar_endpoints(ids_clientes, limite_lista: int = 100) -> dict:
+    """Geradores de caminho por nome de endpoint do mix"""
+    return {
+        "consulta": lambda: f"/churn/{random.choice(ids_clientes)}",
+        "lista": lambda: f"/churn/todas/predicoes?limite={limite_lista}",
+        "health": lambda: "/health",
+    }
+
 
+def interpretar_mix(texto: str) -> dict:
+    """'consulta=8,lista=1,health=1' -> {'consulta': 8.0, 'lista': 1.0, 'health': 1.0}"""
+    mix = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        mix[nome.strip()] = float(peso or 1)
+    return mix
 
-def obter_ids_clientes():
+
+async def obter_ids_clientes(cliente: httpx.AsyncClient, limite: int = 1000) -> list:
     """Busca IDs válidos diretamente da API para teste de carga."""
     try:
-        response = requests.get(
-            f"{API_URL}/churn/todas/predicoes",
-            params={"limite": 1000},
-            timeout=10,
-        )
+        response = await cliente.get("/churn/todas/predicoes", params={"limite": limite})
         if response.status_code != 200:
             return []
-
-        payload = response.json()
-        predicoes = payload.get("predicoes", [])
+        predicoes = response.json().get("predicoes", [])
         return [item.get("id_cliente") for item in predicoes if "id_cliente" in item]
-    except Exception:
+    except httpx.HTTPError:
         return []
 
 
-def fazer_consulta(client_id):
-    """Faz uma requisição de consulta de churn por ID."""
+async def checar_health(cliente: httpx.AsyncClient) -> bool:
+    """Verifica se a API está disponível"""
     try:
-        id_cliente = random.choice(ID_CLIENTES)
-        
-        start_time = time.time()
-        response = requests.get(f"{API_URL}/churn/{id_cliente}", timeout=10)
-        latency = (time.time() - start_time) * 1000  # ms
-        
-        if response.status_code == 200:
-            resultado = response.json()
-            return {
-                "id": client_id,
-                "status": "success",
-                "latency_ms": latency,
-                "id_cliente": resultado["id_cliente"],
-                "prediction": resultado["risco_churn"],
-                "message": resultado["mensagem"],
+        response = await cliente.get("/health", timeout=5)
+        return response.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+async def executar_carga(
+    cliente: httpx.AsyncClient,
+    taxa: float,
+    duracao: float,
+    endpoints: dict,
+    mix: dict = None,
+    aquecimento: float = 0.0,
+    seed: int = None,
+) -> dict:
+    """
+    Dispara requisições a uma taxa constante de chegada (malha aberta)
+
+    Args:
+        cliente: httpx.AsyncClient (base_url da API ou transporte ASGI)
+        taxa: requisições por segundo
+        duracao: duração da medição em segundos (após o aquecimento)
+        endpoints: {nome: função sem argumentos que retorna o caminho}
+        mix: {nome: peso} (padrão: pesos iguais)
+        aquecimento: segundos iniciais disparados mas não medidos
+        seed: semente do sorteio de endpoints
+
+    Returns:
+        Resultados: vazão, erros, histogramas corrigido e de serviço (total e por endpoint)
+    """
+    mix = mix or {nome: 1.0 for nome in endpoints}
+    nomes = [nome for nome in mix if mix[nome] > 0]
+    desconhecidos = set(nomes) - set(endpoints)
+    if desconhecidos:
+        raise ValueError(f"Endpoints sem definição no mix: {sorted(desconhecidos)}")
+    pesos = [mix[nome] for nome in nomes]
+    sorteio = random.Random(seed)
+
+    corrigida = {nome: HistogramaLatencia() for nome in nomes}
+    servico = {nome: HistogramaLatencia() for nome in nomes}
+    status = {nome: {} for nome in nomes}
+    erros = {nome: 0 for nome in nomes}
+    atraso_gerador = HistogramaLatencia()
+    em_voo = {"atual": 0, "maximo": 0}
+
+    async def enviar(nome: str, caminho: str, previsto: float, medir: bool):
+        enviado = time.perf_counter()
+        em_voo["atual"] += 1
+        em_voo["maximo"] = max(em_voo["maximo"], em_voo["atual"])
+        try:
+            response = await cliente.get(caminho)
+            codigo = str(response.status_code)
+            falhou = response.status_code >= 400
+        except httpx.HTTPError as e:
+            codigo = type(e).__name__
+            falhou = True
+        finally:
+            em_voo["atual"] -= 1
+        fim = time.perf_counter()
+        if not medir:
+            return
+        corrigida[nome].registrar((fim - previsto) * 1000)
+        servico[nome].registrar((fim - enviado) * 1000)
+        atraso_gerador.registrar((enviado - previsto) * 1000)
+        status[nome][codigo] = status[nome].get(codigo, 0) + 1
+        erros[nome] += falhou
+
+    n_aquecimento = int(aquecimento * taxa)
+    n_total = n_aquecimento + int(duracao * taxa)
+    pendentes = set()
+    inicio = time.perf_counter()
+    i = 0
+    while i < n_total:
+        previsto = inicio + i / taxa
+        agora = time.perf_counter()
+        if previsto > agora:
+            await asyncio.sleep(previsto - agora)
+            continue
+        # dispara todas as requisições cujo instante previsto já passou (o gerador nunca espera respostas)
+        nome = sorteio.choices(nomes, weights=pesos)[0]
+        tarefa = asyncio.create_task(enviar(nome, endpoints[nome](), previsto, i >= n_aquecimento))
+        pendentes.add(tarefa)
+        tarefa.add_done_callback(pendentes.discard)
+        i += 1
+    fim_envio = time.perf_counter()
+    if pendentes:
+        await asyncio.gather(*pendentes)
+    fim = time.perf_counter()
+
+    total = HistogramaLatencia()
+    total_servico = HistogramaLatencia()
+    for nome in nomes:
+        total.mesclar(corrigida[nome])
+        total_servico.mesclar(servico[nome])
+    n_medidas = total.total
+    n_erros = sum(erros.values())
+    inicio_medicao = inicio + aquecimento
+
+    return {
+        "data": datetime.now().isoformat(),
+        "taxa_alvo": taxa,
+        "duracao_s": duracao,
+        "aquecimento_s": aquecimento,
+        "mix": {nome: mix[nome] for nome in nomes},
+        "requisicoes": n_medidas,
+        "erros": n_erros,
+        "taxa_erro": n_erros / n_medidas if n_medidas else 0.0,
+        "taxa_envio": (n_total - n_aquecimento) / max(fim_envio - inicio_medicao, 1e-9),
+        "vazao": (n_medidas - n_erros) / max(fim - inicio_medicao, 1e-9),
+        "taxa_conclusao": n_medidas / max(fim - inicio_medicao, 1e-9),
+        "max_em_voo": em_voo["maximo"],
+        "latencia_corrigida": total.resumo(),
+        "latencia_servico": total_servico.resumo(),
+        "atraso_gerador": atraso_gerador.resumo(),
+        "endpoints": {
+            nome: {
+                "requisicoes": corrigida[nome].total,
+                "erros": erros[nome],
+                "status": status[nome],
+                "latencia_corrigida": corrigida[nome].resumo(),
+                "latencia_servico": servico[nome].resumo(),
             }
+            for nome in nomes
+        },
+        "histograma_corrigido": total.para_dict(),
+    }
+
+
+def avaliar_slo(resultados: dict, limites: dict = ALERT_THRESHOLDS) -> dict:
+    """
+    Verifica um passo de carga contra os SLOs
+
+    Aprovado se P95 corrigido <= api_latency_p95, taxa de erro <= api_error_rate e
+    a API acompanhou a taxa de envio (sem fila crescendo até o fim do passo).
+    """
+    p95_ms = resultados["latencia_corrigida"].get("p95_ms", float("inf"))
+    estabilidade = resultados["taxa_conclusao"] / max(resultados["taxa_envio"], 1e-9)
+    verificacoes = {
+        "latencia_p95": p95_ms <= limites["api_latency_p95"] * 1000,
+        "taxa_erro": resultados["taxa_erro"] <= limites["api_error_rate"],
+        "estavel": estabilidade >= ESTABILIDADE_MINIMA,
+    }
+    return {"aprovado": all(verificacoes.values()), "estabilidade": estabilidade, **verificacoes}
+
+
+async def buscar_capacidade(
+    cliente: httpx.AsyncClient,
+    endpoints: dict,
+    mix: dict = None,
+    taxa_inicial: float = 10.0,
+    taxa_maxima: float = 10_000.0,
+    fator: float = 2.0,
+    precisao: float = 0.05,
+    duracao: float = 20.0,
+    aquecimento: float = 5.0,
+    limites: dict = ALERT_THRESHOLDS,
+    seed: int = None,
+) -> dict:
+    """
+    Maior taxa de chegada que ainda cumpre os SLOs
+
+    Degraus geométricos (taxa_inicial, x fator, ...) até o primeiro passo reprovado;
+    depois busca binária entre o último aprovado e o primeiro reprovado até a
+    diferença relativa ficar abaixo de `precisao`.
+
+    Um passo em que o gerador não sustentou a taxa alvo é inconclusivo, aprovado ou
+    não: a taxa não foi realmente enviada e a latência corrigida inclui o atraso do
+    próprio gerador. Nesse caso, em qualquer fase, a busca para sem capacidade
+    (`limitada_pelo_gerador`). O último passo aprovado e sustentado fica em
+    `aprovada_ate_saturacao` apenas como piso.
+
+    Returns:
+        capacidade (req/s, None se nem a taxa inicial cumpre os SLOs ou se o gerador
+        saturou), vazão na capacidade, limites usados e a curva de latência
+        (todos os passos)
+    """
+    passos = []
+
+    async def medir(taxa: float, fase: str) -> bool:
+        resultados = await executar_carga(
+            cliente, taxa, duracao, endpoints, mix=mix, aquecimento=aquecimento, seed=seed
+        )
+        slo = avaliar_slo(resultados, limites)
+        lat = resultados["latencia_corrigida"]
+        passos.append({
+            "fase": fase,
+            "taxa": taxa,
+            "taxa_envio": resultados["taxa_envio"],
+            "vazao": resultados["vazao"],
+            "taxa_erro": resultados["taxa_erro"],
+            **{chave: lat.get(chave) for chave in ("p50_ms", "p90_ms", "p95_ms", "p99_ms", "maximo_ms")},
+            **slo,
+        })
+        print(
+            f"   {'✅' if slo['aprovado'] else '❌'} {fase:<8} {taxa:9.1f} req/s | vazão {resultados['vazao']:8.1f} | "
+            f"P95 {lat.get('p95_ms', float('nan')):9.2f} ms | erros {resultados['taxa_erro']:6.2%} | "
+            f"estabilidade {slo['estabilidade']:.2f}"
+        )
+        # gerador incapaz de sustentar a taxa: medições acima disso não são confiáveis
+        if resultados["taxa_envio"] < ESTABILIDADE_MINIMA * taxa:
+            print(f"   ⚠️  Gerador enviou apenas {resultados['taxa_envio']:.1f} req/s - a máquina de teste pode ser o gargalo")
+            passos[-1]["gerador_saturado"] = True
+        return slo["aprovado"]
+
+    aprovada, reprovada, limitada_pelo_gerador = None, None, False
+    taxa = taxa_inicial
+    while taxa <= taxa_maxima:
+        aprovado = await medir(taxa, "degrau")
+        if passos[-1].get("gerador_saturado"):
+            # a taxa não foi realmente enviada: o passo não aprova nem reprova a API
+            limitada_pelo_gerador = True
+            break
+        if not aprovado:
+            reprovada = taxa
+            break
+        aprovada = taxa
+        taxa *= fator
+
+    while (not limitada_pelo_gerador and aprovada is not None and reprovada is not None
+           and (reprovada - aprovada) / aprovada > precisao):
+        taxa = (aprovada + reprovada) / 2
+        aprovado = await medir(taxa, "binaria")
+        if passos[-1].get("gerador_saturado"):
+            limitada_pelo_gerador = True
+            break
+        if aprovado:
+            aprovada = taxa
         else:
-            return {
-                "id": client_id,
-                "status": "error",
-                "latency_ms": latency,
-                "error": response.text
-            }
-    except Exception as e:
-        return {
-            "id": client_id,
-            "status": "exception",
-            "error": str(e)
-        }
+            reprovada = taxa
 
-def checar_health():
-    """Verifica se a API está disponível"""
+    capacidade = None if limitada_pelo_gerador else aprovada
+    no_limite = next((p for p in passos if p["taxa"] == capacidade and p["aprovado"]), None)
+    return {
+        "data": datetime.now().isoformat(),
+        "capacidade": capacidade,
+        "primeira_reprovada": reprovada,
+        "limitada_por_taxa_maxima": reprovada is None and capacidade is not None,
+        "limitada_pelo_gerador": limitada_pelo_gerador,
+        "aprovada_ate_saturacao": aprovada if limitada_pelo_gerador else None,
+        "vazao_na_capacidade": no_limite["vazao"] if no_limite else None,
+        "p95_na_capacidade_ms": no_limite["p95_ms"] if no_limite else None,
+        "slo": {
+            "api_latency_p95": limites["api_latency_p95"],
+            "api_error_rate": limites["api_error_rate"],
+            "estabilidade_minima": ESTABILIDADE_MINIMA,
+        },
+        "parametros": {
+            "taxa_inicial": taxa_inicial, "taxa_maxima": taxa_maxima, "fator": fator,
+            "precisao": precisao, "duracao_s": duracao, "aquecimento_s": aquecimento, "mix": mix,
+        },
+        "curva": sorted(passos, key=lambda p: p["taxa"]),
+    }
+
+
+def salvar_capacidade(resultado: dict, diretorio=CAPACIDADE_DIR):
+    """
+    Salva o resultado da busca e o acrescenta ao histórico
+
+    Returns:
+        (caminho do resultado, entrada anterior do histórico ou None)
+    """
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    carimbo = datetime.now().strftime("%Y%m%d_%H%M%S")
+    caminho = salvar_resultados(resultado, diretorio / f"capacidade_{carimbo}.json")
+
+    historico = diretorio / "historico.jsonl"
+    anterior = None
+    if historico.exists():
+        linhas = historico.read_text(encoding="utf-8").splitlines()
+        anterior = json.loads(linhas[-1]) if linhas else None
+    entrada = {
+        "data": resultado["data"],
+        "rotulo": resultado.get("rotulo"),
+        "api_url": resultado.get("api_url"),
+        "capacidade": resultado["capacidade"],
+        "limitada_pelo_gerador": resultado["limitada_pelo_gerador"],
+        "vazao_na_capacidade": resultado["vazao_na_capacidade"],
+        "p95_na_capacidade_ms": resultado["p95_na_capacidade_ms"],
+        "slo": resultado["slo"],
+        "arquivo": caminho.name,
+    }
+    with open(historico, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+    return caminho, anterior
+
+
+def criar_cliente(api_url: str = API_URL, timeout: float = 10.0, max_conexoes: int = 200) -> httpx.AsyncClient:
+    """Cliente HTTP assíncrono com pool de conexões reutilizadas"""
+    return httpx.AsyncClient(
+        base_url=api_url,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes),
+    )
+
+
+def imprimir_resultados(resultados: dict):
+    print("\n" + "="*70)
+    print("📈 RESULTADOS DO TESTE")
+    print("="*70)
+
+    print(f"\n🎯 Taxa alvo: {resultados['taxa_alvo']:.1f} req/s | enviada: {resultados['taxa_envio']:.1f} req/s")
+    print(f"✅ Vazão (respostas com sucesso): {resultados['vazao']:.1f} req/s")
+    print(f"❌ Erros: {resultados['erros']} de {resultados['requisicoes']} ({resultados['taxa_erro']:.2%})")
+    print(f"🔀 Máximo de requisições em voo: {resultados['max_em_voo']}")
+
+    print("\n📊 Latência (ms)          corrigida    serviço")
+    corrigida, servico = resultados["latencia_corrigida"], resultados["latencia_servico"]
+    for chave, rotulo in [("media_ms", "Média"), ("p50_ms", "P50"), ("p90_ms", "P90"), ("p95_ms", "P95"),
+                          ("p99_ms", "P99"), ("p99.9_ms", "P99.9"), ("maximo_ms", "Máximo")]:
+        if chave in corrigida:
+            print(f"   • {rotulo:<20} {corrigida[chave]:>10.2f} {servico[chave]:>10.2f}")
+
+    atraso = resultados["atraso_gerador"]
+    if atraso.get("contagem") and atraso["p99_ms"] > 10:
+        print(f"\n⚠️  Gerador atrasado (P99 {atraso['p99_ms']:.1f} ms): a máquina de teste pode ser o gargalo")
+
+    print("\n🧭 Por endpoint:")
+    for nome, dados in resultados["endpoints"].items():
+        lat = dados["latencia_corrigida"]
+        if not lat.get("contagem"):
+            continue
+        print(
+            f"   • {nome:<10} {dados['requisicoes']:>7d} req | erros {dados['erros']:>5d} | "
+            f"P50 {lat['p50_ms']:8.2f} ms | P99 {lat['p99_ms']:8.2f} ms | status {dados['status']}"
+        )
+
+
+def salvar_resultados(resultados: dict, caminho) -> Path:
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding="utf-8")
+    return caminho
+
+
+async def obter_versao_servida(cliente: httpx.AsyncClient) -> str:
+    """Versão do modelo e do snapshot servidos, lida de / (None se a API não informar)"""
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
-        return response.status_code == 200
-    except:
-        return False
+        raiz = (await cliente.get("/")).json()
+    except (httpx.HTTPError, ValueError):
+        return None
+    modelo, snapshot = raiz.get("versao_modelo"), raiz.get("versao_snapshot")
+    if not snapshot or modelo in (None, "desconhecida"):
+        return None
+    return f"{modelo} ({snapshot})"
 
-def executar_teste():
-    """Executa o teste de carga"""
+
+async def executar_capacidade(args):
+    """Executa a busca de capacidade contra os SLOs de ALERT_THRESHOLDS"""
     print("="*70)
-    print("🚀 TESTE DE CARGA - API DE PREDIÇÃO DE CHURN")
+    print("📐 BUSCA DE CAPACIDADE - API DE PREDIÇÃO DE CHURN")
     print("="*70)
-    
-    # Verificar se API está disponível
-    print(f"\n🔍 Verificando disponibilidade da API em {API_URL}...")
-    if not checar_health():
-        print("❌ API não está disponível!")
-        print("   Execute: docker run -d --name api-churn -p 8000:8000 api-churn")
-        return
-
-    global ID_CLIENTES
-    ID_CLIENTES = obter_ids_clientes()
-    if not ID_CLIENTES:
-        print("❌ Não foi possível obter IDs de clientes para teste.")
-        print("   Verifique se o endpoint /churn/todas/predicoes está acessível.")
-        return
-    
-    print("✅ API disponível!")
-    
-    # Configuração do teste
-    print(f"\n📊 Configuração do teste:")
-    print(f"   • Total de requisições: {NUM_REQUESTS}")
-    print(f"   • Workers paralelos: {CONCURRENT_WORKERS}")
-    print(f"   • Delay entre batches: {DELAY_BETWEEN_BATCHES}s")
-    print(f"   • IDs disponíveis para consulta: {len(ID_CLIENTES)}")
-    
-    # Executar teste
-    print(f"\n🏃 Iniciando teste às {datetime.now().strftime('%H:%M:%S')}...\n")
-    
-    resultados = {
-        "success": 0,
-        "error": 0,
-        "exception": 0,
-        "latencies": [],
-        "predictions": []
-    }
-    
-    start_total = time.time()
-    
-    with ThreadPoolExecutor(max_workers=CONCURRENT_WORKERS) as executor:
-        futures = [executor.submit(fazer_consulta, i) for i in range(NUM_REQUESTS)]
-        
-        for future in as_completed(futures):
-            resultado = future.result()
-            
-            if resultado["status"] == "success":
-                resultados["success"] += 1
-                resultados["latencies"].append(resultado["latency_ms"])
-                resultados["predictions"].append(resultado["prediction"])
-                print(
-                    f"✅ Req {resultado['id']:3d} | Cliente {resultado['id_cliente']:5d} | "
-                    f"{resultado['latency_ms']:6.1f}ms | Churn: {resultado['prediction']:.3f}"
-                )
-            elif resultado["status"] == "error":
-                resultados["error"] += 1
-                print(f"❌ Req {resultado['id']:3d} | Erro HTTP: {resultado.get('error', 'Unknown')}")
-            else:
-                resultados["exception"] += 1
-                print(f"⚠️  Req {resultado['id']:3d} | Exceção: {resultado.get('error', 'Unknown')}")
-            
-            time.sleep(DELAY_BETWEEN_BATCHES / CONCURRENT_WORKERS)
-    
-    duration_total = time.time() - start_total
-    
-    # Estatísticas
+
+    async with criar_cliente(args.url, args.timeout, args.max_conexoes) as cliente:
+        print(f"\n🔍 Verificando disponibilidade da API em {args.url}...")
+        if not await checar_health(cliente):
+            print("❌ API não está disponível!")
+            return None
+        ids_clientes = await obter_ids_clientes(cliente)
+        if not ids_clientes:
+            print("❌ Não foi possível obter IDs de clientes para teste.")
+            return None
+        rotulo = args.rotulo or await obter_versao_servida(cliente)
+        if rotulo is None:
+            print("❌ A API não informa a versão servida: use --rotulo para identificar a entrada do histórico")
+            return None
+
+        mix = interpretar_mix(args.mix) if args.mix else MIX_PADRAO
+        print("\n📊 SLOs (ALERT_THRESHOLDS):")
+        print(f"   • P95 da latência corrigida ≤ {ALERT_THRESHOLDS['api_latency_p95']}s")
+        print(f"   • Taxa de erro ≤ {ALERT_THRESHOLDS['api_error_rate']:.0%}")
+        print(f"   • Passos de {args.duracao}s (+{args.aquecimento}s de aquecimento) | mix {mix}")
+        print(f"\n🏃 Iniciando busca às {datetime.now().strftime('%H:%M:%S')}...\n")
+
+        resultado = await buscar_capacidade(
+            cliente, montar_endpoints(ids_clientes, args.limite_lista), mix=mix,
+            taxa_inicial=args.taxa_inicial, taxa_maxima=args.taxa_maxima, fator=args.fator,
+            precisao=args.precisao_busca, duracao=args.duracao, aquecimento=args.aquecimento, seed=args.seed,
+        )
+
+    resultado["api_url"] = args.url
+    resultado["rotulo"] = rotulo
+    caminho, anterior = salvar_capacidade(resultado, args.diretorio_capacidade)
+
     print("\n" + "="*70)
-    print("📈 RESULTADOS DO TESTE")
+    if resultado["limitada_pelo_gerador"]:
+        print("⚠️  Gerador saturado durante a busca: capacidade não registrada")
+        if resultado["aprovada_ate_saturacao"] is not None:
+            print(f"   • A API cumpriu os SLOs até {resultado['aprovada_ate_saturacao']:.1f} req/s (apenas um piso)")
+        if resultado["primeira_reprovada"] is not None:
+            print(f"   • Primeira reprovação com o gerador sustentado: {resultado['primeira_reprovada']:.1f} req/s")
+        print("   • Rode o teste de uma máquina com mais CPU ou com mais processos geradores")
+    elif resultado["capacidade"] is None:
+        print(f"❌ Nem a taxa inicial ({args.taxa_inicial} req/s) cumpre os SLOs")
+    else:
+        limite = " (limitada por --taxa-maxima)" if resultado["limitada_por_taxa_maxima"] else ""
+        print(f"🏁 Capacidade: {resultado['capacidade']:.1f} req/s{limite}")
+        print(f"   • Vazão: {resultado['vazao_na_capacidade']:.1f} req/s | P95 {resultado['p95_na_capacidade_ms']:.2f} ms")
+    if anterior and anterior.get("capacidade") and resultado["capacidade"]:
+        variacao = resultado["capacidade"] / anterior["capacidade"] - 1
+        print(f"   • Anterior ({anterior.get('rotulo')}, {anterior['data'][:19]}): "
+              f"{anterior['capacidade']:.1f} req/s ({variacao:+.1%})")
+    print(f"💾 Resultado: {caminho}")
+    print("="*70)
+    return resultado
+
+
+async def executar_teste(args):
+    """Executa o teste de carga"""
     print("="*70)
-    
-    print(f"\n⏱️  Duração total: {duration_total:.2f}s")
-    print(f"🎯 Taxa de sucesso: {resultados['success']/NUM_REQUESTS*100:.1f}%")
-    print(f"✅ Sucesso: {resultados['success']}")
-    print(f"❌ Erros: {resultados['error']}")
-    print(f"⚠️  Exceções: {resultados['exception']}")
-    
-    if resultados["latencies"]:
-        latencies = sorted(resultados["latencies"])
-        print(f"\n📊 Latência (ms):")
-        print(f"   • Média: {sum(latencies)/len(latencies):.2f}")
-        print(f"   • Mediana: {latencies[len(latencies)//2]:.2f}")
-        print(f"   • P95: {latencies[int(len(latencies)*0.95)]:.2f}")
-        print(f"   • P99: {latencies[int(len(latencies)*0.99)]:.2f}")
-        print(f"   • Mínimo: {min(latencies):.2f}")
-        print(f"   • Máximo: {max(latencies):.2f}")
-    
-    if resultados["predictions"]:
-        predictions = resultados["predictions"]
-        print(f"\n🎲 Predições de Churn:")
-        print(f"   • Média: {sum(predictions)/len(predictions):.4f}")
-        print(f"   • Mínimo: {min(predictions):.4f}")
-        print(f"   • Máximo: {max(predictions):.4f}")
-        
-        # Distribuição de risco
-        alto_risco = sum(1 for p in predictions if p >= 0.7)
-        medio_risco = sum(1 for p in predictions if 0.3 <= p < 0.7)
-        baixo_risco = sum(1 for p in predictions if p < 0.3)
-        
-        print(f"\n📊 Distribuição de Risco:")
-        print(f"   • Alto (≥70%): {alto_risco} ({alto_risco/len(predictions)*100:.1f}%)")
-        print(f"   • Médio (30-70%): {medio_risco} ({medio_risco/len(predictions)*100:.1f}%)")
-        print(f"   • Baixo (<30%): {baixo_risco} ({baixo_risco/len(predictions)*100:.1f}%)")
-    
+    print("🚀 TESTE DE CARGA - API DE PREDIÇÃO DE CHURN")
+    print("="*70)
+
+    async with criar_cliente(args.url, args.timeout, args.max_conexoes) as cliente:
+        # Verificar se API está disponível
+        print(f"\n🔍 Verificando disponibilidade da API em {args.url}...")
+        if not await checar_health(cliente):
+            print("❌ API não está disponível!")
+            print("   Execute: docker run -d --name api-churn -p 8000:8000 api-churn")
+            return None
+
+        ids_clientes = await obter_ids_clientes(cliente)
+        if not ids_clientes:
+            print("❌ Não foi possível obter IDs de clientes para teste.")
+            print("   Verifique se o endpoint /churn/todas/predicoes está acessível.")
+            return None
+
+        print("✅ API disponível!")
+
+        mix = interpretar_mix(args.mix) if args.mix else MIX_PADRAO
+        print("\n📊 Configuração do teste:")
+        print(f"   • Taxa de chegada: {args.taxa} req/s (malha aberta)")
+        print(f"   • Duração: {args.duracao}s + {args.aquecimento}s de aquecimento")
+        print(f"   • Mix de endpoints: {mix}")
+        print(f"   • Conexões máximas: {args.max_conexoes}")
+        print(f"   • IDs disponíveis para consulta: {len(ids_clientes)}")
+
+        print(f"\n🏃 Iniciando teste às {datetime.now().strftime('%H:%M:%S')}...")
+        resultados = await executar_carga(
+            cliente, args.taxa, args.duracao, montar_endpoints(ids_clientes, args.limite_lista),
+            mix=mix, aquecimento=args.aquecimento, seed=args.seed,
+        )
+
+    resultados["api_url"] = args.url
+    imprimir_resultados(resultados)
+    caminho = salvar_resultados(resultados, args.saida)
+
     print("\n" + "="*70)
     print("✅ Teste concluído!")
-    print(f"🔗 Verifique as métricas em:")
+    print(f"💾 Resultados: {caminho}")
+    print("🔗 Verifique as métricas em:")
     print(f"   • Prometheus: {_resolve_service_url(9090)}")
     print(f"   • Grafana: {_resolve_service_url(3000)}")
-    print(f"   • Métricas da API: {API_URL}/metrics")
+    print(f"   • Métricas da API: {args.url}/metrics")
     print("="*70)
+    return resultados
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Teste de carga em malha aberta da API de churn")
+    parser.add_argument("--url", default=API_URL, help="URL base da API (padrão: API_URL ou localhost:8000)")
+    parser.add_argument("--taxa", type=float, default=TAXA_PADRAO, help="requisições por segundo")
+    parser.add_argument("--duracao", type=float, default=DURACAO_PADRAO, help="segundos medidos")
+    parser.add_argument("--aquecimento", type=float, default=0.0, help="segundos iniciais não medidos")
+    parser.add_argument("--mix", default=None, help="pesos por endpoint, ex.: consulta=8,lista=1,health=1")
+    parser.add_argument("--limite-lista", type=int, default=100, help="parâmetro limite do endpoint de lista")
+    parser.add_argument("--timeout", type=float, default=10.0, help="timeout por requisição (s)")
+    parser.add_argument("--max-conexoes", type=int, default=200, help="tamanho do pool de conexões")
+    parser.add_argument("--seed", type=int, default=None, help="semente do sorteio de endpoints")
+    parser.add_argument("--saida", default=str(SAIDA_PADRAO), help="arquivo JSON de resultados")
+
+    capacidade = parser.add_argument_group("busca de capacidade")
+    capacidade.add_argument("--capacidade", action="store_true", help="busca a maior taxa que cumpre os SLOs")
+    capacidade.add_argument("--taxa-inicial", type=float, default=10.0, help="primeiro degrau (req/s)")
+    capacidade.add_argument("--taxa-maxima", type=float, default=10_000.0, help="taxa máxima testada (req/s)")
+    capacidade.add_argument("--fator", type=float, default=2.0, help="multiplicador entre degraus")
+    capacidade.add_argument("--precisao-busca", type=float, default=0.05, help="precisão relativa da busca binária")
+    capacidade.add_argument("--rotulo", default=None, help="rótulo da versão no histórico (padrão: versões do modelo e do snapshot servidos)")
+    capacidade.add_argument("--diretorio-capacidade", default=str(CAPACIDADE_DIR), help="diretório dos resultados")
+    return parser
+
 
 if __name__ == "__main__":
-    executar_teste()
+    args = criar_parser().parse_args()
+    asyncio.run(executar_capacidade(args) if args.capacidade else executar_teste(args))
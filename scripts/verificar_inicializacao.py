@@ -0,0 +1,212 @@
+"""
+Verificação do orçamento de inicialização da API (cold start)
+
+Duas medições em processos novos:
+1. `python -X importtime`: importa api_churn e executa o evento de startup.
+   Reporta o tempo acumulado de import por pacote (inclui as dependências de cada
+   um), o relatório interno da API (RelatorioInicializacao) e as bibliotecas
+   carregadas.
+2. uvicorn de verdade: tempo do disparo do processo até o primeiro /health com
+   status 200 (mediana de N execuções), mais as métricas api_startup_* lidas do
+   /metrics.
+
+Os tempos são comparados com STARTUP_BUDGET (config/monitoring_config.py). Se
+algum limite for excedido ou uma biblioteca proibida (ex.: sklearn) for carregada
+na inicialização, o script termina com código 1.
+
+Uso:
+    python scripts/verificar_inicializacao.py
+    python scripts/verificar_inicializacao.py --repeticoes 5 --porta 8765
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "src"))
+
+from config.monitoring_config import STARTUP_BUDGET  # noqa: E402
+
+SAIDA_PADRAO = BASE_DIR / "outputs" / "benchmarks" / "inicializacao.json"
+
+# executado com -X importtime em um processo novo; grava o relatório no arquivo do argv
+CODIGO_IMPORTACAO = """
+import asyncio, json, sys
+import api_churn
+asyncio.run(api_churn.startup_event())
+relatorio = {
+    "relatorio": api_churn.relatorio_inicializacao.resumo(),
+    "pacotes_carregados": sorted({m.split(".")[0] for m in sys.modules}),
+}
+open(sys.argv[1], "w", encoding="utf-8").write(json.dumps(relatorio))
+"""
+
+
+def tempos_por_pacote(saida_importtime: str) -> dict:
+    """
+    Tempo acumulado de import (s) por pacote de primeiro nível
+
+    Conta cada pacote na ocorrência mais externa (quando quem o importou é outro
+    pacote), então o tempo de um pacote inclui as dependências importadas por ele.
+    """
+    entradas = []
+    for linha in saida_importtime.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha.split("|", 2)
+        nome = nome[1:]
+        nivel = (len(nome) - len(nome.lstrip(" "))) // 2
+        entradas.append((nivel, nome.strip().split(".")[0], int(acumulado) / 1e6))
+
+    # a saída é pós-ordem (filhos antes do pai); invertida, o pai vem antes dos filhos
+    tempos, ancestrais = {}, []
+    for nivel, pacote, acumulado in reversed(entradas):
+        del ancestrais[nivel:]
+        if not ancestrais or ancestrais[-1] != pacote:
+            tempos[pacote] = tempos.get(pacote, 0.0) + acumulado
+        ancestrais.append(pacote)
+    return dict(sorted(tempos.items(), key=lambda item: -item[1]))
+
+
+def medir_importacoes() -> dict:
+    """Import + startup em um processo novo com -X importtime"""
+    with tempfile.TemporaryDirectory(prefix="inicializacao_") as tmp:
+        arquivo = Path(tmp) / "relatorio.json"
+        processo = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CODIGO_IMPORTACAO, str(arquivo)],
+            cwd=BASE_DIR / "src", stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+        )
+        resultado = json.loads(arquivo.read_text(encoding="utf-8"))
+    resultado["importacao_por_pacote_s"] = tempos_por_pacote(processo.stderr)
+    return resultado
+
+
+def medir_primeiro_health(porta: int, timeout: float) -> dict:
+    """Sobe a API com uvicorn e mede o tempo até o primeiro /health com status 200"""
+    ambiente = {**os.environ, "ENABLE_METRICS": "true"}
+    url = f"http://127.0.0.1:{porta}"
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_churn:app", "--port", str(porta), "--log-level", "warning"],
+        cwd=BASE_DIR / "src", env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=url, timeout=1.0) as cliente:
+            while True:
+                if time.perf_counter() - inicio > timeout:
+                    raise TimeoutError(f"/health não respondeu 200 em {timeout:.0f}s")
+                if processo.poll() is not None:
+                    raise RuntimeError(f"API encerrou durante a inicialização (código {processo.returncode})")
+                try:
+                    if cliente.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+            primeiro_health = time.perf_counter() - inicio
+            metricas = cliente.get("/metrics").text
+    finally:
+        processo.terminate()
+        processo.wait(10)
+
+    from prometheus_client.parser import text_string_to_metric_families
+
+    internas = {}
+    for familia in text_string_to_metric_families(metricas):
+        if familia.name.startswith(("api_startup_", "api_time_to_first_health")):
+            for amostra in familia.samples:
+                rotulo = amostra.labels.get("module") or amostra.labels.get("stage")
+                internas[f"{amostra.name}{{{rotulo}}}" if rotulo else amostra.name] = amostra.value
+    return {"primeiro_health_s": primeiro_health, "metricas": internas}
+
+
+def avaliar_orcamento(importacoes: dict, primeiro_health_s: float, orcamento: dict = STARTUP_BUDGET) -> list:
+    """Violações do orçamento: [(item, valor, limite)]"""
+    etapas = importacoes["relatorio"]["etapas_s"]
+    pacotes = {p: t for p, t in importacoes["importacao_por_pacote_s"].items() if p != "api_churn"}
+    maior_pacote = max(pacotes, key=pacotes.get)
+
+    verificacoes = [
+        ("importacao", etapas["importacao"], orcamento["importacao_s"]),
+        (f"modulo:{maior_pacote}", pacotes[maior_pacote], orcamento["modulo_s"]),
+        ("startup", etapas["startup"], orcamento["startup_s"]),
+        ("primeiro_health", primeiro_health_s, orcamento["primeiro_health_s"]),
+    ]
+    violacoes = [(item, valor, limite) for item, valor, limite in verificacoes if valor > limite]
+    for modulo in orcamento["modulos_proibidos"]:
+        if modulo and modulo in importacoes["pacotes_carregados"]:
+            violacoes.append((f"proibido:{modulo}", 1, 0))
+    return violacoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica o orçamento de inicialização da API")
+    parser.add_argument("--repeticoes", type=int, default=3, help="inicializações medidas com uvicorn (mediana)")
+    parser.add_argument("--porta", type=int, default=8765, help="porta usada pela API durante a medição")
+    parser.add_argument("--timeout", type=float, default=60.0, help="espera máxima pelo /health (s)")
+    parser.add_argument("--top", type=int, default=10, help="pacotes exibidos no ranking de import")
+    parser.add_argument("--saida", default=str(SAIDA_PADRAO), help="relatório JSON")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("🚀 ORÇAMENTO DE INICIALIZAÇÃO DA API")
+    print("="*70)
+
+    print("\n📦 Import e startup (python -X importtime)...")
+    importacoes = medir_importacoes()
+    etapas = importacoes["relatorio"]["etapas_s"]
+    print(f"   • Import de api_churn: {etapas['importacao']:.3f}s | startup: {etapas['startup']:.3f}s")
+    for etapa in ("snapshot", "metricas_modelo", "monitoramento_online", "shadow"):
+        print(f"     - {etapa:<22} {etapas[etapa]:.3f}s")
+    print("\n   Pacotes mais caros (tempo acumulado, inclui dependências):")
+    for pacote, segundos in list(importacoes["importacao_por_pacote_s"].items())[:args.top]:
+        print(f"     - {pacote:<35} {segundos * 1000:8.1f} ms")
+
+    print(f"\n🩺 Tempo até o primeiro /health saudável (uvicorn, {args.repeticoes}x)...")
+    medicoes = [medir_primeiro_health(args.porta, args.timeout) for _ in range(args.repeticoes)]
+    tempos = [m["primeiro_health_s"] for m in medicoes]
+    primeiro_health = statistics.median(tempos)
+    print(f"   • Mediana: {primeiro_health:.3f}s (min {min(tempos):.3f}s | max {max(tempos):.3f}s)")
+    interna = medicoes[-1]["metricas"].get("api_time_to_first_health_seconds")
+    if interna is not None:
+        print(f"   • Medido pela API (desde o início do processo): {interna:.3f}s")
+
+    violacoes = avaliar_orcamento(importacoes, primeiro_health)
+    relatorio = {
+        "data": datetime.now().isoformat(),
+        "orcamento": STARTUP_BUDGET,
+        "importacoes": importacoes,
+        "primeiro_health_s": primeiro_health,
+        "primeiro_health_execucoes_s": tempos,
+        "metricas_api": medicoes[-1]["metricas"],
+        "violacoes": [{"item": item, "valor": valor, "limite": limite} for item, valor, limite in violacoes],
+    }
+    saida = Path(args.saida)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 Relatório: {saida}")
+
+    print("\n" + "="*70)
+    if not violacoes:
+        print("✅ Inicialização dentro do orçamento")
+        return
+    for item, valor, limite in violacoes:
+        if item.startswith("proibido:"):
+            print(f"❌ {item.split(':', 1)[1]} carregado na inicialização (deve ser importado sob demanda)")
+        else:
+            print(f"❌ {item}: {valor:.3f}s > {limite:.3f}s")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
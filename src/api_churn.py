@@ -5,34 +5,48 @@ Esta API expõe os dados de predição de churn dos clientes,
 permitindo consultas por ID do cliente.
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-import pandas as pd
 from pathlib import Path
 from typing import Optional
+import asyncio
 import json
+import os
+import secrets
 import sys
 
 # Adicionar src ao path para imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+# Relatório de inicialização (só biblioteca padrão): mede os imports abaixo.
+# Bibliotecas pesadas usadas por uma única funcionalidade (pandas, sklearn, joblib)
+# são importadas sob demanda, dentro das funções que as usam.
+from utils.inicializacao import RelatorioInicializacao
+relatorio_inicializacao = RelatorioInicializacao()
+
+with relatorio_inicializacao.importacao("fastapi"):
+    from fastapi import FastAPI, HTTPException, Header, Depends, BackgroundTasks
+    from fastapi.responses import JSONResponse, PlainTextResponse, Response
+    from pydantic import BaseModel
+
 # Configurar logging
-from utils.logger import setup_logger, logger
+with relatorio_inicializacao.importacao("loguru"):
+    from utils.logger import setup_logger, logger
 setup_logger("api")
 
 # Configurar métricas Prometheus
-from prometheus_fastapi_instrumentator import Instrumentator
-from utils.metrics import (
-    api_predictions_loaded,
-    update_churn_distribution_metrics,
-    update_model_metrics,
-    set_model_version,
-    model_training_duration_seconds,
-    model_training_samples,
-    model_predictions_total,
-    churn_predictions_high_risk,
-)
+with relatorio_inicializacao.importacao("prometheus"):
+    from utils.metrics import (
+        api_predictions_loaded,
+        update_churn_distribution_metrics,
+        update_model_metrics,
+        update_model_confidence_intervals,
+        update_online_metrics,
+        set_model_version,
+        model_training_duration_seconds,
+        model_training_samples,
+        model_predictions_total,
+        churn_predictions_high_risk,
+    )
+    from utils.tracing import span
 
 # Inicializar FastAPI
 app = FastAPI(
@@ -43,19 +57,106 @@ app = FastAPI(
 
 logger.info("API FastAPI inicializada")
 
-# Instrumentar API com Prometheus
-instrumentator = Instrumentator(
-    should_group_status_codes=False,
-    should_ignore_untemplated=True,
-    should_respect_env_var=True,
-    should_instrument_requests_inprogress=True,
-    excluded_handlers=["/metrics"],
-    inprogress_name="http_requests_inprogress",
-    inprogress_labels=True,
-)
+# Instrumentar API com Prometheus (só com ENABLE_METRICS=true; sem isso o
+# instrumentator nem é importado)
+METRICAS_HABILITADAS = os.getenv("ENABLE_METRICS", "False").lower() in ("true", "1")
+
+if METRICAS_HABILITADAS:
+    with relatorio_inicializacao.importacao("prometheus_fastapi_instrumentator"):
+        from prometheus_fastapi_instrumentator import Instrumentator
+
+    instrumentator = Instrumentator(
+        should_group_status_codes=False,
+        should_ignore_untemplated=True,
+        should_respect_env_var=True,
+        should_instrument_requests_inprogress=True,
+        excluded_handlers=["/metrics"],
+        inprogress_name="http_requests_inprogress",
+        inprogress_labels=True,
+    )
+    instrumentator.instrument(app)
+
+    # /metrics com negociação de formato: scrapes OpenMetrics recebem os exemplars
+    # (trace_id) do histograma de latência; os demais, o formato texto clássico
+    from prometheus_client import REGISTRY
+    from prometheus_client.exposition import choose_encoder
+    from starlette.requests import Request
+
+    @app.get("/metrics", tags=["Health"])
+    def metrics(request: Request):
+        """Métricas Prometheus (OpenMetrics com exemplars se o scraper aceitar)"""
+        gerar, tipo = choose_encoder(request.headers.get("accept", ""))
+        return Response(content=gerar(REGISTRY), media_type=tipo)
+
+    logger.info("Instrumentação Prometheus ativada em /metrics")
+
+# Controle de admissão: limites de concorrência por rota e 503 rápido sob sobrecarga
+from config.monitoring_config import ADMISSION_CONFIG
+
+if ADMISSION_CONFIG["ativo"]:
+    from utils.admissao import MiddlewareAdmissao, interpretar_limites
+
+    app.add_middleware(
+        MiddlewareAdmissao,
+        rotas=app.routes,
+        limites=interpretar_limites(ADMISSION_CONFIG["limites_rotas"]),
+        concorrencia_padrao=ADMISSION_CONFIG["concorrencia_padrao"],
+        fila_padrao=ADMISSION_CONFIG["fila_padrao"],
+        espera_maxima_ms=ADMISSION_CONFIG["espera_maxima_ms"],
+        retry_after_s=ADMISSION_CONFIG["retry_after_s"],
+        rotas_prioritarias=ADMISSION_CONFIG["rotas_prioritarias"],
+    )
+    logger.info(
+        f"Controle de admissão ativo: {ADMISSION_CONFIG['concorrencia_padrao']} simultâneas/rota | "
+        f"fila {ADMISSION_CONFIG['fila_padrao']} | espera máx. {ADMISSION_CONFIG['espera_maxima_ms']:.0f} ms"
+    )
+
+# Cache HTTP condicional: If-None-Match com o ETag do conteúdo do snapshot atual responde 304
+# antes da admissão e do endpoint
+from config.monitoring_config import HTTP_CACHE_CONFIG
+
+if HTTP_CACHE_CONFIG["ativo"]:
+    from utils.cache_http import MiddlewareCacheCondicional
+
+    app.add_middleware(
+        MiddlewareCacheCondicional,
+        rotas_app=app.routes,
+        rotas_cacheaveis=HTTP_CACHE_CONFIG["rotas"],
+        obter_conteudo=lambda: chave_conteudo(),
+        cache_control=HTTP_CACHE_CONFIG["cache_control"],
+    )
+
+# Tracing por requisição (spans exportados para arquivo OTLP/JSON; middleware
+# adicionado depois = mais externo, então os 503 da admissão também são rastreados)
+from config.monitoring_config import TRACING_CONFIG
 
-instrumentator.instrument(app).expose(app, endpoint="/metrics", include_in_schema=True)
-logger.info("Instrumentação Prometheus ativada em /metrics")
+if TRACING_CONFIG["ativo"]:
+    from utils.tracing import ExportadorArquivoOTLP, MiddlewareRastreamento, Rastreador
+
+    exportador_spans = ExportadorArquivoOTLP(
+        TRACING_CONFIG["arquivo"],
+        tamanho_maximo_bytes=int(TRACING_CONFIG["tamanho_maximo_mb"] * 1024 ** 2),
+        arquivos_mantidos=TRACING_CONFIG["arquivos_mantidos"],
+        tamanho_lote=TRACING_CONFIG["tamanho_lote"],
+        tamanho_fila=TRACING_CONFIG["tamanho_fila"],
+    )
+    app.add_middleware(
+        MiddlewareRastreamento,
+        rotas=app.routes,
+        rastreador=Rastreador(
+            exportador_spans,
+            taxa_amostragem=TRACING_CONFIG["taxa_amostragem"],
+            lento_ms=TRACING_CONFIG["lento_ms"],
+            custo_maximo=TRACING_CONFIG["custo_maximo"],
+            max_spans=TRACING_CONFIG["max_spans"],
+        ),
+    )
+    logger.info(
+        f"Tracing ativo: amostragem {TRACING_CONFIG['taxa_amostragem']:.1%} | "
+        f"lentas >= {TRACING_CONFIG['lento_ms']:.0f} ms | spans em {TRACING_CONFIG['arquivo']}"
+    )
+else:
+    exportador_spans = None
 
 # Caminho para o arquivo de predições
 PREDICOES_PATH = Path(__file__).parent.parent / "outputs" / "predicoes.csv"
@@ -65,16 +166,127 @@ MODEL_PATH = Path(__file__).parent.parent / "models" / "pipeline_modelo_treinado
 
 # Cache para armazenar os dados
 predicoes_df = None
+# Versão do snapshot servido (id no registro ou "arquivo@<mtime>")
+versao_snapshot = None
+# Identificador do conteúdo do snapshot servido (base do ETag)
+conteudo_snapshot = None
+
+# Snapshot anterior pré-carregado para rollback instantâneo
+predicoes_anterior_df = None
+versao_snapshot_anterior = None
+conteudo_snapshot_anterior = None
+
+# Modelo que gerou o snapshot servido: versão e limiar de decisão (proba >= limiar)
+versao_modelo_principal = "desconhecida"
+limiar_principal = 0.5
+
+# Shadow scoring do modelo desafiante (None = desativado)
+avaliador_sombra = None
+
+# Profiler sob demanda (criado na primeira sessão)
+profiler = None
+
+
+def _pandas():
+    """pandas sob demanda (só a carga de snapshots e de métricas de ML o usa)"""
+    with relatorio_inicializacao.importacao("pandas"):
+        import pandas as pd
+    return pd
+
+
+def obter_registro():
+    """Registro local de modelos/snapshots (None se desativado)"""
+    from config.monitoring_config import REGISTRY_CONFIG
+
+    if not REGISTRY_CONFIG["ativo"]:
+        return None
+    from utils.registro import RegistroModelos
+    return RegistroModelos(REGISTRY_CONFIG["diretorio"])
+
+
+def identificador_conteudo(caminho: Path, registro=None) -> str:
+    """sha256 do arquivo (objetos do registro são nomeados pelo hash) ou tamanho + mtime"""
+    if registro is not None and caminho.parent == registro.objetos:
+        return caminho.name
+    estado = caminho.stat()
+    return f"{estado.st_size}-{estado.st_mtime_ns}"
+
+
+def chave_conteudo():
+    """Base do ETag: conteúdo do snapshot + modelo e limiar que definem previsao_churn (None = sem cache)"""
+    if conteudo_snapshot is None:
+        return None
+    return f"{conteudo_snapshot}|{versao_modelo_principal}|{limiar_principal!r}"
+
+
+def carregar_snapshot_anterior(registro):
+    """Pré-carrega em memória o snapshot anterior do registro (alvo do rollback)"""
+    global predicoes_anterior_df, versao_snapshot_anterior, conteudo_snapshot_anterior
+    anterior = registro.anterior(com_artefato="predicoes") if registro is not None else None
+    if anterior is None or anterior == versao_snapshot:
+        predicoes_anterior_df, versao_snapshot_anterior, conteudo_snapshot_anterior = None, None, None
+        return
+    try:
+        caminho = registro.caminho_artefato(anterior, "predicoes")
+        predicoes_anterior_df = _pandas().read_csv(caminho)
+        versao_snapshot_anterior = anterior
+        conteudo_snapshot_anterior = identificador_conteudo(caminho, registro)
+        logger.info(f"Snapshot anterior pré-carregado: versão {anterior} ({len(predicoes_anterior_df)} registros)")
+    except Exception as e:
+        logger.exception(f"Erro ao pré-carregar snapshot anterior {anterior}: {e}")
+        predicoes_anterior_df, versao_snapshot_anterior, conteudo_snapshot_anterior = None, None, None
+
+
+def carregar_modelo_principal(registro=None, entrada: str = None):
+    """Versão e limiar do modelo do snapshot servido (metadados da entrada no registro ou model_metadata.json)"""
+    global versao_modelo_principal, limiar_principal
+    caminho = METADATA_PATH
+    if registro is not None and entrada is not None:
+        try:
+            caminho = registro.caminho_artefato(entrada, "metadata")
+        except KeyError:
+            pass
+    try:
+        metadata = json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Metadados do modelo indisponíveis ({caminho}): {e} - limiar 0.5")
+        metadata = {}
+    versao_modelo_principal = str(metadata.get("model_version", "desconhecida"))
+    limiar_principal = float(metadata.get("limiar_decisao", 0.5))
+    if avaliador_sombra is not None:
+        avaliador_sombra.versao_principal = versao_modelo_principal
+    logger.info(f"Modelo principal: {versao_modelo_principal} (limiar de decisão {limiar_principal:.4f})")
+
+
+def previsao_publica(risco: float) -> int:
+    """previsao_churn dos endpoints /churn: risco > 0.5, ou o limiar ajustado com API_USE_TUNED_THRESHOLD=true"""
+    from config.monitoring_config import API_CONFIG
+
+    if API_CONFIG["limiar_ajustado"]:
+        return 1 if risco >= limiar_principal else 0
+    return 1 if risco > 0.5 else 0
 
 
 def carregar_predicoes():
-    """Carrega o arquivo de predições em memória"""
-    global predicoes_df
+    """Carrega o snapshot de predições atual em memória (registro ou arquivo de predições)"""
+    global predicoes_df, versao_snapshot, conteudo_snapshot
+    registro = obter_registro()
+    caminho, versao = PREDICOES_PATH, None
+    if registro is not None and registro.atual() is not None:
+        try:
+            caminho = registro.caminho_artefato(registro.atual(), "predicoes")
+            versao = registro.atual()
+        except KeyError:
+            logger.warning(f"Versão atual do registro sem snapshot de predições - usando {PREDICOES_PATH}")
     try:
-        logger.info(f"Carregando predições de: {PREDICOES_PATH}")
-        predicoes_df = pd.read_csv(PREDICOES_PATH)
-        logger.success(f"Arquivo de predições carregado: {len(predicoes_df)} registros")
+        logger.info(f"Carregando predições de: {caminho}")
+        predicoes_df = _pandas().read_csv(caminho)
+        versao_snapshot = versao or f"arquivo@{caminho.stat().st_mtime_ns}"
+        conteudo_snapshot = identificador_conteudo(caminho, registro)
+        logger.success(f"Arquivo de predições carregado: {len(predicoes_df)} registros (snapshot {versao_snapshot})")
         
+        carregar_modelo_principal(registro, versao)
+
         # Atualizar métrica Prometheus
         api_predictions_loaded.set(len(predicoes_df))
         
@@ -83,14 +295,18 @@ def carregar_predicoes():
         logger.info("Métricas de distribuição de churn atualizadas")
         
     except FileNotFoundError:
-        logger.error(f"Arquivo não encontrado: {PREDICOES_PATH}")
+        logger.error(f"Arquivo não encontrado: {caminho}")
         predicoes_df = None
+        versao_snapshot = conteudo_snapshot = None
         api_predictions_loaded.set(0)
     except Exception as e:
         logger.exception(f"Erro ao carregar predições: {e}")
         predicoes_df = None
+        versao_snapshot = conteudo_snapshot = None
         api_predictions_loaded.set(0)
 
+    carregar_snapshot_anterior(registro)
+
 
 def carregar_metricas_modelo() -> bool:
     """Carrega métricas de ML persistidas para expor no /metrics da API."""
@@ -100,7 +316,7 @@ def carregar_metricas_modelo() -> bool:
             return False
 
         logger.info(f"Carregando métricas ML de: {METRICAS_PATH}")
-        metricas_df = pd.read_csv(METRICAS_PATH, index_col=0)
+        metricas_df = _pandas().read_csv(METRICAS_PATH, index_col=0)
 
         if metricas_df.empty:
             logger.warning("Arquivo de métricas ML está vazio")
@@ -134,6 +350,9 @@ def carregar_metricas_modelo() -> bool:
         else:
             logger.warning("Nenhuma métrica de qualidade do modelo encontrada no arquivo")
 
+        if {"IC_inferior", "IC_superior"}.issubset(metricas_df.columns):
+            update_model_confidence_intervals(metricas_df.dropna(subset=["IC_inferior", "IC_superior"]))
+
         metadata = {}
         if METADATA_PATH.exists():
             metadata = json.loads(METADATA_PATH.read_text(encoding="utf-8"))
@@ -163,14 +382,89 @@ def carregar_metricas_modelo() -> bool:
         return False
 
 
+def carregar_monitoramento_online() -> bool:
+    """Carrega o estado do monitoramento online e expõe as métricas model_online_*"""
+    from utils.monitoramento_online import MonitorOnline
+    from config.monitoring_config import ONLINE_MONITORING_CONFIG
+
+    estado_path = ONLINE_MONITORING_CONFIG["estado_path"]
+    if not estado_path.exists():
+        logger.info(f"Estado do monitoramento online não encontrado: {estado_path}")
+        return False
+    try:
+        monitor = MonitorOnline.carregar(
+            estado_path, ONLINE_MONITORING_CONFIG["janela"], ONLINE_MONITORING_CONFIG["n_faixas"]
+        )
+        metricas = monitor.metricas()
+        update_online_metrics(metricas)
+        logger.success(f"Métricas online carregadas: {metricas['amostras']} predições rotuladas na janela")
+        return True
+    except Exception as e:
+        logger.exception(f"Erro ao carregar monitoramento online: {e}")
+        return False
+
+
+def iniciar_shadow_scoring():
+    """Carrega o modelo desafiante e inicia o worker de shadow scoring (SHADOW_ENABLED=true)"""
+    global avaliador_sombra
+    from config.monitoring_config import SHADOW_CONFIG
+
+    if not SHADOW_CONFIG["ativo"]:
+        return
+    try:
+        from datetime import datetime
+        from utils.model_loader import carregar_modelo
+        from utils.shadow import AvaliadorSombra, carregar_features
+
+        modelo_path = SHADOW_CONFIG["modelo_path"]
+        versao_desafiante = SHADOW_CONFIG["versao"] or (
+            f"{modelo_path.stem}@{datetime.fromtimestamp(modelo_path.stat().st_mtime):%Y%m%d_%H%M%S}"
+        )
+        avaliador_sombra = AvaliadorSombra(
+            carregar_modelo(modelo_path),
+            carregar_features(SHADOW_CONFIG["features_path"]),
+            versao_desafiante=versao_desafiante,
+            versao_principal=versao_modelo_principal,
+            fracao=SHADOW_CONFIG["fracao"],
+            tamanho_fila=SHADOW_CONFIG["tamanho_fila"],
+            tamanho_lote=SHADOW_CONFIG["tamanho_lote"],
+        )
+        avaliador_sombra.iniciar()
+    except Exception as e:
+        logger.exception(f"Shadow scoring desativado - erro ao carregar o desafiante: {e}")
+        avaliador_sombra = None
+
+
 # Carregar dados na inicialização
 @app.on_event("startup")
 async def startup_event():
     """Evento executado na inicialização da API"""
     logger.info("Iniciando API - Evento de startup")
-    carregar_predicoes()
-    carregar_metricas_modelo()
-    logger.info("API pronta para receber requisições")
+    with relatorio_inicializacao.etapa("startup"):
+        with relatorio_inicializacao.etapa("snapshot"):
+            carregar_predicoes()
+        with relatorio_inicializacao.etapa("metricas_modelo"):
+            carregar_metricas_modelo()
+        with relatorio_inicializacao.etapa("monitoramento_online"):
+            carregar_monitoramento_online()
+        with relatorio_inicializacao.etapa("shadow"):
+            iniciar_shadow_scoring()
+    relatorio_inicializacao.exportar()
+    logger.info(
+        f"API pronta para receber requisições (import {relatorio_inicializacao.etapas['importacao']:.2f}s, "
+        f"startup {relatorio_inicializacao.etapas['startup']:.2f}s)"
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Encerra o shadow scoring, uma sessão de profiling em andamento e o exportador de spans"""
+    if avaliador_sombra is not None:
+        await avaliador_sombra.parar()
+    if profiler is not None:
+        profiler.parar()
+    if exportador_spans is not None:
+        exportador_spans.parar()
 
 
 # Modelos de resposta
@@ -195,6 +489,9 @@ async def root():
     return {
         "api": "API de Predição de Churn",
         "versao": "1.0.0",
+        # o que está sendo servido (muda a cada treino/snapshot; a versão acima é a da API)
+        "versao_modelo": versao_modelo_principal,
+        "versao_snapshot": versao_snapshot,
         "endpoints": {
             "health": "/health",
             "churn_por_id": "/churn/{id_cliente}",
@@ -218,6 +515,7 @@ async def health_check():
         )
     
     total = len(predicoes_df)
+    relatorio_inicializacao.registrar_health()
     logger.info(f"Health check OK - {total} predições disponíveis")
     
     return HealthResponse(
@@ -237,10 +535,12 @@ async def obter_churn_cliente(id_cliente: int):
     Returns:
         Informações sobre o risco de churn do cliente
     """
-    logger.info(f"Consulta de churn solicitada para cliente: {id_cliente}")
+    with span("logging"):
+        logger.info(f"Consulta de churn solicitada para cliente: {id_cliente}")
     
     # Incrementar contador de predições
-    model_predictions_total.labels(endpoint="/churn/{id}").inc()
+    with span("metricas"):
+        model_predictions_total.labels(endpoint="/churn/{id}").inc()
     
     if predicoes_df is None:
         logger.error("Tentativa de consulta sem dados carregados")
@@ -250,7 +550,8 @@ async def obter_churn_cliente(id_cliente: int):
         )
     
     # Buscar cliente no DataFrame
-    cliente = predicoes_df[predicoes_df['id_cliente'] == id_cliente]
+    with span("lookup", linhas=len(predicoes_df)):
+        cliente = predicoes_df[predicoes_df['id_cliente'] == id_cliente]
     
     if cliente.empty:
         logger.warning(f"Cliente não encontrado: {id_cliente}")
@@ -264,8 +565,14 @@ async def obter_churn_cliente(id_cliente: int):
     risco = float(registro['preds'])
     classificacao = str(registro['Classificação'])
     
-    # Determinar previsão binária baseado no risco
-    previsao = 1 if risco > 0.5 else 0
+    # Previsão binária
+    previsao = previsao_publica(risco)
+
+    # Shadow scoring: enfileira (amostrado, sem bloquear) para o modelo desafiante. A comparação
+    # usa o limiar ajustado do principal, a mesma regra do desafiante
+    if avaliador_sombra is not None:
+        with span("shadow"):
+            avaliador_sombra.amostrar(id_cliente, risco, 1 if risco >= limiar_principal else 0)
     
     # Classificar risco
     if risco < 0.3:
@@ -275,22 +582,26 @@ async def obter_churn_cliente(id_cliente: int):
     else:
         nivel_risco = "ALTO"
     
-    logger.success(
-        f"Consulta concluída para cliente {id_cliente}",
-        extra={
-            "id_cliente": id_cliente,
-            "risco": risco,
-            "nivel": nivel_risco,
-            "classificacao": classificacao
-        }
-    )
+    with span("logging"):
+        logger.success(
+            f"Consulta concluída para cliente {id_cliente}",
+            extra={
+                "id_cliente": id_cliente,
+                "risco": risco,
+                "nivel": nivel_risco,
+                "classificacao": classificacao
+            }
+        )
     
-    return ChurnResponse(
-        id_cliente=id_cliente,
-        risco_churn=round(risco, 4),
-        previsao_churn=previsao,
-        mensagem=f"Risco de churn: {nivel_risco} ({risco*100:.2f}%) - {classificacao}"
-    )
+    # Serialização explícita (dentro do span) em vez da validação do response_model
+    with span("serializacao"):
+        resposta = ChurnResponse(
+            id_cliente=id_cliente,
+            risco_churn=round(risco, 4),
+            previsao_churn=previsao,
+            mensagem=f"Risco de churn: {nivel_risco} ({risco*100:.2f}%) - {classificacao}"
+        )
+        return JSONResponse(content=resposta.model_dump())
 
 
 @app.get("/churn/todas/predicoes", tags=["Churn"])
@@ -332,7 +643,7 @@ async def obter_todas_predicoes(
     predicoes = []
     for _, row in df_filtrado.iterrows():
         risco = float(row['preds'])
-        previsao = 1 if risco > 0.5 else 0
+        previsao = previsao_publica(risco)
         predicoes.append({
             'id_cliente': int(row['id_cliente']),
             'risco_churn': round(risco, 4),
@@ -350,6 +661,148 @@ async def obter_todas_predicoes(
     }
 
 
+def verificar_token_admin(x_admin_token: Optional[str] = Header(None)):
+    """Exige o header X-Admin-Token igual a API_ADMIN_TOKEN"""
+    from config.monitoring_config import API_CONFIG
+
+    token = API_CONFIG["admin_token"]
+    if not token:
+        raise HTTPException(status_code=403, detail="Endpoints administrativos desativados (defina API_ADMIN_TOKEN)")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, token):
+        raise HTTPException(status_code=401, detail="Token administrativo inválido")
+
+
+@app.get("/admin/registro", tags=["Administração"], dependencies=[Depends(verificar_token_admin)])
+async def listar_registro():
+    """Versões registradas, snapshot servido e snapshot anterior pré-carregado"""
+    registro = obter_registro()
+    if registro is None:
+        raise HTTPException(status_code=409, detail="Registro de modelos desativado")
+    from utils.registro import id_entrada
+
+    return {
+        "versao_snapshot": versao_snapshot,
+        "versao_snapshot_anterior": versao_snapshot_anterior,
+        "atual": registro.atual(),
+        "versoes": [
+            {
+                "id": id_entrada(m), "model_version": m["model_version"],
+                "criado_em": m["criado_em"], "artefatos": sorted(m["artefatos"]),
+            }
+            for m in registro.versoes()
+        ],
+    }
+
+
+@app.post("/admin/rollback", tags=["Administração"], dependencies=[Depends(verificar_token_admin)])
+async def rollback_snapshot(background_tasks: BackgroundTasks, versao: Optional[str] = None):
+    """
+    Troca o snapshot servido
+
+    Sem `versao` (ou com a versão pré-carregada), a troca pelo snapshot anterior é
+    O(1): apenas as referências em memória são trocadas. Outras versões do registro
+    são lidas do disco.
+    """
+    global predicoes_df, versao_snapshot, conteudo_snapshot
+    global predicoes_anterior_df, versao_snapshot_anterior, conteudo_snapshot_anterior
+    registro = obter_registro()
+    if registro is None:
+        raise HTTPException(status_code=409, detail="Registro de modelos desativado")
+
+    if versao is None or versao == versao_snapshot_anterior:
+        if predicoes_anterior_df is None:
+            raise HTTPException(status_code=409, detail="Nenhum snapshot anterior pré-carregado")
+        novo_df, nova_versao, novo_conteudo = predicoes_anterior_df, versao_snapshot_anterior, conteudo_snapshot_anterior
+    else:
+        try:
+            caminho = registro.caminho_artefato(versao, "predicoes")
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        novo_df = await asyncio.to_thread(_pandas().read_csv, caminho)
+        nova_versao, novo_conteudo = versao, identificador_conteudo(caminho, registro)
+
+    # o snapshot que estava sendo servido passa a ser o anterior (rollback reversível)
+    predicoes_anterior_df, versao_snapshot_anterior, conteudo_snapshot_anterior = (
+        predicoes_df, versao_snapshot, conteudo_snapshot
+    )
+    predicoes_df, versao_snapshot, conteudo_snapshot = novo_df, nova_versao, novo_conteudo
+    carregar_modelo_principal(registro, nova_versao)
+    try:
+        registro.definir_atual(nova_versao, motivo="rollback")
+    except KeyError:
+        logger.warning(f"Versão {nova_versao} não está no registro - ponteiro ATUAL mantido")
+
+    api_predictions_loaded.set(len(predicoes_df))
+    background_tasks.add_task(update_churn_distribution_metrics, predicoes_df)
+    logger.success(f"Rollback: servindo snapshot {versao_snapshot} (anterior: {versao_snapshot_anterior})")
+    return {
+        "status": "Snapshot trocado com sucesso",
+        "versao_snapshot": versao_snapshot,
+        "versao_snapshot_anterior": versao_snapshot_anterior,
+        "total_registros": len(predicoes_df),
+    }
+
+
+@app.post("/admin/profiler", tags=["Administração"], dependencies=[Depends(verificar_token_admin)])
+async def executar_profiler(segundos: float = 10.0, intervalo_ms: float = 10.0, modo: str = "cpu"):
+    """
+    Profiling estatístico da API em execução durante `segundos`
+
+    modo=cpu: pilhas de todas as threads no formato collapsed (texto; flamegraph.pl,
+    speedscope). modo=memoria: JSON com os pontos de alocação que mais alocaram e
+    as pilhas. Sem sessão ativa o profiler não tem custo algum.
+    """
+    global profiler
+    from config.monitoring_config import PROFILER_CONFIG
+    from utils.profiler import ProfilerAmostragem, SessaoEmAndamento, formatar_colapsado, MODOS
+
+    if modo not in MODOS:
+        raise HTTPException(status_code=400, detail=f"modo deve ser um de {list(MODOS)}")
+    if not 0 < segundos <= PROFILER_CONFIG["duracao_maxima"]:
+        raise HTTPException(
+            status_code=400, detail=f"segundos deve estar entre 0 e {PROFILER_CONFIG['duracao_maxima']:g}"
+        )
+    intervalo_ms = max(intervalo_ms, PROFILER_CONFIG["intervalo_minimo_ms"])
+
+    if profiler is None:
+        profiler = ProfilerAmostragem(PROFILER_CONFIG["top_alocacoes"], PROFILER_CONFIG["frames_alocacao"])
+    try:
+        profiler.iniciar(segundos, intervalo_ms / 1000, modo)
+    except SessaoEmAndamento as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    # a espera não bloqueia o event loop: as requisições continuam sendo atendidas e amostradas
+    resultado = await asyncio.to_thread(profiler.aguardar)
+    if "erro" in resultado:
+        raise HTTPException(status_code=500, detail=f"Erro no profiler: {resultado['erro']}")
+
+    cabecalhos = {
+        "X-Profiler-Amostras": str(resultado["amostras"]),
+        "X-Profiler-Duracao": f"{resultado['duracao_s']:.3f}",
+        "X-Profiler-Custo": f"{resultado['custo_amostragem']:.6f}",
+    }
+    if modo == "cpu":
+        return PlainTextResponse(formatar_colapsado(resultado["pilhas"]), headers=cabecalhos)
+    return JSONResponse(
+        {
+            "amostras": resultado["amostras"],
+            "duracao_s": resultado["duracao_s"],
+            "pico_bytes": resultado["pico_bytes"],
+            "alocacoes_retidas": resultado["alocacoes_retidas"],
+            "pilhas": formatar_colapsado(resultado["pilhas"]).splitlines(),
+        },
+        headers=cabecalhos,
+    )
+
+
+@app.get("/sombra/status", tags=["Administração"])
+async def status_sombra():
+    """Estado do shadow scoring: versões, fila, amostras pontuadas, discordâncias e descartes"""
+    if avaliador_sombra is None:
+        return {"ativo": False}
+    return {"ativo": True, **avaliador_sombra.status()}
+
+
 @app.post("/recarregar", tags=["Administração"])
 async def recarregar_dados():
     """
@@ -360,6 +813,7 @@ async def recarregar_dados():
     logger.info("Solicitação de recarga de dados")
     carregar_predicoes()
     metricas_ml_ok = carregar_metricas_modelo()
+    monitoramento_online_ok = carregar_monitoramento_online()
     
     if predicoes_df is None:
         logger.error("Falha ao recarregar dados")
@@ -374,10 +828,14 @@ async def recarregar_dados():
     return {
         'status': 'Dados recarregados com sucesso',
         'total_registros': total,
-        'metricas_ml_carregadas': metricas_ml_ok
+        'metricas_ml_carregadas': metricas_ml_ok,
+        'monitoramento_online_carregado': monitoramento_online_ok
     }
 
 
+relatorio_inicializacao.concluir_importacao()
+
+
 if __name__ == "__main__":
     import uvicorn
     logger.info("Iniciando servidor Uvicorn")
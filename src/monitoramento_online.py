@@ -0,0 +1,105 @@
+"""
+Script de monitoramento online: junta rótulos reais às predições servidas
+
+Lê um arquivo com rótulos (`id_cliente`, `saiu`) em lotes, junta cada lote às
+predições armazenadas em outputs/predicoes.csv e atualiza a janela deslizante do
+monitor (contagens da matriz de confusão + histogramas da AUC), sem reler
+rótulos anteriores. As métricas online são exportadas no Prometheus e o estado
+fica em ONLINE_MONITORING_CONFIG["estado_path"] (carregado também pela API).
+
+Uso:
+    python src/monitoramento_online.py data/raw/dados_novos_1.csv
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Adicionar src ao path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import setup_logger, logger
+from utils.metrics import update_online_metrics, model_online_labels_unmatched
+from utils.monitoramento_online import MonitorOnline, juntar_rotulos
+from config.monitoring_config import ONLINE_MONITORING_CONFIG
+setup_logger("monitoring")
+
+PREDICOES_PATH = Path("outputs/predicoes.csv")
+METADATA_PATH = Path("outputs/model_metadata.json")
+
+
+def carregar_limiar(metadata_path=METADATA_PATH) -> float:
+    """Limiar de decisão do modelo em produção (0.5 se os metadados não o tiverem)"""
+    if metadata_path.exists():
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        if metadata.get("limiar_decisao") is not None:
+            return float(metadata["limiar_decisao"])
+    logger.warning("Limiar de decisão não encontrado nos metadados - usando 0.5")
+    return 0.5
+
+
+def processar_rotulos(arquivo_rotulos, tamanho_lote=None) -> dict:
+    """
+    Junta os rótulos do arquivo às predições e atualiza o monitor
+
+    Args:
+        arquivo_rotulos: CSV com id_cliente e saiu
+        tamanho_lote: linhas lidas por lote
+
+    Returns:
+        Métricas da janela após o processamento
+    """
+    logger.info("="*60)
+    logger.info("Iniciando monitoramento online (rótulos reais x predições)")
+    logger.info("="*60)
+
+    tamanho_lote = tamanho_lote or ONLINE_MONITORING_CONFIG["tamanho_lote"]
+    estado_path = ONLINE_MONITORING_CONFIG["estado_path"]
+
+    logger.info(f"Etapa 1: Carregando predições de: {PREDICOES_PATH}")
+    predicoes = pd.read_csv(PREDICOES_PATH, usecols=["id_cliente", "preds"], index_col="id_cliente")["preds"]
+    limiar = carregar_limiar()
+    logger.success(f"Predições carregadas: {len(predicoes)} clientes | limiar {limiar:.4f}")
+
+    monitor = MonitorOnline.carregar(
+        estado_path, ONLINE_MONITORING_CONFIG["janela"], ONLINE_MONITORING_CONFIG["n_faixas"]
+    )
+    logger.info(f"Estado do monitor: {monitor.tamanho}/{monitor.janela} predições rotuladas na janela")
+
+    logger.info(f"Etapa 2: Juntando rótulos de: {arquivo_rotulos}")
+    adicionados, sem_predicao = 0, 0
+    for lote in pd.read_csv(arquivo_rotulos, usecols=["id_cliente", "saiu"], chunksize=tamanho_lote):
+        ids, proba, rotulo, n_sem_predicao = juntar_rotulos(predicoes, lote)
+        adicionados += monitor.atualizar(ids, proba, rotulo, limiar)
+        sem_predicao += n_sem_predicao
+    logger.success(f"Rótulos juntados: {adicionados} novos | {sem_predicao} sem predição correspondente")
+
+    logger.info("Etapa 3: Atualizando métricas online")
+    metricas = monitor.metricas()
+    update_online_metrics(metricas)
+    model_online_labels_unmatched.set(sem_predicao)
+    for nome in ("f2_score", "precisão", "recall", "auc"):
+        logger.info(f"  {nome}: {metricas[nome]:.4f}")
+    logger.info(f"  amostras na janela: {metricas['amostras']}")
+
+    monitor.salvar(estado_path)
+    logger.success(f"Estado do monitor salvo em: {estado_path}")
+
+    logger.info("="*60)
+    logger.success("MONITORAMENTO ONLINE CONCLUÍDO!")
+    logger.info("="*60)
+    return metricas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Junta rótulos reais às predições e atualiza as métricas online")
+    parser.add_argument(
+        "arquivo", nargs="?", default="data/raw/dados_novos_1.csv",
+        help="arquivo com id_cliente e saiu (padrão: data/raw/dados_novos_1.csv)"
+    )
+    parser.add_argument("--tamanho-lote", type=int, default=None, help="linhas lidas por lote")
+    args = parser.parse_args()
+
+    processar_rotulos(args.arquivo, args.tamanho_lote)
@@ -2,9 +2,9 @@
 # ! pip install pandas numpy scikit-learn imbalanced-learn
 
 # libs 
+import json
 import numpy as np
 import pandas as pd
-import joblib
 import sys
 from pathlib import Path
 
@@ -16,42 +16,115 @@ from utils.logger import setup_logger, logger
 from utils.metrics import (
     MODEL_PREDICTIONS_TOTAL,
     update_churn_distribution_metrics,
-    CHURN_SCORE_AVERAGE
+    CHURN_SCORE_AVERAGE,
+    prediction_rows_rescored,
+    prediction_rows_skipped,
 )
+from utils.incremental import (
+    calcular_fingerprints,
+    resolver_versao_modelo,
+    carregar_estado,
+    selecionar_para_rescore,
+    salvar_fingerprints,
+)
+from utils.model_loader import carregar_modelo
+from config.monitoring_config import PREDICTION_CONFIG
 setup_logger("prediction")
 
+# argumentos: python src/predicao.py [arquivo_dados] [--incremental] [--modelo=principal|compacto]
+args = [a for a in sys.argv[1:] if not a.startswith("--")]
+arquivo_dados = args[0] if args else "data/raw/dados_novos_1.csv"
+modo_incremental = "--incremental" in sys.argv or PREDICTION_CONFIG["incremental"]
+
+# modelo: "principal" ou "compacto" (PREDICAO_MODELO ou --modelo=compacto)
+modelo_escolhido = next(
+    (a.split("=", 1)[1] for a in sys.argv[1:] if a.startswith("--modelo=")),
+    PREDICTION_CONFIG["modelo"],
+)
+if modelo_escolhido not in PREDICTION_CONFIG["modelos"]:
+    raise ValueError(f"Modelo inválido: {modelo_escolhido}. Use: {list(PREDICTION_CONFIG['modelos'])}")
+model_path = PREDICTION_CONFIG["modelos"][modelo_escolhido]
+metadata_path = "outputs/model_metadata.json"
+output_path = "outputs/predicoes.csv"
+fingerprints_path = PREDICTION_CONFIG["fingerprints_path"]
+
 logger.info("="*60)
 logger.info("Iniciando script de predição")
 logger.info("="*60)
+logger.info(f"Modo incremental: {'ativado' if modo_incremental else 'desativado'}")
+logger.info(f"Modelo: {modelo_escolhido} ({model_path})")
 
 # config
 from sklearn import set_config
 set_config(transform_output="pandas")
 
 # carregar dados
-logger.info("Etapa 1: Carregando dados novos")
-dt = pd.read_csv("data/raw/dados_novos_1.csv", index_col="id_cliente")
+logger.info(f"Etapa 1: Carregando dados novos de: {arquivo_dados}")
+dt = pd.read_csv(arquivo_dados, index_col="id_cliente")
 X = dt.drop("saiu", axis=1)
 y = dt["saiu"]
 logger.success(f"Dados carregados: {X.shape[0]} amostras, {X.shape[1]} features")
 
-# carregar pipeline do modelo
-logger.info("Etapa 2: Carregando modelo treinado")
-pipeline = joblib.load("models/pipeline_modelo_treinado.joblib")
-logger.success("Modelo carregado com sucesso")
-
-# fazer predições
-logger.info("Etapa 3: Realizando predições")
-preds = pipeline.predict_proba(X)[:,1]
-logger.success(f"Predições realizadas para {len(preds)} clientes")
-
-# Atualizar contador de predições
+# o warm start sem TRAINING_COMPACT_MODEL=true deixa o compacto anterior desatualizado
+if modelo_escolhido == "compacto" and Path(metadata_path).exists():
+    compacto = json.loads(Path(metadata_path).read_text(encoding="utf-8")).get("modelo_compacto") or {}
+    if compacto.get("valido") is False:
+        raise ValueError(
+            f"Modelo compacto desatualizado (gerado para a versão {compacto.get('versao_professor')}). "
+            "Regenere-o com TRAINING_COMPACT_MODEL=true (treinamento.py ou warm start)"
+        )
+
+# fingerprints por cliente + versão do modelo
+versao_modelo = resolver_versao_modelo(metadata_path, model_path)
+if modelo_escolhido != "principal":
+    # o snapshot incremental de um modelo não vale para o outro
+    versao_modelo = f"{versao_modelo}:{modelo_escolhido}"
+fingerprints = calcular_fingerprints(X)
+
+preds_anteriores, fingerprints_anteriores = None, None
+if modo_incremental:
+    preds_anteriores, fingerprints_anteriores = carregar_estado(
+        fingerprints_path, output_path, versao_modelo
+    )
+    if fingerprints_anteriores is None:
+        logger.warning(
+            f"Nenhum snapshot válido para o modelo {versao_modelo} - reprocessando todos os clientes"
+        )
+
+mascara_rescore = selecionar_para_rescore(fingerprints, fingerprints_anteriores)
+X_rescore = X[mascara_rescore]
+n_ignorados = int((~mascara_rescore).sum())
+logger.info(f"Clientes a reprocessar: {len(X_rescore)} | Sem alteração (ignorados): {n_ignorados}")
+
+# carregar pipeline do modelo e fazer predições (apenas se houver o que reprocessar)
+preds = np.empty(0)
+if len(X_rescore) > 0:
+    logger.info("Etapa 2: Carregando modelo treinado")
+    pipeline = carregar_modelo(model_path)
+    logger.success(f"Modelo carregado com sucesso (versão {versao_modelo})")
+
+    logger.info("Etapa 3: Realizando predições")
+    preds = pipeline.predict_proba(X_rescore)[:,1]
+    logger.success(f"Predições realizadas para {len(preds)} clientes")
+else:
+    logger.info("Etapas 2-3: Nenhum cliente novo ou alterado - modelo não carregado")
+
+# Atualizar contadores de predições
 MODEL_PREDICTIONS_TOTAL.labels(endpoint='batch').inc(len(preds))
+prediction_rows_rescored.set(len(preds))
+prediction_rows_skipped.set(n_ignorados)
 logger.debug(f"Contador de predições incrementado: +{len(preds)}")
 
 # preds para DataFrame
 logger.info("Etapa 4: Processando resultados")
-df_preds = pd.DataFrame(preds, index=X.index, columns=["preds"])
+df_preds = pd.DataFrame(preds, index=X_rescore.index, columns=["preds"])
+
+# mesclar com o snapshot anterior (clientes não alterados mantêm o score)
+if preds_anteriores is not None:
+    mantidos = preds_anteriores.drop(df_preds.index, errors="ignore")
+    df_preds = pd.concat([mantidos, df_preds])
+    df_preds.index.name = X.index.name
+    logger.info(f"Snapshot mesclado: {len(mantidos)} mantidos + {len(X_rescore)} reprocessados")
 
 # classificação de risco
 condicoes = [
@@ -79,10 +152,26 @@ CHURN_SCORE_AVERAGE.set(score_medio)
 logger.success("Métricas de distribuição de risco atualizadas no Prometheus")
 
 # salvar em .CSV
-output_path = "outputs/predicoes.csv"
 df_preds.to_csv(output_path)
 logger.success(f"Predições salvas em: {output_path}")
 
+# salvar fingerprints para a próxima execução incremental
+salvar_fingerprints(fingerprints_path, fingerprints, versao_modelo, fingerprints_anteriores)
+logger.success(f"Fingerprints salvos em: {fingerprints_path}")
+
+# snapshot no registro local: a API pode voltar a este snapshot sem reprocessar
+from config.monitoring_config import REGISTRY_CONFIG
+if REGISTRY_CONFIG["ativo"]:
+    from utils.registro import RegistroModelos
+    registro = RegistroModelos(REGISTRY_CONFIG["diretorio"])
+    snapshot = registro.registrar_snapshot(
+        versao_modelo,
+        {"predicoes": output_path, "fingerprints": fingerprints_path},
+        metadata={"arquivo_dados": str(arquivo_dados), "modelo": modelo_escolhido},
+    )
+    registro.definir_atual(snapshot["id"], motivo="predicao")
+    logger.success(f"Snapshot registrado como atual: {snapshot['id']} (modelo {versao_modelo})")
+
 logger.info("="*60)
 logger.success("PREDIÇÃO CONCLUÍDA COM SUCESSO!")
 logger.info("="*60)
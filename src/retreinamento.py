@@ -1,8 +1,13 @@
 """
 Script para retreinamento do modelo com novos dados
 """
+import argparse
+import json
+import time
+import numpy as np
 import pandas as pd
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Adicionar src ao path
@@ -10,9 +15,16 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 # Configurar logging e métricas
 from utils.logger import setup_logger, logger
-from utils.metrics import MODEL_RETRAINING_TOTAL
+from utils.metrics import MODEL_RETRAINING_TOTAL, MODEL_TRAINING_DURATION, set_model_version
+from config.monitoring_config import (
+    RETRAINING_CONFIG, DATA_STORE_CONFIG, REGISTRY_CONFIG, TRAINING_CONFIG, PARALLELISM_CONFIG
+)
 setup_logger("retraining")
 
+MODEL_PATH = "models/pipeline_modelo_treinado.joblib"
+COMPACTO_PATH = "models/pipeline_modelo_compacto.joblib"
+METADATA_PATH = Path("outputs/model_metadata.json")
+
 def retreinar_com_novos_dados(arquivo_novos_dados="data/raw/dados_novos_1.csv"):
     """
     Combina dados de treino existentes com novos dados e prepara para retreino
@@ -60,6 +72,8 @@ def retreinar_com_novos_dados(arquivo_novos_dados="data/raw/dados_novos_1.csv"):
     dados_combinados.to_csv("data/raw/dados_treino.csv", index=False)
     logger.success("Arquivo atualizado: data/raw/dados_treino.csv")
     
+    atualizar_doadores(dados_novos.set_index("id_cliente"))
+
     # Incrementar contador de retreinamentos
     MODEL_RETRAINING_TOTAL.inc()
     logger.debug("Contador de retreinamentos incrementado")
@@ -71,11 +85,366 @@ def retreinar_com_novos_dados(arquivo_novos_dados="data/raw/dados_novos_1.csv"):
     logger.info("   python src/treinamento.py")
     logger.info("="*60)
 
+
+def ingerir_no_armazem(arquivo_novos_dados="data/raw/dados_novos_1.csv"):
+    """
+    Ingere novos dados no armazém append-only (alternativa ao CSV único)
+
+    Apenas o lote novo é lido e gravado: duplicatas são rejeitadas pelo índice
+    de hashes e nenhuma partição existente é reescrita. Na primeira execução o
+    armazém é inicializado com data/raw/dados_treino.csv.
+
+    Args:
+        arquivo_novos_dados: caminho para o arquivo com novos dados
+
+    Returns:
+        Dicionário com o resumo da ingestão
+    """
+    from utils.data_store import ArmazemDados
+
+    logger.info("="*60)
+    logger.info("Iniciando ingestão no armazém de dados")
+    logger.info("="*60)
+
+    armazem = ArmazemDados(DATA_STORE_CONFIG["diretorio"])
+    if armazem.vazio:
+        logger.info("Etapa 1: Inicializando armazém com data/raw/dados_treino.csv")
+        armazem.ingerir(
+            pd.read_csv("data/raw/dados_treino.csv", index_col="id_cliente"),
+            origem="data/raw/dados_treino.csv",
+        )
+
+    logger.info(f"Etapa 2: Ingerindo novos dados de: {arquivo_novos_dados}")
+    dados_novos = pd.read_csv(arquivo_novos_dados, index_col="id_cliente")
+    resumo = armazem.ingerir(dados_novos, origem=arquivo_novos_dados)
+
+    if resumo["duplicadas_no_lote"] or resumo["duplicadas_existentes"]:
+        logger.warning(
+            f"Duplicatas rejeitadas: {resumo['duplicadas_no_lote'] + resumo['duplicadas_existentes']}"
+        )
+    logger.success(f"Armazém na versão {resumo['versao']} ({resumo['linhas_gravadas']} linhas novas)")
+    if resumo["linhas_gravadas"]:
+        atualizar_doadores(dados_novos, fonte="armazem")
+
+    MODEL_RETRAINING_TOTAL.inc()
+
+    logger.info("="*60)
+    logger.success("DADOS PREPARADOS PARA RETREINO!")
+    logger.info("="*60)
+    logger.info("Próximo passo: Execute o script de treinamento:")
+    logger.info("   TRAINING_DATA_SOURCE=armazem python src/treinamento.py")
+    logger.info("="*60)
+    return resumo
+
+
+def anexar_ao_csv_treino(arquivo_novos_dados="data/raw/dados_novos_1.csv"):
+    """
+    Anexa o lote novo ao final de data/raw/dados_treino.csv (modo warm start)
+
+    Apenas o lote é lido e escrito: o histórico não é relido nem reescrito. As
+    duplicatas dentro do lote são removidas; duplicatas em relação ao histórico só
+    são rejeitadas pelo armazém (`--armazem`), que mantém um índice de hashes.
+
+    Args:
+        arquivo_novos_dados: caminho para o arquivo com novos dados
+    """
+    logger.info(f"Anexando novos dados de {arquivo_novos_dados} a data/raw/dados_treino.csv")
+    colunas = pd.read_csv("data/raw/dados_treino.csv", nrows=0).columns
+    dados_novos = pd.read_csv(arquivo_novos_dados).drop_duplicates()
+    dados_novos[colunas].to_csv("data/raw/dados_treino.csv", mode="a", header=False, index=False)
+    logger.success(f"{len(dados_novos)} registros anexados")
+
+    atualizar_doadores(dados_novos.set_index("id_cliente"))
+    MODEL_RETRAINING_TOTAL.inc()
+
+
+def _iterar_historico(fonte=None):
+    """Histórico completo em lotes, da fonte informada ou configurada (CSV ou armazém)"""
+    from utils.data_store import ArmazemDados
+    from utils.training_data import iterar_csv
+
+    if (fonte or DATA_STORE_CONFIG["fonte"]) == "armazem":
+        return ArmazemDados(DATA_STORE_CONFIG["diretorio"]).iterar()
+    return iterar_csv("data/raw/dados_treino.csv")
+
+
+def _reservatorio_doadores():
+    from utils.reservatorio import ReservatorioDoadores
+
+    return ReservatorioDoadores(RETRAINING_CONFIG["diretorio_doadores"], RETRAINING_CONFIG["doadores_imputacao"])
+
+
+def atualizar_doadores(dados_novos, fonte=None):
+    """
+    Atualiza o reservatório de doadores com o lote recém-ingerido (O(lote + reservatório))
+
+    Na primeira execução o reservatório é construído a partir do histórico, que
+    nesse momento já inclui o lote.
+    """
+    reservatorio = _reservatorio_doadores()
+    if reservatorio.existe:
+        reservatorio.atualizar(dados_novos)
+    else:
+        logger.info("Construindo o reservatório de doadores a partir do histórico (apenas na primeira vez)")
+        reservatorio.inicializar(_iterar_historico(fonte))
+
+
+def doadores_imputacao(dados_novos):
+    """
+    Doadores da imputação: o reservatório persistente sem as linhas do lote novo
+
+    O lote já entrou no reservatório na ingestão; suas linhas são removidas pelo
+    hash de linha. Custo O(reservatório + lote), independente do histórico.
+
+    Args:
+        dados_novos: lote novo (indexado por id_cliente)
+
+    Returns:
+        DataFrame com os doadores (vazio se o histórico só tiver o lote novo)
+    """
+    from utils.data_store import hash_linhas
+
+    reservatorio = _reservatorio_doadores()
+    if not reservatorio.existe:
+        atualizar_doadores(dados_novos)
+    doadores = reservatorio.carregar()
+    doadores = doadores[~np.isin(hash_linhas(doadores), np.unique(hash_linhas(dados_novos)))]
+    estado = reservatorio.estado()
+    logger.info(
+        f"Doadores do reservatório ({reservatorio.diretorio}): {len(doadores)} linhas "
+        f"de {estado['vistos']} vistas no histórico"
+    )
+    return doadores
+
+
+def retreinar_warm_start(arquivo_novos_dados, fracao_substituicao=None, crescer=False):
+    """
+    Atualiza o modelo atual com warm start, sem re-treinar do zero
+
+    - Atualiza as estatísticas de imputação com os dados novos + os doadores do
+      reservatório persistente (`RETRAINING_IMPUTATION_DONORS` linhas, amostra
+      uniforme de todo o histórico, atualizada a cada ingestão), sem as linhas do
+      lote novo. As transformações (PowerTransformer, encoders, escalas) ficam
+      congeladas, pois definem o espaço de features das árvores já existentes.
+    - Ajusta `fracao_substituicao` x n_árvores novas árvores apenas sobre os dados
+      novos (warm_start=True), removendo o mesmo número das árvores mais antigas
+      (ou mantendo todas, se `crescer=True`).
+    - Salva uma nova versão do modelo e seus metadados.
+    - Com `TRAINING_COMPACT_MODEL=true`, regenera o modelo compacto a partir do
+      modelo atualizado (destilação sobre os dados novos + amostra do histórico);
+      caso contrário, o compacto anterior é marcado como desatualizado nos metadados.
+
+    O custo é proporcional ao tamanho dos dados novos, não ao histórico completo.
+
+    Args:
+        arquivo_novos_dados: caminho para o arquivo com novos dados
+        fracao_substituicao: fração da floresta ajustada com os dados novos
+        crescer: se True, adiciona as árvores novas sem remover as antigas
+
+    Returns:
+        Dicionário com os metadados da nova versão
+    """
+    from sklearn import set_config
+    from sklearn.base import clone
+    from utils.model_loader import carregar_modelo, salvar_modelo_mmap, caminho_mmap
+    set_config(transform_output="pandas")
+
+    if fracao_substituicao is None:
+        fracao_substituicao = RETRAINING_CONFIG["fracao_substituicao"]
+    if not 0.0 < fracao_substituicao <= 1.0:
+        raise ValueError("fracao_substituicao deve estar no intervalo (0.0, 1.0]")
+
+    logger.info("="*60)
+    logger.info("Iniciando retreinamento incremental (warm start)")
+    logger.info("="*60)
+    inicio = time.time()
+
+    # Carregar modelo atual (joblib: arrays graváveis para o ajuste)
+    logger.info("Etapa 1: Carregando modelo atual")
+    pipeline = carregar_modelo(MODEL_PATH, usar_mmap=False)
+    metadata_anterior = {}
+    if METADATA_PATH.exists():
+        metadata_anterior = json.loads(METADATA_PATH.read_text(encoding="utf-8"))
+    versao_anterior = metadata_anterior.get("model_version")
+    logger.success(f"Modelo atual carregado (versão {versao_anterior})")
+
+    # Dados novos
+    logger.info(f"Etapa 2: Carregando novos dados de: {arquivo_novos_dados}")
+    dados_novos = pd.read_csv(arquivo_novos_dados, index_col="id_cliente")
+    X_novos = dados_novos.drop("saiu", axis=1)
+    y_novos = dados_novos["saiu"]
+    logger.success(f"Registros novos: {len(dados_novos)}")
+
+    # Atualizar estatísticas de imputação
+    logger.info("Etapa 3: Atualizando estatísticas de imputação")
+    amostra_historico = doadores_imputacao(dados_novos)
+    X_imputacao = pd.concat([X_novos, amostra_historico.drop("saiu", axis=1)])
+    imputacao = clone(pipeline.named_steps["imputation"]).fit(X_imputacao)
+    pipeline.steps[0] = ("imputation", imputacao)
+    logger.success(
+        f"Imputadores reajustados com {len(X_imputacao)} registros "
+        f"({len(dados_novos)} novos + {len(amostra_historico)} do histórico)"
+    )
+
+    # Transformar dados novos com as transformações congeladas e balancear
+    logger.info("Etapa 4: Transformando e balanceando dados novos")
+    # Aplica todas as etapas intermediárias com transform (inclui as do modo de baixa memória);
+    # samplers (SMOTE) só atuam no fit
+    Xt = X_novos
+    for _, etapa in pipeline.steps[:-1]:
+        if hasattr(etapa, "transform"):
+            Xt = etapa.transform(Xt)
+    Xt, yt = clone(pipeline.named_steps["smote"]).fit_resample(Xt, y_novos)
+    logger.success(f"Dados novos transformados: {Xt.shape[0]} amostras, {Xt.shape[1]} features")
+
+    # Warm start da floresta
+    logger.info("Etapa 5: Warm start da floresta")
+    tt_rf = pipeline.named_steps["clf"]
+    rf = tt_rf.estimator_
+    n_atual = len(rf.estimators_)
+    n_novas = max(1, round(n_atual * fracao_substituicao))
+    n_removidas = 0 if crescer else n_novas
+
+    # As árvores mais antigas ficam no início da lista
+    rf.estimators_ = rf.estimators_[n_removidas:]
+    rf.set_params(warm_start=True, n_estimators=len(rf.estimators_) + n_novas)
+    rf.fit(Xt, yt)
+    rf.set_params(warm_start=False)
+    logger.success(
+        f"Floresta atualizada: {n_removidas} árvores removidas, {n_novas} novas | "
+        f"total {len(rf.estimators_)} (antes {n_atual})"
+    )
+    logger.info(f"Limiar de decisão mantido: {tt_rf.best_threshold_:.4f}")
+
+    duracao = time.time() - inicio
+    MODEL_TRAINING_DURATION.set(duracao)
+
+    # Salvar nova versão
+    logger.info("Etapa 6: Salvando nova versão do modelo")
+    import joblib
+    model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
+    joblib.dump(pipeline, MODEL_PATH)
+    artefato_mmap = salvar_modelo_mmap(pipeline, caminho_mmap(MODEL_PATH))
+    set_model_version(model_version)
+
+    # Modelo compacto: o aluno anterior imita o professor antigo
+    compacto_anterior = metadata_anterior.get("modelo_compacto")
+    modelo_compacto = None
+    if TRAINING_CONFIG["modelo_compacto"]:
+        logger.info("Etapa 6b: Regenerando o modelo compacto")
+        from utils.modelo_compacto import criar_modelo_compacto
+        from utils.paralelismo import planejar_paralelismo
+
+        parametros_compacto = dict(
+            metodo=TRAINING_CONFIG["compacto_metodo"],
+            n_arvores=TRAINING_CONFIG["compacto_arvores"],
+            max_depth=TRAINING_CONFIG["compacto_profundidade"],
+            random_state=42,
+        )
+        aluno = criar_modelo_compacto(
+            pipeline, X_imputacao, n_jobs=planejar_paralelismo(PARALLELISM_CONFIG["orcamento_cpu"])["orcamento"],
+            **parametros_compacto,
+        )
+        joblib.dump(aluno, COMPACTO_PATH)
+        salvar_modelo_mmap(aluno, caminho_mmap(COMPACTO_PATH))
+        modelo_compacto = {
+            **parametros_compacto,
+            "path": COMPACTO_PATH,
+            "versao_professor": model_version,
+            "amostras_destilacao": int(len(X_imputacao)),
+        }
+        logger.success(f"Modelo compacto salvo em: {COMPACTO_PATH}")
+    elif compacto_anterior:
+        modelo_compacto = {
+            **compacto_anterior,
+            "valido": False,
+            "versao_professor": compacto_anterior.get("versao_professor", versao_anterior),
+        }
+        logger.warning(
+            f"Modelo compacto desatualizado (gerado para a versão {modelo_compacto['versao_professor']}); "
+            "use TRAINING_COMPACT_MODEL=true para regenerá-lo no warm start"
+        )
+
+    metadata = dict(metadata_anterior)
+    metadata.pop("cache_treinamento", None)
+    metadata.update({
+        "model_version": model_version,
+        "training_duration_seconds": float(duracao),
+        "training_samples": int(metadata_anterior.get("training_samples", 0)) + len(dados_novos),
+        "artefato_mmap": artefato_mmap["path"],
+        "modelo_compacto": modelo_compacto,
+        "retreinamento": {
+            "modo": "warm_start",
+            "versao_anterior": versao_anterior,
+            "arquivo_novos_dados": str(arquivo_novos_dados),
+            "amostras_novas": int(len(dados_novos)),
+            "arvores_removidas": int(n_removidas),
+            "arvores_novas": int(n_novas),
+            "arvores_total": int(len(rf.estimators_)),
+            "limiar_decisao": float(tt_rf.best_threshold_),
+            # f2/auc/precisão/recall continuam sendo os da última avaliação completa
+            "metricas_da_versao": metadata_anterior.get("retreinamento", {}).get(
+                "metricas_da_versao", versao_anterior
+            ),
+        },
+    })
+    METADATA_PATH.parent.mkdir(parents=True, exist_ok=True)
+    METADATA_PATH.write_text(json.dumps(metadata, ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.success(f"Modelo salvo em: {MODEL_PATH} (versão {model_version})")
+    logger.info(f"Metadados do modelo salvos em: {METADATA_PATH}")
+
+    if REGISTRY_CONFIG["ativo"]:
+        from utils.registro import RegistroModelos
+        RegistroModelos(REGISTRY_CONFIG["diretorio"]).registrar(
+            model_version,
+            {
+                "modelo": MODEL_PATH,
+                "modelo_mmap": artefato_mmap["path"],
+                "modelo_compacto": COMPACTO_PATH if TRAINING_CONFIG["modelo_compacto"] else None,
+                "metadata": METADATA_PATH,
+            },
+            metadata={"origem": "warm_start", "versao_anterior": versao_anterior},
+        )
+
+    logger.info("="*60)
+    logger.success("RETREINAMENTO INCREMENTAL CONCLUÍDO!")
+    logger.info("="*60)
+    logger.info(f"Tempo total: {duracao:.2f}s")
+    logger.info("Obs.: métricas de validação são da última avaliação completa (treinamento.py)")
+    logger.info("="*60)
+    return metadata
+
+
 if __name__ == "__main__":
-    # Permite passar o arquivo de novos dados como argumento
-    if len(sys.argv) > 1:
-        arquivo = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Retreinamento do modelo com novos dados")
+    parser.add_argument(
+        "arquivo", nargs="?", default="data/raw/dados_novos_1.csv",
+        help="arquivo com os novos dados (padrão: data/raw/dados_novos_1.csv)"
+    )
+    parser.add_argument(
+        "--warm-start", action="store_true",
+        help="atualiza o modelo atual incrementalmente em vez de exigir um re-treino completo"
+    )
+    parser.add_argument(
+        "--fracao-substituicao", type=float, default=None,
+        help="fração da floresta ajustada com os dados novos no warm start"
+    )
+    parser.add_argument(
+        "--crescer", action="store_true",
+        help="no warm start, adiciona árvores novas sem remover as mais antigas"
+    )
+    parser.add_argument(
+        "--armazem", action="store_true",
+        help="ingere no armazém append-only em vez de reescrever data/raw/dados_treino.csv"
+    )
+    args = parser.parse_args()
+
+    if args.armazem or DATA_STORE_CONFIG["fonte"] == "armazem":
+        ingerir_no_armazem(args.arquivo)
+    elif args.warm_start:
+        # o warm start não relê o histórico: o lote é só anexado ao CSV
+        anexar_ao_csv_treino(args.arquivo)
     else:
-        arquivo = "data/raw/dados_novos_1.csv"
-    
-    retreinar_com_novos_dados(arquivo)
+        retreinar_com_novos_dados(args.arquivo)
+    if args.warm_start:
+        retreinar_warm_start(args.arquivo, args.fracao_substituicao, args.crescer)
@@ -15,24 +15,73 @@ sys.path.append(str(Path(__file__).parent.parent))
 from utils.logger import setup_logger, logger
 from utils.metrics import (
     update_model_metrics,
+    update_model_confidence_intervals,
     set_model_version,
     MODEL_TRAINING_SAMPLES,
     MODEL_TRAINING_DURATION
 )
+from utils.training_cache import CacheEtapasPipeline
+from utils.paralelismo import planejar_paralelismo, limitar_threads, MedidorCPU
+from config.monitoring_config import TRAINING_CONFIG, PARALLELISM_CONFIG
 setup_logger("training")
 
 logger.info("="*60)
 logger.info("Iniciando script de treinamento do modelo")
 logger.info("="*60)
 
+# orçamento de núcleos dividido entre CV, floresta, busca, transformadores e BLAS conforme a carga
+n_arvores, folds_limiar, folds_busca = 1000, 5, 3
+plano_paralelismo = planejar_paralelismo(
+    PARALLELISM_CONFIG["orcamento_cpu"],
+    n_arvores=n_arvores,
+    n_folds=folds_limiar,
+    tarefas_busca=TRAINING_CONFIG["busca_candidatos"] * folds_busca if TRAINING_CONFIG["busca_hiperparametros"] else 0,
+)
+logger.info(
+    f"Paralelismo: orçamento {plano_paralelismo['orcamento']} núcleos | "
+    f"CV={plano_paralelismo['cv']} floresta={plano_paralelismo['floresta']} "
+    f"busca={plano_paralelismo['busca']}x{plano_paralelismo['floresta_busca']} "
+    f"transformadores={plano_paralelismo['transformadores']} BLAS={plano_paralelismo['blas']}"
+)
+limitar_threads(plano_paralelismo)
+medidor_cpu = MedidorCPU(plano_paralelismo["orcamento"])
+
 # setar todas as saídas para DataFrames Pandas
 from sklearn import set_config
 set_config(transform_output="pandas")
 
 # dados
 logger.info("Etapa 1: Carregamento dos dados")
-dt = pd.read_csv("data/raw/dados_treino.csv", index_col="id_cliente")
-X = dt.drop("saiu", axis=1)
+from utils.training_data import carregar_dados_treino, iterar_csv
+from config.monitoring_config import DATA_STORE_CONFIG
+
+if DATA_STORE_CONFIG["fonte"] == "armazem":
+    from utils.data_store import ArmazemDados
+    armazem = ArmazemDados(DATA_STORE_CONFIG["diretorio"])
+    versao_dados = DATA_STORE_CONFIG["versao"] or armazem.versao
+    coluna_tempo = TRAINING_CONFIG["coluna_tempo"] if TRAINING_CONFIG["janela_dias"] else None
+    lotes = armazem.iterar(versao_dados, coluna_tempo=coluna_tempo)
+    logger.info(f"Fonte: armazém {DATA_STORE_CONFIG['diretorio']} (versão {versao_dados})")
+else:
+    versao_dados = None
+    lotes = iterar_csv("data/raw/dados_treino.csv", chunksize=TRAINING_CONFIG["tamanho_lote_leitura"])
+
+politica_dados = TRAINING_CONFIG["politica_dados"]
+dt, info_dados = carregar_dados_treino(
+    lotes,
+    politica=politica_dados,
+    janela_linhas=TRAINING_CONFIG["janela_linhas"],
+    janela_dias=TRAINING_CONFIG["janela_dias"],
+    coluna_tempo=TRAINING_CONFIG["coluna_tempo"],
+    tamanho_amostra=TRAINING_CONFIG["tamanho_amostra"],
+    seed=TRAINING_CONFIG["random_state"],
+)
+logger.info(
+    f"Política de dados '{politica_dados}': {info_dados['linhas_selecionadas']} de "
+    f"{info_dados['linhas_lidas']} registros selecionados"
+)
+info_dados["versao_dados"] = versao_dados
+X = dt.drop(columns=["saiu", TRAINING_CONFIG["coluna_tempo"]], errors="ignore")
 y = dt["saiu"]
 logger.success(f"Dados carregados: {X.shape[0]} amostras, {X.shape[1]} features")
 logger.debug(f"Distribuição da variável alvo: {y.value_counts().to_dict()}")
@@ -46,24 +95,35 @@ ordinal = ["anos_cliente", "numero_produtos"]
 logger.info("Etapa 2: Divisão treino-teste (85/15)")
 from sklearn.model_selection import train_test_split
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, shuffle=True, stratify=y, test_size=0.15)
+X_train, X_test, y_train, y_test = train_test_split(
+    X, y, shuffle=True, stratify=y, test_size=0.15, random_state=TRAINING_CONFIG["random_state"]
+)
 logger.success(f"Treino: {X_train.shape[0]} amostras | Teste: {X_test.shape[0]} amostras")
 
 # imputação de valores ausentes
 logger.info("Etapa 3: Configuração de imputação de valores ausentes")
-from sklearn.impute import SimpleImputer, KNNImputer
+from sklearn.impute import SimpleImputer
 from sklearn.compose import ColumnTransformer
+from utils.imputacao import criar_imputador_numerico
+
+imputador_numerico = criar_imputador_numerico(
+    TRAINING_CONFIG["imputacao"],
+    n_neighbors=10,
+    max_referencia=TRAINING_CONFIG["imputacao_max_referencia"],
+)
 
 imputers = ColumnTransformer(
     transformers=[
-        ("imp_num", KNNImputer(n_neighbors=10), numerical),
+        ("imp_num", imputador_numerico, numerical),
         ("imp_cat", SimpleImputer(strategy="most_frequent"), categorical + ordinal),
     ],
     remainder="drop", 
-    n_jobs=-1, 
+    n_jobs=plano_paralelismo["transformadores"], 
     verbose_feature_names_out=False
 )
-logger.debug("Imputers configurados: KNN para numéricos, Moda para categóricos")
+logger.debug(
+    f"Imputers configurados: {type(imputador_numerico).__name__} para numéricos, Moda para categóricos"
+)
 
 # transformações
 logger.info("Etapa 4: Configuração de transformações")
@@ -82,7 +142,7 @@ transformers = ColumnTransformer(
         ("ordinal", TargetEncoder(cv=10), ordinal)
     ],
     remainder="drop", 
-    n_jobs=-1, 
+    n_jobs=plano_paralelismo["transformadores"], 
     verbose_feature_names_out=True
 )
 
@@ -100,7 +160,7 @@ logger.info("Etapa 6: Configuração do modelo RandomForest")
 from sklearn.ensemble import RandomForestClassifier
 
 rf = RandomForestClassifier(
-    n_estimators=1000,              
+    n_estimators=n_arvores,         
     criterion="gini",               
     max_depth=20,                   
     min_samples_leaf=5,             
@@ -108,7 +168,7 @@ rf = RandomForestClassifier(
     max_features="sqrt",            
     class_weight="balanced",        
     random_state=42,                
-    n_jobs=-1                       
+    n_jobs=plano_paralelismo["floresta"]
 )
 logger.debug("RandomForest: 1000 árvores, max_depth=20, balanced")
 
@@ -119,28 +179,94 @@ from sklearn.metrics import make_scorer, fbeta_score
 tt_rf = TunedThresholdClassifierCV(
      rf, 
      scoring=make_scorer(fbeta_score, beta=2, average="weighted"), 
-     cv=5
+     cv=folds_limiar,
+     n_jobs=plano_paralelismo["cv"]
      )
 
+# cache das etapas de pré-processamento (reuso entre execuções e ajustes)
+baixa_memoria = TRAINING_CONFIG["baixa_memoria"]
+cache_pipeline = CacheEtapasPipeline(
+    TRAINING_CONFIG["cache_dir"] if TRAINING_CONFIG["cache_ativo"] else None,
+    medir_memoria=baixa_memoria,
+)
+logger.debug(f"Cache do pipeline: {cache_pipeline.location or 'desativado'}")
+
 # pipeline
 logger.info("Etapa 7: Montagem do pipeline completo")
+etapas_float32, etapas_poda = [], []
+if baixa_memoria:
+    # float32 antes do PolynomialFeatures e poda de colunas antes do SMOTE
+    from utils.reducao_memoria import etapas_conversao_float32, etapas_poda_colunas
+    etapas_float32 = etapas_conversao_float32()
+    etapas_poda = etapas_poda_colunas(
+        poda_importancia=TRAINING_CONFIG["poda_importancia"], random_state=42,
+        n_jobs=plano_paralelismo["orcamento"]
+    )
+    logger.info(f"Modo de baixa memória: etapas extras {[n for n, _ in etapas_float32 + etapas_poda]}")
+
 pipeline = Pipeline(
     steps=[
         ("imputation", imputers),
         ("transformation", transformers),
+        *etapas_float32,
         ("poly", poly),
+        *etapas_poda,
         ("smote", smote),
         ("clf", tt_rf)
-    ]
+    ],
+    memory=cache_pipeline
 )
 logger.success("Pipeline montado com sucesso")
 
+import time
+
+# busca de hiperparâmetros (opcional): successive halving sobre o mesmo pipeline,
+# com o RandomForest sem ajuste de limiar e score F2 no melhor limiar
+busca = None
+if TRAINING_CONFIG["busca_hiperparametros"]:
+    logger.info("Etapa 7b: Busca de hiperparâmetros por successive halving")
+    from sklearn.base import clone
+    from utils.busca_hiperparametros import buscar_hiperparametros, melhores_parametros
+
+    inicio_busca = time.time()
+    # candidatos em paralelo (processos) e floresta de cada candidato com o que sobra do orçamento;
+    # o cache dos workers só compartilha o disco, sem medições de memória
+    rf_busca = clone(rf).set_params(n_jobs=plano_paralelismo["floresta_busca"])
+    pipeline_busca = Pipeline(
+        steps=pipeline.steps[:-1] + [("clf", rf_busca)],
+        memory=CacheEtapasPipeline(cache_pipeline.location),
+    )
+    busca = buscar_hiperparametros(
+        pipeline_busca, X_train, y_train,
+        recurso=TRAINING_CONFIG["busca_recurso"],
+        n_candidatos=TRAINING_CONFIG["busca_candidatos"],
+        fator=TRAINING_CONFIG["busca_fator"],
+        cv=folds_busca,
+        n_jobs=plano_paralelismo["busca"],
+        random_state=TRAINING_CONFIG["random_state"],
+    )
+    duracao_busca = time.time() - inicio_busca
+    rf.set_params(**melhores_parametros(busca))
+    logger.success(f"Busca concluída em {duracao_busca:.2f}s | RandomForest: {melhores_parametros(busca)}")
+
 # treino
 logger.info("Etapa 8: Iniciando treinamento do modelo...")
-import time
 start_time = time.time()
 
 pipeline.fit(X_train, y_train)
+cache_pipeline.registrar_pico_memoria("clf")
+
+if busca is not None:
+    from utils.busca_hiperparametros import salvar_resultado_busca
+    resultado_busca = salvar_resultado_busca(
+        busca,
+        "outputs/melhores_hiperparametros.json",
+        "outputs/busca_hiperparametros.csv",
+        extras={
+            "limiar_f2": float(pipeline.named_steps["clf"].best_threshold_),
+            "duracao_busca_segundos": round(duracao_busca, 2),
+        },
+    )
 
 training_duration = time.time() - start_time
 logger.success(f"Treinamento concluído em {training_duration:.2f} segundos")
@@ -149,24 +275,28 @@ logger.success(f"Treinamento concluído em {training_duration:.2f} segundos")
 MODEL_TRAINING_DURATION.set(training_duration)
 logger.debug(f"Métrica Prometheus atualizada: training_duration={training_duration:.2f}s")
 
-# métricas de validação
+# métricas de validação: uma única passada pelo pipeline; rótulos = proba >= limiar ajustado
 logger.info("Etapa 9: Calculando métricas de validação")
-from sklearn.metrics import precision_score, recall_score, roc_auc_score
+from utils.avaliacao import avaliar_modelo
 
-y_pred_rf = pipeline.predict(X_test)
+limiar_decisao = float(pipeline.named_steps["clf"].best_threshold_)
 y_pred_proba_rf = pipeline.predict_proba(X_test)[:,1]
 
-metricas = {
-    "f1_score":fbeta_score(y_test, y_pred_rf, beta=1, average="weighted"),
-    "f2_score":fbeta_score(y_test, y_pred_rf, beta=2, average="weighted"),
-    "precisão":precision_score(y_test, y_pred_rf, average="weighted"),
-    "recall":recall_score(y_test, y_pred_rf, average="weighted"),
-    "auc":float(roc_auc_score(y_test, y_pred_proba_rf, average="weighted")),
-    }
+metricas_df = avaliar_modelo(
+    y_test,
+    y_pred_proba_rf,
+    limiar=limiar_decisao,
+    n_reamostragens=TRAINING_CONFIG["bootstrap_reamostragens"],
+    nivel_confianca=TRAINING_CONFIG["bootstrap_nivel"],
+    seed=TRAINING_CONFIG["random_state"],
+)
+metricas = metricas_df["Valores"].to_dict()
+com_intervalos = "IC_inferior" in metricas_df
 
-logger.info("Métricas calculadas:")
-for metric, value in metricas.items():
-    logger.info(f"  {metric}: {value:.4f}")
+logger.info(f"Métricas calculadas (limiar de decisão {limiar_decisao:.4f}):")
+for metric, linha in metricas_df.iterrows():
+    intervalo = f" [IC {linha['IC_inferior']:.4f} - {linha['IC_superior']:.4f}]" if com_intervalos else ""
+    logger.info(f"  {metric}: {linha['Valores']:.4f}{intervalo}")
 
 # Atualizar métricas do Prometheus
 update_model_metrics(
@@ -175,12 +305,10 @@ update_model_metrics(
     precision=metricas["precisão"],
     recall=metricas["recall"]
 )
+if com_intervalos:
+    update_model_confidence_intervals(metricas_df)
 logger.success("Métricas exportadas para Prometheus")
 
-metricas_df = pd.DataFrame(metricas, index=range(1)).T
-metricas_df.index.name = "Métricas"
-metricas_df.rename(columns={0: "Valores"}, inplace=True)
-
 condicoes = [
     (metricas_df['Valores'] > 0.90), 
     (metricas_df['Valores'] > 0.80), 
@@ -193,19 +321,53 @@ metricas_df['Classificação'] = np.select(condicoes, escolhas, default='Ruim')
 metricas_df.to_csv("outputs/metricas_desempenho_evasao.csv")
 logger.success("Métricas salvas em: outputs/metricas_desempenho_evasao.csv")
 
+# modelo compacto (opcional): aluno avaliado contra o professor na validação
+modelo_compacto = TRAINING_CONFIG["modelo_compacto"]
+if modelo_compacto:
+    logger.info("Etapa 9b: Modelo compacto - comparação com o modelo principal")
+    from utils.modelo_compacto import criar_modelo_compacto, relatorio_compacto
+
+    parametros_compacto = dict(
+        metodo=TRAINING_CONFIG["compacto_metodo"],
+        n_arvores=TRAINING_CONFIG["compacto_arvores"],
+        max_depth=TRAINING_CONFIG["compacto_profundidade"],
+        random_state=42,
+        n_jobs=plano_paralelismo["orcamento"],
+    )
+    aluno = criar_modelo_compacto(pipeline, X_train, **parametros_compacto)
+    relatorio_aluno = relatorio_compacto(
+        pipeline, aluno, X_test, y_test, caminho_csv="outputs/relatorio_modelo_compacto.csv"
+    )
+
 # treino final e exportar
 logger.info("Etapa 10: Treinamento final com todos os dados")
-X_final = pd.DataFrame(np.vstack((X_train, X_test)), columns=X.columns)
-y_final = pd.Series(np.concatenate((y_train.values, y_test.values)))
+X_final = pd.concat([X_train, X_test])
+y_final = pd.concat([y_train, y_test])
 
 logger.info(f"Dataset final: {X_final.shape[0]} amostras")
 pipeline.fit(X_final, y_final)
+cache_pipeline.registrar_pico_memoria("clf")
 logger.success("Treinamento final concluído")
+if baixa_memoria:
+    n_colunas_poly = pipeline.named_steps["poly"].n_output_features_
+    n_colunas_finais = pipeline.named_steps["clf"].estimator_.n_features_in_
+    logger.info(f"Colunas após poda: {n_colunas_finais} de {n_colunas_poly} geradas pelo PolynomialFeatures")
 
 # Atualizar métrica de amostras treinadas
 MODEL_TRAINING_SAMPLES.set(X_final.shape[0])
 logger.debug(f"Métrica Prometheus atualizada: training_samples={X_final.shape[0]}")
 
+# estatísticas do cache e remoção da referência ao cache antes de exportar
+estatisticas_cache = cache_pipeline.relatorio()
+cache_pipeline.finalizar()
+utilizacao_cpu = medidor_cpu.finalizar()
+logger.info(
+    f"CPU: {utilizacao_cpu['tempo_cpu_segundos']:.1f}s em {utilizacao_cpu['tempo_parede_segundos']:.1f}s | "
+    f"{utilizacao_cpu['nucleos_efetivos']:.2f} núcleos efetivos "
+    f"({utilizacao_cpu['utilizacao_orcamento']:.0%} do orçamento)"
+)
+pipeline.set_params(memory=None)
+
 import joblib
 from datetime import datetime
 model_version = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -213,6 +375,21 @@ model_path = "models/pipeline_modelo_treinado.joblib"
 joblib.dump(pipeline, model_path)
 logger.success(f"Modelo salvo em: {model_path}")
 
+# artefato para carregamento rápido via mmap (arrays grandes fora do pickle)
+from utils.model_loader import salvar_modelo_mmap, caminho_mmap
+artefato_mmap = salvar_modelo_mmap(pipeline, caminho_mmap(model_path))
+logger.success(
+    f"Artefato mmap salvo em: {artefato_mmap['path']} "
+    f"({artefato_mmap['buffers_out_of_band']} arrays fora do pickle)"
+)
+
+if modelo_compacto:
+    compacto_path = "models/pipeline_modelo_compacto.joblib"
+    aluno = criar_modelo_compacto(pipeline, X_final, **parametros_compacto)
+    joblib.dump(aluno, compacto_path)
+    salvar_modelo_mmap(aluno, caminho_mmap(compacto_path))
+    logger.success(f"Modelo compacto salvo em: {compacto_path}")
+
 # Atualizar versão do modelo no Prometheus
 set_model_version(model_version)
 logger.info(f"Versão do modelo: {model_version}")
@@ -227,6 +404,19 @@ metadata = {
     "auc": float(metricas["auc"]),
     "precision": float(metricas["precisão"]),
     "recall": float(metricas["recall"]),
+    "limiar_decisao": float(pipeline.named_steps["clf"].best_threshold_),
+    "intervalos_confianca": metricas_df.drop(columns="Classificação").to_dict(orient="index"),
+    "artefato_mmap": artefato_mmap["path"],
+    "cache_treinamento": estatisticas_cache,
+    "politica_dados_treino": info_dados,
+    "baixa_memoria": baixa_memoria,
+    "paralelismo": {**plano_paralelismo, **utilizacao_cpu},
+    "busca_hiperparametros": resultado_busca if busca is not None else None,
+    "modelo_compacto": {
+        **{k: v for k, v in parametros_compacto.items() if k != "n_jobs"},
+        "path": compacto_path,
+        "validacao": relatorio_aluno.to_dict(orient="index"),
+    } if modelo_compacto else None,
 }
 metadata_path.write_text(
     json.dumps(metadata, ensure_ascii=False, indent=2),
@@ -234,6 +424,22 @@ metadata_path.write_text(
 )
 logger.info(f"Metadados do modelo salvos em: {metadata_path}")
 
+# registro local endereçado por conteúdo (rollback sem re-treino)
+from config.monitoring_config import REGISTRY_CONFIG
+if REGISTRY_CONFIG["ativo"]:
+    from utils.registro import RegistroModelos
+    RegistroModelos(REGISTRY_CONFIG["diretorio"]).registrar(
+        model_version,
+        {
+            "modelo": model_path,
+            "modelo_mmap": artefato_mmap["path"],
+            "modelo_compacto": compacto_path if modelo_compacto else None,
+            "metadata": metadata_path,
+        },
+        metadata={"origem": "treinamento", "f2_score": metadata["f2_score"], "auc": metadata["auc"]},
+    )
+    logger.success(f"Modelo registrado em: {REGISTRY_CONFIG['diretorio']} (versão {model_version})")
+
 logger.info("="*60)
 logger.success("TREINAMENTO CONCLUÍDO COM SUCESSO!")
 logger.info("="*60)
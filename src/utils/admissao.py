@@ -0,0 +1,176 @@
+"""
+Módulo de controle de admissão da API (load shedding por requisições em andamento)
+
+`MiddlewareAdmissao` (ASGI) limita, por rota, quantas requisições executam ao mesmo
+tempo. As excedentes esperam em uma fila limitada por até `espera_maxima_ms`.
+Com a fila cheia, ou se a espera estourar, a resposta é um 503 imediato com
+Retry-After, sem executar o endpoint. Rotas prioritárias (/health, /metrics)
+nunca são descartadas.
+
+Os endpoints da API não cedem o event loop (o lookup é síncrono), então sem
+admissão a fila fica escondida no loop e cresce até os clientes desistirem. Cada
+requisição admitida cede o loop uma vez antes de executar. Assim as requisições
+que chegaram nesse meio tempo passam pela admissão, e a contagem em andamento
+reflete o backlog real.
+"""
+import asyncio
+import collections
+import json
+import time
+
+from starlette.routing import Match
+
+from utils.metrics import (
+    api_active_requests,
+    api_admission_shed_total,
+    api_admission_queued_total,
+    api_admission_queue_wait_seconds,
+    api_admission_queue_size,
+    api_admission_in_flight,
+)
+
+ROTA_NAO_ROTEADA = "nao_roteado"
+
+
+def template_rota(rotas, scope) -> str:
+    """Template da rota que atende a requisição (o middleware roda antes do roteador)"""
+    for rota in rotas:
+        correspondencia, _ = rota.matches(scope)
+        if correspondencia != Match.NONE:
+            return getattr(rota, "path", ROTA_NAO_ROTEADA)
+    return ROTA_NAO_ROTEADA
+
+
+def interpretar_limites(texto: str) -> dict:
+    """"/rota=concorrencia:fila,..." -> {rota: (concorrencia, fila)}"""
+    limites = {}
+    for item in filter(None, (parte.strip() for parte in (texto or "").split(","))):
+        rota, valores = item.rsplit("=", 1)
+        concorrencia, fila = valores.split(":")
+        limites[rota.strip()] = (int(concorrencia), int(fila))
+    return limites
+
+
+class LimiteRota:
+    """Concorrência máxima e fila de espera limitada de uma rota (usado só no event loop)"""
+
+    def __init__(self, rota: str, concorrencia: int, tamanho_fila: int):
+        self.rota = rota
+        self.concorrencia = concorrencia
+        self.tamanho_fila = tamanho_fila
+        self.em_execucao = 0
+        self.aguardando = collections.deque()
+        self._em_execucao = api_admission_in_flight.labels(route=rota)
+        self._fila = api_admission_queue_size.labels(route=rota)
+
+    async def adquirir(self, espera_maxima: float):
+        """Ocupa uma vaga; retorna None se admitida ou o motivo do descarte"""
+        if self.em_execucao < self.concorrencia and not self.aguardando:
+            self.em_execucao += 1
+            self._em_execucao.set(self.em_execucao)
+            return None
+        if len(self.aguardando) >= self.tamanho_fila:
+            return "fila_cheia"
+
+        api_admission_queued_total.labels(route=self.rota).inc()
+        vaga = asyncio.get_running_loop().create_future()
+        self.aguardando.append(vaga)
+        self._fila.set(len(self.aguardando))
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(vaga, espera_maxima)
+            return None
+        except asyncio.TimeoutError:
+            if vaga.done() and not vaga.cancelled():
+                # a vaga chegou junto com o timeout: repassa para o próximo da fila
+                self.liberar()
+            return "tempo_espera"
+        except asyncio.CancelledError:
+            if vaga.done() and not vaga.cancelled():
+                self.liberar()
+            raise
+        finally:
+            api_admission_queue_wait_seconds.labels(route=self.rota).observe(time.perf_counter() - inicio)
+            if vaga in self.aguardando:
+                self.aguardando.remove(vaga)
+            self._fila.set(len(self.aguardando))
+
+    def liberar(self):
+        """Libera a vaga (passa direto para o primeiro da fila, se houver)"""
+        while self.aguardando:
+            vaga = self.aguardando.popleft()
+            if not vaga.done():
+                vaga.set_result(True)
+                return
+        self.em_execucao -= 1
+        self._em_execucao.set(self.em_execucao)
+
+
+class MiddlewareAdmissao:
+    """
+    Middleware ASGI de controle de admissão
+
+    Args:
+        app: aplicação ASGI
+        rotas: rotas da aplicação (`app.routes`), usadas para achar o template da rota
+        limites: {rota: (concorrencia, fila)} para rotas com limites próprios
+        concorrencia_padrao: concorrência das demais rotas (cada uma com seu limite)
+        fila_padrao: fila das demais rotas
+        espera_maxima_ms: tempo máximo na fila antes do 503
+        retry_after_s: valor do header Retry-After das respostas 503
+        rotas_prioritarias: rotas que nunca passam pela admissão
+    """
+
+    def __init__(self, app, rotas, limites: dict = None, concorrencia_padrao: int = 16, fila_padrao: int = 32,
+                 espera_maxima_ms: float = 500.0, retry_after_s: int = 1, rotas_prioritarias=("/health", "/metrics")):
+        self.app = app
+        self.rotas = rotas
+        self.limites_config = limites or {}
+        self.concorrencia_padrao = concorrencia_padrao
+        self.fila_padrao = fila_padrao
+        self.espera_maxima = espera_maxima_ms / 1000
+        self.rotas_prioritarias = set(rotas_prioritarias)
+        self.limites = {}
+        self._corpo_503 = json.dumps({"detail": "Serviço sobrecarregado - tente novamente em instantes"}).encode("utf-8")
+        self._cabecalhos_503 = (
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._corpo_503)).encode("ascii")),
+            (b"retry-after", str(retry_after_s).encode("ascii")),
+        )
+
+    def _limite(self, rota: str) -> LimiteRota:
+        limite = self.limites.get(rota)
+        if limite is None:
+            concorrencia, fila = self.limites_config.get(rota, (self.concorrencia_padrao, self.fila_padrao))
+            limite = self.limites[rota] = LimiteRota(rota, concorrencia, fila)
+        return limite
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rota = template_rota(self.rotas, scope)
+        if rota in self.rotas_prioritarias:
+            await self.app(scope, receive, send)
+            return
+
+        limite = self._limite(rota)
+        motivo = await limite.adquirir(self.espera_maxima)
+        if motivo is not None:
+            api_admission_shed_total.labels(route=rota, reason=motivo).inc()
+            await send({"type": "http.response.start", "status": 503, "headers": list(self._cabecalhos_503)})
+            await send({"type": "http.response.body", "body": self._corpo_503})
+            return
+
+        api_active_requests.inc()
+        try:
+            # cede o loop: requisições já recebidas passam pela admissão antes desta executar
+            await asyncio.sleep(0)
+            await self.app(scope, receive, send)
+        finally:
+            api_active_requests.dec()
+            limite.liberar()
+
+
+__all__ = ["MiddlewareAdmissao", "LimiteRota", "interpretar_limites", "template_rota"]
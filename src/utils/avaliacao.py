@@ -0,0 +1,155 @@
+"""
+Módulo de avaliação do modelo em uma única passada com intervalos de confiança
+
+O pipeline é executado uma única vez (`predict_proba`); os rótulos saem da
+comparação da probabilidade com o limiar ajustado (`proba >= limiar`, a mesma
+regra do `TunedThresholdClassifierCV.predict`).
+
+Intervalos de confiança por bootstrap totalmente vetorizados: cada bloco de
+reamostragens é uma matriz de contagens (reamostragens × linhas) sorteada de uma
+multinomial, de modo que
+- a matriz de confusão de todas as reamostragens sai de um produto matricial
+- a AUC sai das somas de pesos positivos/negativos por grupo de score empatado
+  (estatística de Mann-Whitney ponderada), sem reordenar cada reamostragem
+"""
+import numpy as np
+import pandas as pd
+from sklearn.metrics import fbeta_score, precision_score, recall_score, roc_auc_score
+
+# nomes das métricas como aparecem em metricas_desempenho_evasao.csv
+METRICAS = ("f1_score", "f2_score", "precisão", "recall", "auc")
+
+# limite de células (reamostragens × linhas) por bloco da matriz de contagens
+CELULAS_POR_BLOCO = 5_000_000
+
+
+def metricas_pontuais(y_true, y_pred, proba) -> dict:
+    """Métricas ponderadas (average="weighted") + AUC"""
+    return {
+        "f1_score": fbeta_score(y_true, y_pred, beta=1, average="weighted"),
+        "f2_score": fbeta_score(y_true, y_pred, beta=2, average="weighted"),
+        "precisão": precision_score(y_true, y_pred, average="weighted"),
+        "recall": recall_score(y_true, y_pred, average="weighted"),
+        "auc": float(roc_auc_score(y_true, proba)),
+    }
+
+
+def _razao(numerador, denominador):
+    return np.divide(numerador, denominador, out=np.zeros_like(numerador, dtype=float), where=denominador > 0)
+
+
+def _fbeta(tp, fp, fn, beta):
+    b2 = beta ** 2
+    return _razao((1 + b2) * tp, (1 + b2) * tp + b2 * fn + fp)
+
+
+def _metricas_contagens(confusao):
+    """
+    Métricas ponderadas a partir das contagens (tp, fp, fn, tn) de cada reamostragem
+
+    Ponderar pelo suporte de cada classe reproduz o average="weighted" do scikit-learn.
+    """
+    tp, fp, fn, tn = confusao.T
+    positivos, negativos = tp + fn, tn + fp
+    total = positivos + negativos
+
+    def ponderada(classe_1, classe_0):
+        return _razao(positivos * classe_1 + negativos * classe_0, total)
+
+    return {
+        "f1_score": ponderada(_fbeta(tp, fp, fn, 1), _fbeta(tn, fn, fp, 1)),
+        "f2_score": ponderada(_fbeta(tp, fp, fn, 2), _fbeta(tn, fn, fp, 2)),
+        "precisão": ponderada(_razao(tp, tp + fp), _razao(tn, tn + fn)),
+        "recall": ponderada(_razao(tp, positivos), _razao(tn, negativos)),
+    }
+
+
+def _auc_contagens(contagens, y_ord, grupos):
+    """
+    AUC de cada reamostragem a partir da matriz de contagens (colunas ordenadas por score)
+
+    AUC = Σ_g P_g · (N_<g + N_g / 2) / (P · N), com P_g/N_g os pesos positivos e
+    negativos do grupo de scores empatados g.
+    """
+    pesos_pos = np.add.reduceat(contagens * y_ord, grupos, axis=1)
+    pesos_neg = np.add.reduceat(contagens * (1 - y_ord), grupos, axis=1)
+    negativos_abaixo = np.cumsum(pesos_neg, axis=1) - pesos_neg
+    numerador = (pesos_pos * (negativos_abaixo + 0.5 * pesos_neg)).sum(axis=1)
+    denominador = pesos_pos.sum(axis=1) * pesos_neg.sum(axis=1)
+    auc = np.full(len(contagens), np.nan)
+    validos = denominador > 0
+    auc[validos] = numerador[validos] / denominador[validos]
+    return auc
+
+
+def bootstrap_metricas(y_true, y_pred, proba, n_reamostragens=2000, seed=42) -> dict:
+    """
+    Distribuição bootstrap das métricas
+
+    Returns:
+        {métrica: array com o valor em cada reamostragem}
+    """
+    y_true = np.asarray(y_true).astype(int)
+    y_pred = np.asarray(y_pred).astype(int)
+    proba = np.asarray(proba, dtype=float)
+    n = len(y_true)
+
+    # colunas ordenadas por score, para a AUC; início de cada grupo de empates
+    ordem = np.argsort(proba, kind="mergesort")
+    y_ord = y_true[ordem]
+    grupos = np.r_[0, np.flatnonzero(np.diff(proba[ordem])) + 1]
+
+    # indicadores (tp, fp, fn, tn) de cada linha, na mesma ordem
+    indicadores = np.column_stack([
+        y_ord & y_pred[ordem],
+        (1 - y_ord) & y_pred[ordem],
+        y_ord & (1 - y_pred[ordem]),
+        (1 - y_ord) & (1 - y_pred[ordem]),
+    ]).astype(np.int64)
+
+    rng = np.random.default_rng(seed)
+    probabilidades = np.full(n, 1.0 / n)
+    tamanho_bloco = max(1, CELULAS_POR_BLOCO // max(n, 1))
+
+    resultados = {nome: [] for nome in METRICAS}
+    for inicio in range(0, n_reamostragens, tamanho_bloco):
+        blocos = min(tamanho_bloco, n_reamostragens - inicio)
+        contagens = rng.multinomial(n, probabilidades, size=blocos)
+        for nome, valores in _metricas_contagens(contagens @ indicadores).items():
+            resultados[nome].append(valores)
+        resultados["auc"].append(_auc_contagens(contagens, y_ord, grupos))
+
+    return {nome: np.concatenate(valores) for nome, valores in resultados.items()}
+
+
+def avaliar_modelo(y_true, proba, limiar=0.5, n_reamostragens=2000, nivel_confianca=0.95, seed=42) -> pd.DataFrame:
+    """
+    Avalia o modelo a partir das probabilidades (uma única passada pelo pipeline)
+
+    Args:
+        y_true: rótulos verdadeiros
+        proba: probabilidade da classe positiva
+        limiar: limiar de decisão (proba >= limiar → classe 1)
+        n_reamostragens: reamostragens do bootstrap (0 desativa os intervalos)
+        nivel_confianca: nível do intervalo percentil
+        seed: semente do bootstrap
+
+    Returns:
+        DataFrame indexado pela métrica com as colunas Valores, IC_inferior, IC_superior
+    """
+    proba = np.asarray(proba, dtype=float)
+    y_pred = (proba >= limiar).astype(int)
+    avaliacao = pd.DataFrame({"Valores": metricas_pontuais(y_true, y_pred, proba)})
+
+    if n_reamostragens > 0:
+        distribuicoes = bootstrap_metricas(y_true, y_pred, proba, n_reamostragens, seed)
+        alfa = (1 - nivel_confianca) / 2
+        for nome, valores in distribuicoes.items():
+            avaliacao.loc[nome, "IC_inferior"] = np.nanquantile(valores, alfa)
+            avaliacao.loc[nome, "IC_superior"] = np.nanquantile(valores, 1 - alfa)
+
+    avaliacao.index.name = "Métricas"
+    return avaliacao
+
+
+__all__ = ["METRICAS", "metricas_pontuais", "bootstrap_metricas", "avaliar_modelo"]
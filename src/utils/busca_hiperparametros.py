@@ -0,0 +1,194 @@
+"""
+Módulo de busca de hiperparâmetros do RandomForest com successive halving
+
+- `f2_melhor_limiar`: F2 ponderado no melhor limiar de decisão, calculado de uma
+  vez para todos os limiares (ordenação + somas acumuladas), de modo que cada
+  candidato é avaliado já com o limiar que o `TunedThresholdClassifierCV` escolheria
+- `buscar_hiperparametros`: `HalvingRandomSearchCV` sobre `n_estimators`,
+  `max_depth` e `min_samples_leaf`, usando como recurso o número de amostras ou
+  o número de árvores; candidatos × folds rodam em paralelo (`n_jobs`, com a
+  floresta de cada candidato em poucos workers) e os piores são descartados a
+  cada rodada
+- `salvar_resultado_busca`: persiste o vencedor (JSON) e a tabela custo/qualidade (CSV)
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+
+ESPACO_PADRAO = {
+    "n_estimators": [100, 200, 400, 700, 1000],
+    "max_depth": [8, 12, 16, 20, None],
+    "min_samples_leaf": [1, 2, 5, 10, 20],
+}
+
+RECURSOS = ("n_samples", "arvores")
+
+
+def _f2(tp, fp, fn):
+    denominador = 5 * tp + 4 * fn + fp
+    return np.divide(5 * tp, denominador, out=np.zeros_like(denominador, dtype=float), where=denominador > 0)
+
+
+def curva_f2_ponderado(y_true, proba):
+    """
+    F2 ponderado (average="weighted") para todos os limiares candidatos
+
+    Returns:
+        (limiares, f2) — prever 1 quando proba >= limiar; o último limiar (inf)
+        corresponde a prever tudo como 0
+    """
+    y_true = np.asarray(y_true).astype(int)
+    proba = np.asarray(proba, dtype=float)
+    ordem = np.argsort(-proba, kind="mergesort")
+    y_ord, p_ord = y_true[ordem], proba[ordem]
+
+    # posições onde o limiar muda (empates entram juntos)
+    corte = np.r_[np.flatnonzero(np.diff(p_ord)), len(p_ord) - 1]
+    tp1 = np.r_[np.cumsum(y_ord)[corte], 0]
+    fp1 = np.r_[np.cumsum(1 - y_ord)[corte], 0]
+    limiares = np.r_[p_ord[corte], np.inf]
+
+    positivos = y_true.sum()
+    negativos = len(y_true) - positivos
+    fn1 = positivos - tp1
+    # classe 0: acerto = negativo previsto como 0
+    f2_1 = _f2(tp1, fp1, fn1)
+    f2_0 = _f2(negativos - fp1, fn1, fp1)
+    f2 = (positivos * f2_1 + negativos * f2_0) / len(y_true)
+    return limiares, f2
+
+
+def f2_melhor_limiar(y_true, proba) -> float:
+    """F2 ponderado no melhor limiar (usado como score da busca)"""
+    return float(curva_f2_ponderado(y_true, proba)[1].max())
+
+
+def melhor_limiar(y_true, proba) -> float:
+    """Limiar de decisão que maximiza o F2 ponderado"""
+    limiares, f2 = curva_f2_ponderado(y_true, proba)
+    return float(limiares[int(np.argmax(f2))])
+
+
+def buscar_hiperparametros(pipeline, X, y, espaco=None, recurso="n_samples", n_candidatos=24,
+                           fator=3, cv=3, n_jobs=None, random_state=42):
+    """
+    Executa a busca por successive halving
+
+    Args:
+        pipeline: pipeline com um RandomForest na etapa "clf" (sem ajuste de limiar)
+        X, y: dados de treino
+        espaco: distribuição dos hiperparâmetros (nomes do RandomForest)
+        recurso: "n_samples" (subamostras crescentes) ou "arvores" (n_estimators crescente)
+        n_candidatos: candidatos sorteados na primeira rodada
+        fator: fração (1/fator) dos candidatos mantida a cada rodada
+        cv: folds de validação
+        n_jobs: candidatos × folds avaliados em paralelo (processos)
+        random_state: semente do sorteio e das subamostras
+
+    Returns:
+        HalvingRandomSearchCV ajustado
+    """
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.metrics import make_scorer
+    from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold
+
+    if recurso not in RECURSOS:
+        raise ValueError(f"Recurso inválido: {recurso}. Use: {list(RECURSOS)}")
+
+    espaco = dict(espaco or ESPACO_PADRAO)
+    if recurso == "arvores":
+        arvores = espaco.pop("n_estimators")
+        parametros_busca = {
+            "resource": "clf__n_estimators",
+            "max_resources": max(arvores),
+            "min_resources": min(arvores),
+        }
+    else:
+        parametros_busca = {"resource": "n_samples", "min_resources": "exhaust"}
+
+    busca = HalvingRandomSearchCV(
+        pipeline,
+        param_distributions={f"clf__{nome}": valores for nome, valores in espaco.items()},
+        n_candidates=n_candidatos,
+        factor=fator,
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state),
+        scoring=make_scorer(f2_melhor_limiar, response_method="predict_proba"),
+        refit=False,
+        n_jobs=n_jobs,
+        random_state=random_state,
+        **parametros_busca,
+    )
+    busca.fit(X, y)
+
+    for iteracao, (candidatos, recursos) in enumerate(zip(busca.n_candidates_, busca.n_resources_)):
+        logger.info(f"  rodada {iteracao}: {candidatos} candidatos × {recursos} ({recurso})")
+    logger.success(f"Melhor candidato: {melhores_parametros(busca)} | F2 validação {busca.best_score_:.4f}")
+    return busca
+
+
+def melhores_parametros(busca) -> dict:
+    """Hiperparâmetros vencedores com os nomes do RandomForest (inclui o recurso se for árvores)"""
+    parametros = {nome.removeprefix("clf__"): valor for nome, valor in busca.best_params_.items()}
+    if busca.resource == "clf__n_estimators":
+        parametros["n_estimators"] = int(busca.n_resources_[-1])
+    return parametros
+
+
+def tabela_custo_qualidade(busca) -> pd.DataFrame:
+    """Uma linha por (rodada, candidato): recurso, F2, custo de ajuste/score — ordenada pela qualidade"""
+    resultados = pd.DataFrame(busca.cv_results_)
+    colunas_params = [c for c in resultados.columns if c.startswith("param_")]
+    tabela = resultados[["iter", "n_resources", *colunas_params, "mean_test_score", "std_test_score",
+                         "mean_fit_time", "mean_score_time"]].copy()
+    tabela.columns = [c.replace("param_clf__", "") for c in tabela.columns]
+    tabela = tabela.rename(columns={
+        "iter": "rodada",
+        "n_resources": "recurso",
+        "mean_test_score": "f2_medio",
+        "std_test_score": "f2_desvio",
+        "mean_fit_time": "tempo_ajuste_segundos",
+        "mean_score_time": "tempo_score_segundos",
+    })
+    return tabela.sort_values(["rodada", "f2_medio"], ascending=[False, False]).reset_index(drop=True)
+
+
+def salvar_resultado_busca(busca, caminho_json, caminho_csv, extras: dict = None) -> dict:
+    """
+    Persiste o vencedor e a tabela custo/qualidade
+
+    Returns:
+        Conteúdo salvo no JSON
+    """
+    resultado = {
+        "melhores_hiperparametros": melhores_parametros(busca),
+        "f2_validacao": float(busca.best_score_),
+        "recurso": busca.resource,
+        "rodadas": [
+            {"candidatos": int(c), "recursos": int(r)}
+            for c, r in zip(busca.n_candidates_, busca.n_resources_)
+        ],
+        **(extras or {}),
+    }
+    caminho_json, caminho_csv = Path(caminho_json), Path(caminho_csv)
+    caminho_json.parent.mkdir(parents=True, exist_ok=True)
+    caminho_json.write_text(json.dumps(resultado, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+    tabela_custo_qualidade(busca).to_csv(caminho_csv, index=False)
+    logger.success(f"Resultado da busca salvo em: {caminho_json} e {caminho_csv}")
+    return resultado
+
+
+__all__ = [
+    "ESPACO_PADRAO",
+    "RECURSOS",
+    "curva_f2_ponderado",
+    "f2_melhor_limiar",
+    "melhor_limiar",
+    "buscar_hiperparametros",
+    "melhores_parametros",
+    "tabela_custo_qualidade",
+    "salvar_resultado_busca",
+]
@@ -0,0 +1,88 @@
+"""
+Módulo de cache HTTP condicional da API (ETag / If-None-Match)
+
+As respostas de leitura só mudam quando /recarregar (ou o rollback) troca o
+snapshot de predições ou o modelo principal. `MiddlewareCacheCondicional` (ASGI)
+deriva o ETag de uma chave de conteúdo, do caminho e da query string. Na API, a
+chave junta o conteúdo do snapshot (sha256 do artefato no registro, ou tamanho +
+mtime do arquivo) com a versão e o limiar do modelo principal, que entram no
+previsao_churn. O nome da versão do snapshot não entra: repontuar com o mesmo
+modelo muda o conteúdo sem mudar a versão. Se o `If-None-Match` do cliente
+corresponder, a resposta é 304 sem chamar o endpoint (sem lookup e sem
+serialização). Caso contrário, as respostas 200 saem com ETag e Cache-Control.
+"""
+import hashlib
+
+from utils.admissao import template_rota
+from utils.metrics import api_http_cache_responses_total
+
+
+def calcular_etag(conteudo: str, caminho: str, query: bytes) -> bytes:
+    """ETag forte (o corpo é determinístico para o mesmo conteúdo, caminho e query)"""
+    chave = f"{conteudo}|{caminho}|".encode("utf-8") + query
+    return b'"' + hashlib.blake2b(chave, digest_size=12).hexdigest().encode("ascii") + b'"'
+
+
+def etag_corresponde(if_none_match: bytes, etag: bytes) -> bool:
+    """Comparação fraca do If-None-Match (lista de ETags ou *), como manda a RFC 9110"""
+    if if_none_match.strip() == b"*":
+        return True
+    return any(
+        candidato.strip().removeprefix(b"W/") == etag
+        for candidato in if_none_match.split(b",")
+    )
+
+
+class MiddlewareCacheCondicional:
+    """
+    Middleware ASGI de ETag / If-None-Match para as rotas de leitura
+
+    Args:
+        app: aplicação ASGI
+        rotas_app: rotas da aplicação (`app.routes`), usadas para achar o template da rota
+        rotas_cacheaveis: templates das rotas com ETag (ex.: "/churn/{id_cliente}")
+        obter_conteudo: função que retorna o identificador do conteúdo do snapshot servido (None = sem cache)
+        cache_control: valor do header Cache-Control
+    """
+
+    def __init__(self, app, rotas_app, rotas_cacheaveis, obter_conteudo, cache_control: str):
+        self.app = app
+        self.rotas_app = rotas_app
+        self.rotas_cacheaveis = set(rotas_cacheaveis)
+        self.obter_conteudo = obter_conteudo
+        self.cache_control = cache_control.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        conteudo = self.obter_conteudo()
+        rota = template_rota(self.rotas_app, scope) if conteudo is not None else None
+        if rota not in self.rotas_cacheaveis:
+            await self.app(scope, receive, send)
+            return
+
+        etag = calcular_etag(conteudo, scope["path"], scope["query_string"])
+        if_none_match = next((v for k, v in scope["headers"] if k == b"if-none-match"), None)
+        if if_none_match is not None and etag_corresponde(if_none_match, etag):
+            api_http_cache_responses_total.labels(route=rota, result="nao_modificado").inc()
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag), (b"cache-control", self.cache_control)],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start" and mensagem["status"] == 200:
+                mensagem["headers"] = [
+                    *mensagem.get("headers", []), (b"etag", etag), (b"cache-control", self.cache_control)
+                ]
+                api_http_cache_responses_total.labels(route=rota, result="completa").inc()
+            await send(mensagem)
+
+        await self.app(scope, receive, enviar)
+
+
+__all__ = ["MiddlewareCacheCondicional", "calcular_etag", "etag_corresponde"]
@@ -0,0 +1,177 @@
+"""
+Módulo de geração de dados sintéticos de clientes para testes de escala
+
+`GeradorSintetico` aprende, a partir de data/raw/dados_treino.csv:
+- a proporção de `saiu`
+- por classe: a distribuição marginal empírica de cada coluna (frequências das
+  categorias inclusive) e a dependência entre colunas via cópula gaussiana
+  (correlação dos escores normais dos postos)
+- por classe: a taxa de valores ausentes de cada coluna
+
+e gera N linhas no mesmo esquema, em blocos, com semente fixa. Categorias entram na
+cópula pela ordem de frequência, então apenas associações monótonas com essa
+ordem são preservadas.
+
+`gerar_snapshot_predicoes` produz o snapshot no formato de outputs/predicoes.csv
+(id_cliente, preds, Classificação) para os benchmarks da API.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+CLASSIFICACOES = ["Risco baixo", "Risco moderado", "Risco alto ", "Risco muito alto"]
+
+
+def classificar_risco(preds) -> np.ndarray:
+    """Classificação de risco do snapshot de predições (mesmas faixas do predicao.py)"""
+    preds = np.asarray(preds)
+    condicoes = [preds > 0.90, preds > 0.70, preds > 0.50, preds < 0.50]
+    return np.select(condicoes, CLASSIFICACOES, default="Ruim")
+
+
+class _CopulaClasse:
+    """Marginais empíricas + correlação dos escores normais de uma classe"""
+
+    def __init__(self, df: pd.DataFrame, colunas: list, categorias: dict, continuas: set, rng):
+        self.colunas = colunas
+        self.categorias = categorias
+        self.continuas = continuas
+        self.ausentes = df[colunas].isna().mean().to_numpy()
+        self.ordenados = {}
+        escores = np.empty((len(df), len(colunas)))
+
+        for j, coluna in enumerate(colunas):
+            valores = df[coluna]
+            if coluna in categorias:
+                valores = valores.map({c: i for i, c in enumerate(categorias[coluna])})
+            valores = valores.dropna().to_numpy(dtype=float)
+            self.ordenados[coluna] = np.sort(valores)
+            # postos com desempate aleatório (colunas discretas têm muitos empates)
+            completos = df[coluna].notna().to_numpy()
+            postos = np.empty(len(valores))
+            postos[np.lexsort((rng.random(len(valores)), valores))] = np.arange(1, len(valores) + 1)
+            coluna_escores = np.zeros(len(df))
+            coluna_escores[completos] = ndtri(postos / (len(valores) + 1))
+            escores[:, j] = coluna_escores
+
+        correlacao = np.corrcoef(escores, rowvar=False)
+        correlacao = np.nan_to_num(correlacao) + np.eye(len(colunas)) * 1e-9
+        self.cholesky = np.linalg.cholesky(correlacao)
+
+    def amostrar(self, n: int, rng) -> dict:
+        uniformes = ndtr(rng.standard_normal((n, len(self.colunas))) @ self.cholesky.T)
+        amostra = {}
+        for j, coluna in enumerate(self.colunas):
+            ordenados = self.ordenados[coluna]
+            if coluna in self.continuas:
+                valores = np.interp(uniformes[:, j] * (len(ordenados) - 1), np.arange(len(ordenados)), ordenados)
+            else:
+                valores = ordenados[np.minimum((uniformes[:, j] * len(ordenados)).astype(np.int64), len(ordenados) - 1)]
+            if self.ausentes[j] > 0:
+                valores = np.where(rng.random(n) < self.ausentes[j], np.nan, valores)
+            amostra[coluna] = valores
+        return amostra
+
+
+class GeradorSintetico:
+    """
+    Gerador de clientes sintéticos por cópula gaussiana condicionada à classe
+
+    Args:
+        coluna_id: coluna de identificação (gerada sequencialmente, não aprendida)
+        coluna_alvo: coluna alvo (proporção aprendida; cópula ajustada por classe)
+        seed: semente do ajuste (desempate dos postos)
+    """
+
+    def __init__(self, coluna_id: str = "id_cliente", coluna_alvo: str = "saiu", seed: int = 0):
+        self.coluna_id = coluna_id
+        self.coluna_alvo = coluna_alvo
+        self.seed = seed
+
+    def ajustar(self, df: pd.DataFrame) -> "GeradorSintetico":
+        rng = np.random.default_rng(self.seed)
+        self.esquema = list(df.columns)
+        self.colunas = [c for c in df.columns if c not in (self.coluna_id, self.coluna_alvo)]
+        self.categorias = {
+            c: df[c].value_counts().index.tolist()
+            for c in self.colunas
+            if not pd.api.types.is_numeric_dtype(df[c])
+        }
+        # colunas inteiras com ausentes são lidas como float pelo pandas
+        self.inteiras = {
+            c for c in self.colunas
+            if c not in self.categorias and (df[c].dropna() % 1 == 0).all()
+        }
+        self.continuas = {
+            c for c in self.colunas
+            if c not in self.categorias and c not in self.inteiras
+        }
+        self.proporcao_alvo = float(df[self.coluna_alvo].mean())
+        self.copulas = {
+            int(classe): _CopulaClasse(grupo, self.colunas, self.categorias, self.continuas, rng)
+            for classe, grupo in df.groupby(self.coluna_alvo)
+        }
+        self.proximo_id = int(df[self.coluna_id].max()) + 1
+        return self
+
+    def gerar_bloco(self, n: int, rng, id_inicial: int) -> pd.DataFrame:
+        alvo = (rng.random(n) < self.proporcao_alvo).astype(np.int64)
+        colunas = {c: np.empty(n) for c in self.colunas}
+        for classe, copula in self.copulas.items():
+            linhas = np.flatnonzero(alvo == classe)
+            if len(linhas) == 0:
+                continue
+            for coluna, valores in copula.amostrar(len(linhas), rng).items():
+                colunas[coluna][linhas] = valores
+
+        bloco = {self.coluna_id: np.arange(id_inicial, id_inicial + n, dtype=np.int64), self.coluna_alvo: alvo}
+        for coluna, valores in colunas.items():
+            if coluna in self.categorias:
+                nomes = np.asarray(self.categorias[coluna], dtype=object)
+                ausentes = np.isnan(valores)
+                serie = pd.Series(nomes[np.where(ausentes, 0, valores).astype(np.int64)], dtype=object)
+                serie[ausentes] = np.nan
+                bloco[coluna] = serie
+            elif coluna in self.inteiras:
+                bloco[coluna] = pd.array(np.round(valores), dtype="Int64") if np.isnan(valores).any() \
+                    else np.round(valores).astype(np.int64)
+            else:
+                bloco[coluna] = np.round(valores, 2)
+        return pd.DataFrame(bloco)[self.esquema]
+
+    def gerar(self, n_linhas: int, tamanho_bloco: int = 500_000, seed: int = 0, id_inicial: int = None):
+        """
+        Gera `n_linhas` em blocos (iterador de DataFrames no esquema do treino)
+
+        O resultado é reprodutível para a mesma semente e o mesmo tamanho de bloco.
+        """
+        rng = np.random.default_rng(seed)
+        id_atual = self.proximo_id if id_inicial is None else id_inicial
+        for inicio in range(0, n_linhas, tamanho_bloco):
+            n = min(tamanho_bloco, n_linhas - inicio)
+            yield self.gerar_bloco(n, rng, id_atual)
+            id_atual += n
+
+
+def gerar_snapshot_predicoes(bloco: pd.DataFrame, rng, modelo=None, coluna_id="id_cliente",
+                             coluna_alvo="saiu", separacao: float = 3.0) -> pd.DataFrame:
+    """
+    Snapshot de predições no formato de outputs/predicoes.csv
+
+    Com `modelo`, as probabilidades vêm de predict_proba; sem modelo, são sorteadas
+    de Beta(separacao, 1.5) para quem saiu e Beta(1.5, separacao) para os demais.
+    """
+    if modelo is not None:
+        X = bloco.set_index(coluna_id).drop(columns=[coluna_alvo])
+        preds = modelo.predict_proba(X)[:, 1]
+    else:
+        positivos = bloco[coluna_alvo].to_numpy() == 1
+        preds = np.where(positivos, rng.beta(separacao, 1.5, len(bloco)), rng.beta(1.5, separacao, len(bloco)))
+    return pd.DataFrame({
+        coluna_id: bloco[coluna_id].to_numpy(),
+        "preds": preds,
+        "Classificação": classificar_risco(preds),
+    })
+
+
+__all__ = ["GeradorSintetico", "gerar_snapshot_predicoes", "classificar_risco", "CLASSIFICACOES"]
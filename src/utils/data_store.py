@@ -0,0 +1,184 @@
+"""
+Módulo de armazenamento append-only dos dados de treino
+
+Cada lote ingerido vira uma partição Parquet imutável. Um índice persistente de
+hashes de linha (um arquivo .npy ordenado por partição, lido via mmap) rejeita
+duplicatas no momento da ingestão, e um manifesto versionado permite ler
+qualquer versão do dataset (versão N = partições 1..N) sem reescrever nada.
+
+Ingerir um lote novo custa O(lote) de escrita: as partições existentes nunca
+são reescritas, e a busca de duplicatas é feita por busca binária nos índices.
+
+Estrutura:
+    data/store/
+    ├── manifest.json
+    ├── part-000001.parquet
+    ├── part-000001.hashes.npy
+    └── ...
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+
+
+def hash_linhas(df: pd.DataFrame) -> np.ndarray:
+    """
+    Calcula um hash uint64 por linha (incluindo o índice, ex.: id_cliente)
+
+    Colunas numéricas são normalizadas para float64, para que o mesmo registro
+    gere o mesmo hash independente do dtype inferido em cada arquivo.
+    """
+    dados = df.reset_index() if df.index.name is not None else df
+    dados = dados[sorted(dados.columns)]
+    numericas = dados.select_dtypes(include="number").columns
+    dados = dados.astype({col: "float64" for col in numericas})
+    return pd.util.hash_pandas_object(dados, index=False).to_numpy()
+
+
+class ArmazemDados:
+    """
+    Armazém append-only particionado por lote de ingestão
+
+    Args:
+        diretorio: diretório raiz do armazém
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = Path(diretorio)
+        self.manifest_path = self.diretorio / "manifest.json"
+
+    # ------------------------------------------------------------------
+    # Manifesto
+    # ------------------------------------------------------------------
+    def manifesto(self) -> dict:
+        """Retorna o manifesto atual (versão e partições)"""
+        if not self.manifest_path.exists():
+            return {"versao": 0, "particoes": []}
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+
+    def _salvar_manifesto(self, manifesto: dict):
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(manifesto, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    @property
+    def versao(self) -> int:
+        return self.manifesto()["versao"]
+
+    @property
+    def vazio(self) -> bool:
+        return self.versao == 0
+
+    # ------------------------------------------------------------------
+    # Ingestão
+    # ------------------------------------------------------------------
+    def _hashes_existentes(self, manifesto: dict, hashes: np.ndarray) -> np.ndarray:
+        """Máscara dos hashes já presentes em alguma partição"""
+        existentes = np.zeros(len(hashes), dtype=bool)
+        for particao in manifesto["particoes"]:
+            indice = np.load(self.diretorio / particao["hashes"], mmap_mode="r")
+            if len(indice) == 0:
+                continue
+            posicoes = np.searchsorted(indice, hashes)
+            posicoes[posicoes == len(indice)] = len(indice) - 1
+            existentes |= np.asarray(indice[posicoes]) == hashes
+        return existentes
+
+    def ingerir(self, df: pd.DataFrame, origem: str = "") -> dict:
+        """
+        Ingere um lote como nova partição, descartando duplicatas
+
+        Args:
+            df: lote de dados (indexado por id_cliente)
+            origem: descrição da origem do lote (ex.: caminho do arquivo)
+
+        Returns:
+            Dicionário com o resumo da ingestão
+        """
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        manifesto = self.manifesto()
+
+        hashes = hash_linhas(df)
+        _, primeiros = np.unique(hashes, return_index=True)
+        unicos = np.zeros(len(hashes), dtype=bool)
+        unicos[primeiros] = True
+        existentes = self._hashes_existentes(manifesto, hashes)
+        manter = unicos & ~existentes
+
+        resumo = {
+            "origem": str(origem),
+            "linhas_recebidas": int(len(df)),
+            "duplicadas_no_lote": int((~unicos).sum()),
+            "duplicadas_existentes": int((unicos & existentes).sum()),
+            "linhas_gravadas": int(manter.sum()),
+            "versao": manifesto["versao"],
+        }
+        if resumo["linhas_gravadas"] == 0:
+            logger.warning(f"Nenhuma linha nova em {origem} - partição não criada")
+            return resumo
+
+        versao = manifesto["versao"] + 1
+        nome = f"part-{versao:06d}"
+        lote = df[manter]
+        lote.to_parquet(self.diretorio / f"{nome}.parquet", index=True)
+        np.save(self.diretorio / f"{nome}.hashes.npy", np.sort(hashes[manter]))
+
+        manifesto["versao"] = versao
+        manifesto["particoes"].append({
+            "versao": versao,
+            "arquivo": f"{nome}.parquet",
+            "hashes": f"{nome}.hashes.npy",
+            "linhas": resumo["linhas_gravadas"],
+            "origem": str(origem),
+            "data_ingestao": datetime.now().isoformat(timespec="seconds"),
+        })
+        self._salvar_manifesto(manifesto)
+
+        resumo["versao"] = versao
+        logger.info(
+            f"Partição {nome} gravada: {resumo['linhas_gravadas']} linhas "
+            f"({resumo['duplicadas_no_lote']} duplicadas no lote, "
+            f"{resumo['duplicadas_existentes']} já existentes)"
+        )
+        return resumo
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+    def iterar(self, versao=None, coluna_tempo=None):
+        """
+        Itera sobre as partições de uma versão do dataset
+
+        Args:
+            versao: versão desejada (None = mais recente)
+            coluna_tempo: se informado, adiciona a data de ingestão da partição
+                nesta coluna (usado pela janela em dias da política de treino)
+
+        Yields:
+            DataFrame de cada partição, em ordem de ingestão
+        """
+        manifesto = self.manifesto()
+        versao = manifesto["versao"] if versao is None else versao
+        if versao > manifesto["versao"]:
+            raise ValueError(f"Versão {versao} inexistente (atual: {manifesto['versao']})")
+
+        for particao in manifesto["particoes"]:
+            if particao["versao"] > versao:
+                break
+            lote = pd.read_parquet(self.diretorio / particao["arquivo"])
+            if coluna_tempo is not None:
+                lote[coluna_tempo] = pd.Timestamp(particao["data_ingestao"])
+            yield lote
+
+    def ler(self, versao=None) -> pd.DataFrame:
+        """Lê uma versão completa do dataset"""
+        return pd.concat(list(self.iterar(versao)))
+
+
+__all__ = ["ArmazemDados", "hash_linhas"]
@@ -0,0 +1,158 @@
+"""
+Módulo de imputação escalável de valores ausentes
+
+O `KNNImputer` do scikit-learn calcula distâncias par a par contra todo o conjunto
+de treino (custo quadrático) no fit e em cada transform com valores ausentes.
+`ArvoreKNNImputer` produz o mesmo tipo de imputação (média dos k vizinhos mais
+próximos) usando um índice KD-Tree por padrão de ausência e consultas em blocos,
+com memória limitada:
+
+- referência: linhas do treino (opcionalmente sub-amostradas até `max_referencia`)
+- doadores de cada padrão de ausência: linhas da referência completas nas colunas
+  que o padrão usa (observadas + faltantes), como no KNNImputer, que aceita
+  doadores incompletos em colunas que não entram na imputação
+- para cada padrão, a árvore é construída sobre as colunas observadas; a distância
+  nan-euclidiana do KNNImputer é proporcional à euclidiana nessas colunas, logo a
+  ordem dos vizinhos é a mesma
+- as árvores dos padrões vistos no fit são construídas no fit e vão junto no
+  pickle, então os workers do joblib (loky) não as reconstroem a cada transform
+- linhas sem nenhuma coluna observada, ou sem doadores, recebem a média da coluna
+"""
+import numpy as np
+from sklearn.base import BaseEstimator, OneToOneFeatureMixin, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+
+METODOS_IMPUTACAO = ("knn", "arvore")
+
+
+class ArvoreKNNImputer(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    Imputação por k vizinhos mais próximos com índice KD-Tree e consultas em blocos
+
+    Args:
+        n_neighbors: número de vizinhos usados na média
+        leaf_size: tamanho da folha da KD-Tree
+        tamanho_bloco: linhas consultadas por bloco (limita a memória do transform)
+        max_referencia: número máximo de linhas de referência mantidas (None = todas)
+        random_state: semente da sub-amostragem da referência
+    """
+
+    def __init__(self, n_neighbors=10, leaf_size=40, tamanho_bloco=50_000,
+                 max_referencia=None, random_state=0):
+        self.n_neighbors = n_neighbors
+        self.leaf_size = leaf_size
+        self.tamanho_bloco = tamanho_bloco
+        self.max_referencia = max_referencia
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X = np.asarray(X, dtype=np.float64)
+        self.n_features_in_ = X.shape[1]
+
+        self.media_ = np.nanmean(X, axis=0)
+        referencia = X
+        if self.max_referencia is not None and len(referencia) > self.max_referencia:
+            rng = np.random.default_rng(self.random_state)
+            referencia = referencia[rng.choice(len(referencia), self.max_referencia, replace=False)]
+
+        self.referencia_ = referencia
+        self._ausentes_referencia = np.isnan(referencia)
+        self._arvores = {}
+        # padrões do próprio treino: o transform logo após o fit usa todas essas árvores
+        ausentes = np.isnan(X)
+        for padrao in np.unique(ausentes[ausentes.any(axis=1)], axis=0):
+            if not padrao.all():
+                self._arvores_padrao(padrao)
+        return self
+
+    def _arvores_padrao(self, padrao):
+        """
+        KD-Trees do padrão de ausência (construídas uma vez e reutilizadas)
+
+        Os doadores de cada coluna faltante são as linhas da referência completas nas
+        colunas observadas do padrão e naquela coluna. Colunas com o mesmo conjunto de
+        doadores compartilham a árvore (o caso comum: uma árvore por padrão).
+
+        Returns:
+            Lista de (colunas faltantes, arvore, valores dos doadores nessas colunas);
+            arvore é None quando não há doadores
+        """
+        from sklearn.neighbors import KDTree
+
+        chave = padrao.tobytes()
+        if chave not in self._arvores:
+            observadas = np.flatnonzero(~padrao)
+            completas_observadas = ~self._ausentes_referencia[:, observadas].any(axis=1)
+            grupos = {}
+            for coluna in np.flatnonzero(padrao):
+                doadores = completas_observadas & ~self._ausentes_referencia[:, coluna]
+                grupos.setdefault(doadores.tobytes(), (doadores, []))[1].append(coluna)
+
+            arvores = []
+            for doadores, colunas in grupos.values():
+                colunas = np.asarray(colunas)
+                if not doadores.any():
+                    arvores.append((colunas, None, None))
+                    continue
+                referencia = self.referencia_[doadores]
+                arvore = KDTree(referencia[:, observadas], leaf_size=self.leaf_size)
+                arvores.append((colunas, arvore, referencia[:, colunas]))
+            self._arvores[chave] = arvores
+        return self._arvores[chave]
+
+    def transform(self, X):
+        check_is_fitted(self, "referencia_")
+        X = np.array(X, dtype=np.float64)
+        ausentes = np.isnan(X)
+        linhas = np.flatnonzero(ausentes.any(axis=1))
+        if len(linhas) == 0:
+            return X
+
+        padroes, grupo = np.unique(ausentes[linhas], axis=0, return_inverse=True)
+        grupo = grupo.ravel()
+
+        for i, padrao in enumerate(padroes):
+            linhas_padrao = linhas[grupo == i]
+            observadas = np.flatnonzero(~padrao)
+
+            if len(observadas) == 0:
+                faltantes = np.flatnonzero(padrao)
+                X[np.ix_(linhas_padrao, faltantes)] = self.media_[faltantes]
+                continue
+
+            for colunas, arvore, valores in self._arvores_padrao(padrao):
+                if arvore is None:
+                    X[np.ix_(linhas_padrao, colunas)] = self.media_[colunas]
+                    continue
+                k = min(self.n_neighbors, len(valores))
+                for inicio in range(0, len(linhas_padrao), self.tamanho_bloco):
+                    bloco = linhas_padrao[inicio:inicio + self.tamanho_bloco]
+                    _, vizinhos = arvore.query(X[np.ix_(bloco, observadas)], k=k)
+                    X[np.ix_(bloco, colunas)] = valores[vizinhos].mean(axis=1)
+
+        return X
+
+
+def criar_imputador_numerico(metodo: str = "knn", n_neighbors: int = 10, max_referencia=None):
+    """
+    Cria o imputador das variáveis numéricas
+
+    Args:
+        metodo: "knn" (KNNImputer força bruta) ou "arvore" (ArvoreKNNImputer)
+        n_neighbors: número de vizinhos
+        max_referencia: limite de doadores do método "arvore"
+
+    Returns:
+        Transformer compatível com scikit-learn
+    """
+    if metodo == "knn":
+        from sklearn.impute import KNNImputer
+        return KNNImputer(n_neighbors=n_neighbors)
+    if metodo == "arvore":
+        return ArvoreKNNImputer(n_neighbors=n_neighbors, max_referencia=max_referencia)
+    raise ValueError(f"Método de imputação inválido: {metodo}. Use: {list(METODOS_IMPUTACAO)}")
+
+
+__all__ = ["ArvoreKNNImputer", "criar_imputador_numerico", "METODOS_IMPUTACAO"]
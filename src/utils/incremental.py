@@ -0,0 +1,136 @@
+"""
+Módulo de re-scoring incremental
+
+Mantém um fingerprint por cliente (hash da linha de features + versão do modelo)
+ao lado de outputs/predicoes.csv, permitindo que o script de predição reprocesse
+apenas clientes novos ou alterados desde a última execução.
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+
+def calcular_fingerprints(X: pd.DataFrame) -> pd.Series:
+    """
+    Calcula um hash de 64 bits por linha de features
+
+    Args:
+        X: DataFrame de features indexado por id_cliente
+
+    Returns:
+        Series uint64 com o fingerprint de cada cliente
+    """
+    # Ordenar colunas para que o hash não dependa da ordem do arquivo
+    colunas = sorted(X.columns)
+    fingerprints = pd.util.hash_pandas_object(X[colunas], index=False)
+    fingerprints.name = "fingerprint"
+    return fingerprints
+
+
+def resolver_versao_modelo(metadata_path, model_path) -> str:
+    """
+    Obtém a versão do modelo a partir dos metadados do treinamento
+
+    Args:
+        metadata_path: caminho do model_metadata.json
+        model_path: caminho do artefato do modelo (fallback pelo mtime)
+
+    Returns:
+        String com a versão do modelo
+    """
+    metadata_path = Path(metadata_path)
+    if metadata_path.exists():
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        if metadata.get("model_version"):
+            return str(metadata["model_version"])
+
+    # Fallback simples: qualquer novo artefato invalida os fingerprints
+    return str(Path(model_path).stat().st_mtime_ns)
+
+
+def carregar_estado(fingerprints_path, predicoes_path, versao_modelo: str):
+    """
+    Carrega o snapshot anterior de predições e seus fingerprints
+
+    Somente registros gerados pela mesma versão do modelo são considerados
+    válidos; se a versão mudou, o estado anterior é descartado.
+
+    Args:
+        fingerprints_path: caminho do arquivo de fingerprints
+        predicoes_path: caminho do snapshot de predições
+        versao_modelo: versão atual do modelo
+
+    Returns:
+        Tupla (predicoes_anteriores, fingerprints_anteriores) ou (None, None)
+    """
+    fingerprints_path = Path(fingerprints_path)
+    predicoes_path = Path(predicoes_path)
+
+    if not fingerprints_path.exists() or not predicoes_path.exists():
+        return None, None
+
+    estado = pd.read_csv(
+        fingerprints_path,
+        index_col="id_cliente",
+        dtype={"fingerprint": "uint64", "model_version": str},
+    )
+    estado = estado[estado["model_version"] == versao_modelo]
+    if estado.empty:
+        return None, None
+
+    predicoes = pd.read_csv(predicoes_path, index_col="id_cliente")[["preds"]]
+    ids_validos = estado.index.intersection(predicoes.index)
+
+    return predicoes.loc[ids_validos], estado.loc[ids_validos, "fingerprint"]
+
+
+def selecionar_para_rescore(fingerprints: pd.Series, fingerprints_anteriores) -> pd.Series:
+    """
+    Identifica clientes novos ou com features alteradas
+
+    Args:
+        fingerprints: fingerprints atuais (indexados por id_cliente)
+        fingerprints_anteriores: fingerprints do último snapshot válido (ou None)
+
+    Returns:
+        Máscara booleana alinhada a `fingerprints` (True = precisa reprocessar)
+    """
+    if fingerprints_anteriores is None:
+        return pd.Series(True, index=fingerprints.index)
+
+    anteriores = fingerprints_anteriores.reindex(fingerprints.index)
+    return anteriores.isna() | (anteriores != fingerprints)
+
+
+def salvar_fingerprints(fingerprints_path, fingerprints: pd.Series,
+                        versao_modelo: str, fingerprints_anteriores=None):
+    """
+    Persiste os fingerprints atualizados junto ao snapshot de predições
+
+    Args:
+        fingerprints_path: caminho do arquivo de fingerprints
+        fingerprints: fingerprints dos clientes processados nesta execução
+        versao_modelo: versão do modelo usada nas predições
+        fingerprints_anteriores: fingerprints mantidos do snapshot anterior
+    """
+    if fingerprints_anteriores is not None:
+        mantidos = fingerprints_anteriores.drop(fingerprints.index, errors="ignore")
+        fingerprints = pd.concat([mantidos, fingerprints])
+
+    estado = pd.DataFrame({"fingerprint": fingerprints.astype("uint64")})
+    estado["model_version"] = versao_modelo
+    estado.index.name = "id_cliente"
+
+    fingerprints_path = Path(fingerprints_path)
+    fingerprints_path.parent.mkdir(parents=True, exist_ok=True)
+    estado.to_csv(fingerprints_path)
+
+
+__all__ = [
+    "calcular_fingerprints",
+    "resolver_versao_modelo",
+    "carregar_estado",
+    "selecionar_para_rescore",
+    "salvar_fingerprints",
+]
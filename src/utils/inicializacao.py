@@ -0,0 +1,101 @@
+"""
+Módulo de relatório de inicialização da API
+
+`RelatorioInicializacao` mede, dentro do próprio processo:
+- tempo de import por grupo de módulos (fastapi, pandas, loguru, prometheus...)
+- duração das etapas do startup (carga do snapshot, métricas de ML...)
+- tempo até o primeiro /health saudável, contado a partir do início do processo
+  (lido de /proc no Linux; nos demais sistemas, a partir do import da API)
+
+Este módulo só usa a biblioteca padrão: é importado antes de tudo em api_churn.py
+para medir os demais imports. As métricas Prometheus são publicadas por
+`exportar()`, depois que utils.metrics já foi carregado.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def segundos_desde_inicio_processo():
+    """Segundos desde o início do processo (None se /proc não estiver disponível)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # campos após o nome do executável; starttime é o 22º campo do stat
+            campos = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(campos[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RelatorioInicializacao:
+    """Tempos de import, de etapas do startup e até o primeiro /health saudável"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        # tempo do interpretador antes do import da API (python, site, uvicorn...)
+        self.antes_import = segundos_desde_inicio_processo()
+        self.importacoes = {}
+        self.etapas = {}
+        self.primeiro_health = None
+
+    @contextmanager
+    def importacao(self, modulo: str):
+        """Mede o primeiro import de um grupo de módulos (chamadas seguintes não contam)"""
+        if modulo in self.importacoes:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.importacoes[modulo] = time.perf_counter() - inicio
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """Mede uma etapa da inicialização"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = time.perf_counter() - inicio
+
+    def concluir_importacao(self):
+        """Registra a duração do import da API (chamado no fim do módulo)"""
+        self.etapas["importacao"] = time.perf_counter() - self.inicio
+
+    def registrar_health(self):
+        """Marca o primeiro /health saudável (chamadas seguintes não têm efeito)"""
+        if self.primeiro_health is not None:
+            return
+        self.primeiro_health = time.perf_counter() - self.inicio + (self.antes_import or 0.0)
+        self.exportar()
+
+    def resumo(self) -> dict:
+        return {
+            "antes_import_s": self.antes_import,
+            "importacoes_s": dict(sorted(self.importacoes.items(), key=lambda item: -item[1])),
+            "etapas_s": dict(self.etapas),
+            "primeiro_health_s": self.primeiro_health,
+        }
+
+    def exportar(self):
+        """Publica os tempos nas métricas api_startup_* e api_time_to_first_health_seconds"""
+        from utils.metrics import (
+            api_startup_import_seconds,
+            api_startup_duration_seconds,
+            api_time_to_first_health_seconds,
+        )
+
+        for modulo, segundos in self.importacoes.items():
+            api_startup_import_seconds.labels(module=modulo).set(segundos)
+        if self.antes_import is not None:
+            api_startup_duration_seconds.labels(stage="antes_import").set(self.antes_import)
+        for etapa, segundos in self.etapas.items():
+            api_startup_duration_seconds.labels(stage=etapa).set(segundos)
+        if self.primeiro_health is not None:
+            api_time_to_first_health_seconds.set(self.primeiro_health)
+
+
+__all__ = ["RelatorioInicializacao", "segundos_desde_inicio_processo"]
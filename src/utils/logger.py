@@ -28,7 +28,7 @@ def setup_logger(component: str, serialize: bool = False):
     Configura o logger para um componente específico
     
     Args:
-        component: Nome do componente (api, training, prediction, retraining)
+        component: Nome do componente (api, training, prediction, retraining, monitoring)
         serialize: Se True, grava logs em formato JSON
     
     Returns:
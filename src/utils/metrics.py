@@ -119,6 +119,243 @@ model_recall = Gauge(
     'Recall do modelo em validação'
 )
 
+# Gauge: Limites do intervalo de confiança (bootstrap) das métricas de validação
+model_metric_confidence_interval = Gauge(
+    'model_metric_confidence_interval',
+    'Limites do intervalo de confiança bootstrap das métricas de validação',
+    ['metric', 'bound']
+)
+
+# ============================================================================
+# MÉTRICAS DE PREDIÇÃO EM LOTE
+# ============================================================================
+
+# Gauge: Clientes reprocessados na última execução
+prediction_rows_rescored = Gauge(
+    'prediction_rows_rescored',
+    'Número de clientes reprocessados na última predição em lote'
+)
+
+# Gauge: Clientes reaproveitados do snapshot anterior
+prediction_rows_skipped = Gauge(
+    'prediction_rows_skipped',
+    'Número de clientes sem alteração reaproveitados do snapshot anterior'
+)
+
+# ============================================================================
+# MÉTRICAS DE DESEMPENHO ONLINE (RÓTULOS REAIS x PREDIÇÕES SERVIDAS)
+# ============================================================================
+
+# Gauge: F2-Score na janela de predições rotuladas
+model_online_f2_score = Gauge(
+    'model_online_f2_score',
+    'F2-Score do modelo na janela deslizante de predições com rótulo real'
+)
+
+# Gauge: AUC (aproximada por faixas de score) na janela
+model_online_auc_score = Gauge(
+    'model_online_auc_score',
+    'AUC-ROC aproximada do modelo na janela deslizante de predições com rótulo real'
+)
+
+# Gauge: Precisão na janela
+model_online_precision = Gauge(
+    'model_online_precision',
+    'Precisão do modelo na janela deslizante de predições com rótulo real'
+)
+
+# Gauge: Recall na janela
+model_online_recall = Gauge(
+    'model_online_recall',
+    'Recall do modelo na janela deslizante de predições com rótulo real'
+)
+
+# Gauge: Predições rotuladas na janela
+model_online_labeled_samples = Gauge(
+    'model_online_labeled_samples',
+    'Número de predições com rótulo real na janela deslizante'
+)
+
+# Gauge: Rótulos sem predição correspondente na última execução
+model_online_labels_unmatched = Gauge(
+    'model_online_labels_unmatched',
+    'Rótulos do último arquivo processado (todos os lotes) sem predição armazenada para o cliente'
+)
+
+# ============================================================================
+# MÉTRICAS DE SHADOW SCORING (MODELO DESAFIANTE)
+# ============================================================================
+
+shadow_score_distribution = Histogram(
+    'shadow_score_distribution',
+    'Distribuição dos scores de churn por versão do modelo (principal e desafiante)',
+    ['model_version', 'role'],
+    buckets=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+)
+
+shadow_requests_scored_total = Counter(
+    'shadow_requests_scored_total',
+    'Amostras pontuadas pelo modelo desafiante'
+)
+
+shadow_disagreements_total = Counter(
+    'shadow_disagreements_total',
+    'Amostras em que a decisão do desafiante difere da servida'
+)
+
+shadow_disagreement_rate = Gauge(
+    'shadow_disagreement_rate',
+    'Taxa acumulada de discordância entre modelo principal e desafiante'
+)
+
+shadow_queue_lag_seconds = Histogram(
+    'shadow_queue_lag_seconds',
+    'Tempo entre o enfileiramento da amostra e a pontuação pelo desafiante',
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+shadow_queue_size = Gauge(
+    'shadow_queue_size',
+    'Amostras aguardando na fila do shadow scoring'
+)
+
+shadow_dropped_total = Counter(
+    'shadow_dropped_total',
+    'Amostras descartadas pelo shadow scoring',
+    ['reason']
+)
+
+
+# ============================================================================
+# MÉTRICAS DO PROFILER SOB DEMANDA
+# ============================================================================
+
+api_profiler_active = Gauge(
+    'api_profiler_active',
+    'Sessão de profiling em andamento (1) ou não (0)'
+)
+
+api_profiler_sessions_total = Counter(
+    'api_profiler_sessions_total',
+    'Sessões de profiling iniciadas',
+    ['mode']
+)
+
+
+# ============================================================================
+# MÉTRICAS DE TRACING
+# ============================================================================
+
+# Histogram: Latência por rota (exemplars com trace_id das requisições exportadas)
+api_request_latency_seconds = Histogram(
+    'api_request_latency_seconds',
+    'Latência das requisições da API por rota (exemplars apontam para traces)',
+    ['endpoint'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+tracing_overhead_seconds = Histogram(
+    'tracing_overhead_seconds',
+    'Tempo gasto pelo próprio tracing em cada requisição',
+    buckets=[0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005]
+)
+
+tracing_overhead_ratio = Gauge(
+    'tracing_overhead_ratio',
+    'Média móvel da fração da latência gasta com tracing'
+)
+
+tracing_sample_rate = Gauge(
+    'tracing_sample_rate',
+    'Taxa de amostragem efetiva do tracing (reduzida se o custo passar do limite)'
+)
+
+tracing_spans_exported_total = Counter(
+    'tracing_spans_exported_total',
+    'Spans gravados no arquivo OTLP'
+)
+
+tracing_spans_dropped_total = Counter(
+    'tracing_spans_dropped_total',
+    'Spans descartados pelo tracing',
+    ['reason']
+)
+
+tracing_export_queue_size = Gauge(
+    'tracing_export_queue_size',
+    'Traces aguardando exportação'
+)
+
+
+# ============================================================================
+# MÉTRICAS DE CONTROLE DE ADMISSÃO
+# ============================================================================
+
+api_admission_shed_total = Counter(
+    'api_admission_shed_total',
+    'Requisições descartadas com 503 pelo controle de admissão',
+    ['route', 'reason']
+)
+
+api_admission_queued_total = Counter(
+    'api_admission_queued_total',
+    'Requisições que esperaram na fila de admissão',
+    ['route']
+)
+
+api_admission_queue_wait_seconds = Histogram(
+    'api_admission_queue_wait_seconds',
+    'Tempo de espera na fila de admissão',
+    ['route'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+api_admission_queue_size = Gauge(
+    'api_admission_queue_size',
+    'Requisições aguardando na fila de admissão',
+    ['route']
+)
+
+api_admission_in_flight = Gauge(
+    'api_admission_in_flight',
+    'Requisições admitidas em execução',
+    ['route']
+)
+
+
+# ============================================================================
+# MÉTRICAS DE CACHE HTTP
+# ============================================================================
+
+api_http_cache_responses_total = Counter(
+    'api_http_cache_responses_total',
+    'Respostas das rotas com ETag (nao_modificado = 304 sem executar o endpoint)',
+    ['route', 'result']
+)
+
+
+# ============================================================================
+# MÉTRICAS DE INICIALIZAÇÃO DA API
+# ============================================================================
+
+api_startup_import_seconds = Gauge(
+    'api_startup_import_seconds',
+    'Tempo do primeiro import de cada grupo de módulos da API',
+    ['module']
+)
+
+api_startup_duration_seconds = Gauge(
+    'api_startup_duration_seconds',
+    'Duração das etapas da inicialização da API',
+    ['stage']
+)
+
+api_time_to_first_health_seconds = Gauge(
+    'api_time_to_first_health_seconds',
+    'Tempo do início do processo até o primeiro /health saudável'
+)
+
+
 # ============================================================================
 # FUNÇÕES AUXILIARES
 # ============================================================================
@@ -200,6 +437,35 @@ def update_model_metrics(metrics_dict=None, **kwargs):
         model_recall.set(metrics['recall'])
 
 
+def update_model_confidence_intervals(avaliacao):
+    """
+    Atualiza os limites dos intervalos de confiança das métricas
+
+    Args:
+        avaliacao: DataFrame indexado pela métrica com colunas IC_inferior e IC_superior
+    """
+    for metrica, linha in avaliacao.iterrows():
+        model_metric_confidence_interval.labels(metric=metrica, bound='lower').set(linha['IC_inferior'])
+        model_metric_confidence_interval.labels(metric=metrica, bound='upper').set(linha['IC_superior'])
+
+
+def update_online_metrics(metricas: dict):
+    """
+    Atualiza as métricas de desempenho online
+
+    Args:
+        metricas: dicionário de MonitorOnline.metricas() (f2_score, auc, precisão, recall, amostras)
+    """
+    model_online_labeled_samples.set(metricas['amostras'])
+    if metricas['amostras'] == 0:
+        return
+    model_online_f2_score.set(metricas['f2_score'])
+    model_online_precision.set(metricas['precisão'])
+    model_online_recall.set(metricas['recall'])
+    if metricas['auc'] == metricas['auc']:  # NaN quando a janela tem uma só classe
+        model_online_auc_score.set(metricas['auc'])
+
+
 def set_model_version(version_info):
     """
     Define informações da versão do modelo
@@ -271,10 +537,62 @@ __all__ = [
     'model_version_info',
     'model_precision',
     'model_recall',
+    'model_metric_confidence_interval',
+    
+    # Predição em lote
+    'prediction_rows_rescored',
+    'prediction_rows_skipped',
+    
+    # Desempenho online
+    'model_online_f2_score',
+    'model_online_auc_score',
+    'model_online_precision',
+    'model_online_recall',
+    'model_online_labeled_samples',
+    'model_online_labels_unmatched',
+    
+    # Shadow scoring
+    'shadow_score_distribution',
+    'shadow_requests_scored_total',
+    'shadow_disagreements_total',
+    'shadow_disagreement_rate',
+    'shadow_queue_lag_seconds',
+    'shadow_queue_size',
+    'shadow_dropped_total',
+    
+    # Profiler
+    'api_profiler_active',
+    'api_profiler_sessions_total',
+    
+    # Tracing
+    'api_request_latency_seconds',
+    'tracing_overhead_seconds',
+    'tracing_overhead_ratio',
+    'tracing_sample_rate',
+    'tracing_spans_exported_total',
+    'tracing_spans_dropped_total',
+    'tracing_export_queue_size',
+    
+    # Controle de admissão
+    'api_admission_shed_total',
+    'api_admission_queued_total',
+    'api_admission_queue_wait_seconds',
+    'api_admission_queue_size',
+    'api_admission_in_flight',
+    
+    # Cache HTTP
+    'api_http_cache_responses_total',
+    
+    # Inicialização
+    'api_startup_import_seconds',
+    'api_startup_duration_seconds',
+    'api_time_to_first_health_seconds',
     
     # Funções
     'update_churn_distribution_metrics',
     'update_model_metrics',
+    'update_model_confidence_intervals',
+    'update_online_metrics',
     'set_model_version',
     'track_api_request',
     
@@ -0,0 +1,178 @@
+"""
+Módulo de persistência e carregamento rápido do modelo
+
+O pipeline é serializado com pickle protocolo 5 e todos os arrays numpy grandes
+(nós e valores das árvores, dados de referência do KNNImputer, etc.) são gravados
+fora do stream de pickle ("out-of-band"), alinhados em 64 bytes no mesmo arquivo.
+No carregamento o arquivo é mapeado com mmap uma única vez e os arrays são
+reconstruídos como views somente-leitura sobre o mapeamento, sem descompressão
+e sem milhares de mapeamentos individuais.
+
+Layout do arquivo (.mmap):
+    MAGIC | pickle | buffers alinhados | rodapé JSON | tamanho do rodapé (u64) | MAGIC
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+from pathlib import Path
+
+from utils.logger import logger
+
+MAGIC = b"CHURNMM1"
+ALINHAMENTO = 64
+EXTENSAO_MMAP = ".mmap"
+
+
+def caminho_mmap(model_path) -> Path:
+    """Retorna o caminho do artefato mmap correspondente a um .joblib"""
+    return Path(model_path).with_suffix(EXTENSAO_MMAP)
+
+
+def memoria_residente_mb() -> float:
+    """
+    Retorna a memória residente (RSS) atual do processo em MB
+
+    Usa /proc/self/statm quando disponível; caso contrário, o pico (ru_maxrss).
+    """
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as f:
+            paginas_residentes = int(f.read().split()[1])
+        return paginas_residentes * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def salvar_modelo_mmap(modelo, path) -> dict:
+    """
+    Salva o modelo no layout otimizado para carregamento via mmap
+
+    Args:
+        modelo: objeto (pipeline) a ser serializado
+        path: caminho de destino (.mmap)
+
+    Returns:
+        Dicionário com informações do artefato (tamanho, buffers)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    buffers = []
+    payload = pickle.dumps(modelo, protocol=5, buffer_callback=buffers.append)
+
+    # Gravar em arquivo temporário e renomear para não expor artefato parcial
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        pickle_offset = f.tell()
+        f.write(payload)
+
+        offsets = []
+        for buffer in buffers:
+            dados = buffer.raw()
+            posicao = f.tell()
+            padding = (-posicao) % ALINHAMENTO
+            f.write(b"\0" * padding)
+            offsets.append([posicao + padding, dados.nbytes])
+            f.write(dados)
+
+        rodape = json.dumps({
+            "pickle": [pickle_offset, len(payload)],
+            "buffers": offsets,
+        }).encode("utf-8")
+        f.write(rodape)
+        f.write(struct.pack("<Q", len(rodape)))
+        f.write(MAGIC)
+    os.replace(tmp_path, path)
+
+    info = {
+        "path": str(path),
+        "tamanho_bytes": path.stat().st_size,
+        "buffers_out_of_band": len(buffers),
+        "pickle_bytes": len(payload),
+    }
+    logger.debug(f"Artefato mmap salvo: {info}")
+    return info
+
+
+def _carregar_mmap(path):
+    with open(path, "rb") as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapa[:len(MAGIC)] != MAGIC or mapa[-len(MAGIC):] != MAGIC:
+        raise ValueError(f"Arquivo não está no formato mmap do modelo: {path}")
+
+    fim_rodape = len(mapa) - len(MAGIC) - 8
+    tamanho_rodape = struct.unpack("<Q", mapa[fim_rodape:fim_rodape + 8])[0]
+    rodape = json.loads(mapa[fim_rodape - tamanho_rodape:fim_rodape])
+
+    # Views somente-leitura sobre o mapeamento: os arrays mantêm o mmap vivo
+    view = memoryview(mapa)
+    buffers = [view[offset:offset + tamanho] for offset, tamanho in rodape["buffers"]]
+    pickle_offset, pickle_tamanho = rodape["pickle"]
+    return pickle.loads(view[pickle_offset:pickle_offset + pickle_tamanho], buffers=buffers)
+
+
+def carregar_modelo(model_path, usar_mmap: bool = True, retornar_estatisticas: bool = False):
+    """
+    Carrega o pipeline do modelo, preferindo o artefato mmap quando disponível
+
+    O artefato mmap só é usado se existir ao lado do .joblib e não for mais
+    antigo que ele (evita carregar um artefato desatualizado).
+
+    Args:
+        model_path: caminho do modelo (.joblib ou .mmap)
+        usar_mmap: se False, força o carregamento via joblib
+        retornar_estatisticas: se True, retorna também o tempo e a memória gastos
+
+    Returns:
+        modelo, ou (modelo, estatisticas) se retornar_estatisticas=True
+    """
+    model_path = Path(model_path)
+    path_mmap = model_path if model_path.suffix == EXTENSAO_MMAP else caminho_mmap(model_path)
+
+    formato = "joblib"
+    if usar_mmap and path_mmap.exists():
+        if (model_path == path_mmap or not model_path.exists()
+                or path_mmap.stat().st_mtime >= model_path.stat().st_mtime):
+            formato = "mmap"
+        else:
+            logger.warning(f"Artefato mmap mais antigo que {model_path.name} - usando joblib")
+
+    rss_antes = memoria_residente_mb()
+    inicio = time.perf_counter()
+
+    if formato == "mmap":
+        modelo = _carregar_mmap(path_mmap)
+    else:
+        import joblib
+        modelo = joblib.load(model_path)
+
+    estatisticas = {
+        "formato": formato,
+        "path": str(path_mmap if formato == "mmap" else model_path),
+        "tempo_carregamento_segundos": time.perf_counter() - inicio,
+        "rss_antes_mb": rss_antes,
+        "rss_depois_mb": memoria_residente_mb(),
+    }
+    estatisticas["rss_delta_mb"] = estatisticas["rss_depois_mb"] - rss_antes
+
+    logger.info(
+        f"Modelo carregado ({formato}) em {estatisticas['tempo_carregamento_segundos']*1000:.1f} ms "
+        f"| RSS +{estatisticas['rss_delta_mb']:.1f} MB"
+    )
+
+    if retornar_estatisticas:
+        return modelo, estatisticas
+    return modelo
+
+
+__all__ = [
+    "caminho_mmap",
+    "memoria_residente_mb",
+    "salvar_modelo_mmap",
+    "carregar_modelo",
+]
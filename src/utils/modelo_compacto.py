@@ -0,0 +1,213 @@
+"""
+Módulo do modelo compacto (aluno) derivado do pipeline principal (professor)
+
+O aluno reutiliza as etapas de pré-processamento já ajustadas do professor e
+troca apenas o classificador final por um ensemble pequeno:
+
+- "destilacao": RandomForestRegressor raso ajustado nas probabilidades do professor
+- "poda": subconjunto das árvores do próprio professor, escolhido de forma gulosa
+  para reproduzir as probabilidades dele (menor erro quadrático a cada passo)
+
+Nos dois casos a decisão usa o limiar ajustado do professor (`best_threshold_`).
+`relatorio_compacto` compara F2/AUC, tamanho, tempo de carregamento e latência.
+"""
+import copy
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+from utils.logger import logger
+
+METODOS_COMPACTO = ("destilacao", "poda")
+
+# etapas do professor que não entram no aluno (sampler e classificador)
+ETAPAS_EXCLUIDAS = ("smote", "clf")
+
+
+class ClassificadorDestilado(ClassifierMixin, BaseEstimator):
+    """
+    Classificador binário sobre um modelo já ajustado, com limiar fixo
+
+    Args:
+        modelo: regressor (prevê a probabilidade) ou classificador com predict_proba
+        limiar: probabilidade mínima para prever a classe 1
+    """
+
+    def __init__(self, modelo=None, limiar=0.5):
+        self.modelo = modelo
+        self.limiar = limiar
+
+    def fit(self, X, y):
+        # o modelo chega ajustado; fit só registra as classes
+        self.classes_ = np.unique(y)
+        return self
+
+    def predict_proba(self, X):
+        if hasattr(self.modelo, "predict_proba"):
+            positiva = self.modelo.predict_proba(X)[:, 1]
+        else:
+            positiva = np.clip(self.modelo.predict(X), 0.0, 1.0)
+        return np.column_stack([1.0 - positiva, positiva])
+
+    def predict(self, X):
+        return self.classes_[(self.predict_proba(X)[:, 1] >= self.limiar).astype(int)]
+
+
+def _preprocessamento(pipeline):
+    return [(nome, etapa) for nome, etapa in pipeline.steps if nome not in ETAPAS_EXCLUIDAS]
+
+
+def _transformar(etapas, X):
+    for _, etapa in etapas:
+        X = etapa.transform(X)
+    return X
+
+
+def _podar_floresta(floresta, Xt, alvo, n_arvores):
+    """Seleção gulosa de árvores que minimiza o erro quadrático em relação ao professor"""
+    Xt = np.asarray(Xt, dtype=np.float32)
+    # probabilidade da classe 1 de cada árvore: (n_arvores_total, n_linhas)
+    por_arvore = np.stack([arvore.predict_proba(Xt)[:, 1] for arvore in floresta.estimators_])
+
+    escolhidas, soma = [], np.zeros(len(alvo))
+    disponiveis = np.ones(len(por_arvore), dtype=bool)
+    for k in range(1, min(n_arvores, len(por_arvore)) + 1):
+        erros = (((soma + por_arvore) / k - alvo) ** 2).mean(axis=1)
+        erros[~disponiveis] = np.inf
+        melhor = int(np.argmin(erros))
+        escolhidas.append(melhor)
+        disponiveis[melhor] = False
+        soma += por_arvore[melhor]
+
+    podada = copy.copy(floresta)
+    podada.estimators_ = [floresta.estimators_[i] for i in escolhidas]
+    podada.n_estimators = len(escolhidas)
+    return podada
+
+
+def criar_modelo_compacto(pipeline, X, metodo="destilacao", n_arvores=50, max_depth=10,
+                          random_state=42, n_jobs=None):
+    """
+    Cria o aluno a partir do pipeline principal ajustado
+
+    Args:
+        pipeline: pipeline ajustado com TunedThresholdClassifierCV na etapa "clf"
+        X: dados (brutos) usados para gerar as probabilidades do professor
+        metodo: "destilacao" ou "poda"
+        n_arvores: árvores do aluno
+        max_depth: profundidade das árvores (apenas "destilacao")
+        random_state: semente do regressor
+        n_jobs: paralelismo do regressor
+
+    Returns:
+        Pipeline compacto (pré-processamento do professor + ClassificadorDestilado)
+    """
+    from imblearn.pipeline import Pipeline
+
+    if metodo not in METODOS_COMPACTO:
+        raise ValueError(f"Método de compactação inválido: {metodo}. Use: {list(METODOS_COMPACTO)}")
+
+    professor = pipeline.named_steps["clf"]
+    etapas = _preprocessamento(pipeline)
+    Xt = _transformar(etapas, X)
+    alvo = professor.predict_proba(Xt)[:, 1]
+
+    if metodo == "destilacao":
+        from sklearn.ensemble import RandomForestRegressor
+
+        modelo = RandomForestRegressor(
+            n_estimators=n_arvores,
+            max_depth=max_depth,
+            min_samples_leaf=5,
+            max_features="sqrt",
+            random_state=random_state,
+            n_jobs=n_jobs,
+        ).fit(Xt, alvo)
+    else:
+        modelo = _podar_floresta(professor.estimator_, Xt, alvo, n_arvores)
+
+    aluno = ClassificadorDestilado(modelo, limiar=float(professor.best_threshold_))
+    aluno.fit(Xt[:1], professor.classes_)
+    logger.success(
+        f"Modelo compacto ({metodo}): {n_arvores} árvores | limiar {aluno.limiar:.4f} "
+        f"(professor: {len(professor.estimator_.estimators_)} árvores)"
+    )
+    return Pipeline(steps=etapas + [("clf", aluno)])
+
+
+def _sem_cache(modelo):
+    """Cópia rasa do pipeline sem o cache de etapas (`memory`), como ele é exportado"""
+    if getattr(modelo, "memory", None) is None:
+        return modelo
+    return copy.copy(modelo).set_params(memory=None)
+
+
+def _medir(modelo, X, y, diretorio: Path, nome: str) -> dict:
+    import joblib
+    from sklearn.metrics import fbeta_score, roc_auc_score
+
+    modelo = _sem_cache(modelo)
+    caminho = diretorio / f"{nome}.joblib"
+    joblib.dump(modelo, caminho)
+    inicio = time.perf_counter()
+    carregado = joblib.load(caminho)
+    tempo_carregamento = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    proba = carregado.predict_proba(X)[:, 1]
+    tempo_lote = time.perf_counter() - inicio
+
+    # latência de uma linha (mediana de algumas chamadas)
+    linha = X.iloc[:1]
+    tempos = []
+    for _ in range(20):
+        inicio = time.perf_counter()
+        carregado.predict_proba(linha)
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        "modelo": nome,
+        "f2_score": fbeta_score(y, carregado.predict(X), beta=2, average="weighted"),
+        "auc": roc_auc_score(y, proba),
+        "tamanho_mb": caminho.stat().st_size / 1024 ** 2,
+        "tempo_carregamento_ms": tempo_carregamento * 1000,
+        "latencia_lote_ms_por_linha": tempo_lote * 1000 / len(X),
+        "latencia_linha_unica_ms": float(np.median(tempos)) * 1000,
+    }
+
+
+def relatorio_compacto(professor, aluno, X, y, caminho_csv=None) -> pd.DataFrame:
+    """
+    Compara professor e aluno em dados de validação
+
+    Returns:
+        DataFrame com F2, AUC, tamanho, tempo de carregamento e latência por modelo
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        linhas = [
+            _medir(professor, X, y, Path(diretorio), "principal"),
+            _medir(aluno, X, y, Path(diretorio), "compacto"),
+        ]
+    relatorio = pd.DataFrame(linhas).set_index("modelo")
+    for modelo, r in relatorio.iterrows():
+        logger.info(
+            f"  {modelo}: F2 {r['f2_score']:.4f} | AUC {r['auc']:.4f} | {r['tamanho_mb']:.1f} MB | "
+            f"carga {r['tempo_carregamento_ms']:.0f} ms | {r['latencia_linha_unica_ms']:.1f} ms/linha única"
+        )
+    if caminho_csv is not None:
+        Path(caminho_csv).parent.mkdir(parents=True, exist_ok=True)
+        relatorio.to_csv(caminho_csv)
+        logger.success(f"Relatório do modelo compacto salvo em: {caminho_csv}")
+    return relatorio
+
+
+__all__ = [
+    "METODOS_COMPACTO",
+    "ClassificadorDestilado",
+    "criar_modelo_compacto",
+    "relatorio_compacto",
+]
@@ -0,0 +1,212 @@
+"""
+Módulo de monitoramento online do desempenho do modelo
+
+Os rótulos reais (`saiu`) chegam depois das predições servidas. `MonitorOnline`
+junta cada lote de rótulos às predições armazenadas (por `id_cliente`) e mantém,
+sobre uma janela deslizante das últimas N predições rotuladas:
+
+- buffer circular com id, probabilidade, rótulo e classe prevista, mais um índice
+  id -> posição no buffer (a checagem de clientes já na janela custa O(lote),
+  não O(janela))
+- contagens da matriz de confusão (tp, fp, fn, tn)
+- histogramas por faixa de score de positivos e negativos, usados na AUC
+  aproximada (estatística de Mann-Whitney por faixas)
+
+Cada lote apenas soma as entradas novas e subtrai as que saem da janela: nenhum
+dado antigo é relido. O estado é persistido em um arquivo .npz.
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CAMPOS_CONFUSAO = ("tp", "fp", "fn", "tn")
+
+
+class MonitorOnline:
+    """
+    Janela deslizante de predições rotuladas com métricas incrementais
+
+    Args:
+        janela: número máximo de predições rotuladas consideradas
+        n_faixas: faixas de score do histograma da AUC
+    """
+
+    def __init__(self, janela: int = 10_000, n_faixas: int = 100):
+        self.janela = janela
+        self.n_faixas = n_faixas
+        self.ids = np.zeros(janela, dtype=np.int64)
+        self.proba = np.zeros(janela, dtype=np.float32)
+        self.rotulo = np.zeros(janela, dtype=np.int8)
+        self.previsto = np.zeros(janela, dtype=np.int8)
+        self.posicao = 0
+        self.tamanho = 0
+        self.confusao = np.zeros(4, dtype=np.int64)
+        self.hist_pos = np.zeros(n_faixas, dtype=np.int64)
+        self.hist_neg = np.zeros(n_faixas, dtype=np.int64)
+        self.total_processado = 0
+        self._posicoes = {}  # id_cliente -> posição no buffer
+
+    def _indexar(self):
+        """Reconstrói o índice id -> posição a partir do buffer (usado ao carregar o estado)"""
+        self._posicoes = dict(zip(self.ids[:self.tamanho].tolist(), range(self.tamanho)))
+
+    # ------------------------------------------------------------------
+    # atualização incremental
+    # ------------------------------------------------------------------
+    def _faixas(self, proba):
+        return np.clip((np.asarray(proba) * self.n_faixas).astype(np.int64), 0, self.n_faixas - 1)
+
+    def _contribuir(self, proba, rotulo, previsto, sinal: int):
+        """Soma (sinal=+1) ou remove (sinal=-1) entradas das contagens e histogramas"""
+        rotulo = rotulo.astype(np.int64)
+        previsto = previsto.astype(np.int64)
+        self.confusao += sinal * np.array([
+            np.sum(rotulo & previsto),
+            np.sum((1 - rotulo) & previsto),
+            np.sum(rotulo & (1 - previsto)),
+            np.sum((1 - rotulo) & (1 - previsto)),
+        ])
+        faixas = self._faixas(proba)
+        self.hist_pos += sinal * np.bincount(faixas, weights=rotulo, minlength=self.n_faixas).astype(np.int64)
+        self.hist_neg += sinal * np.bincount(faixas, weights=1 - rotulo, minlength=self.n_faixas).astype(np.int64)
+
+    def atualizar(self, ids, proba, rotulo, limiar: float = 0.5) -> int:
+        """
+        Adiciona um lote de predições rotuladas à janela
+
+        Clientes que já estão na janela são ignorados (o mesmo rótulo não conta duas vezes).
+
+        Returns:
+            Número de entradas efetivamente adicionadas
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        proba = np.asarray(proba, dtype=np.float32)
+        rotulo = np.asarray(rotulo, dtype=np.int8)
+
+        novos = np.fromiter((i not in self._posicoes for i in ids.tolist()), dtype=bool, count=len(ids))
+        _, primeira = np.unique(ids, return_index=True)
+        unicos = np.zeros(len(ids), dtype=bool)
+        unicos[primeira] = True
+        selecao = novos & unicos
+        ids, proba, rotulo = ids[selecao][-self.janela:], proba[selecao][-self.janela:], rotulo[selecao][-self.janela:]
+        previsto = (proba >= limiar).astype(np.int8)
+        n = len(ids)
+        if n == 0:
+            return 0
+
+        posicoes = (self.posicao + np.arange(n)) % self.janela
+        # as próximas (janela - tamanho) posições estão livres; as demais saem da janela
+        ocupadas = posicoes[np.arange(n) >= self.janela - self.tamanho]
+        if len(ocupadas):
+            self._contribuir(self.proba[ocupadas], self.rotulo[ocupadas], self.previsto[ocupadas], -1)
+            for id_saindo in self.ids[ocupadas].tolist():
+                del self._posicoes[id_saindo]
+
+        self._posicoes.update(zip(ids.tolist(), posicoes.tolist()))
+        self.ids[posicoes] = ids
+        self.proba[posicoes] = proba
+        self.rotulo[posicoes] = rotulo
+        self.previsto[posicoes] = previsto
+        self._contribuir(proba, rotulo, previsto, +1)
+
+        self.posicao = int((self.posicao + n) % self.janela)
+        self.tamanho = int(min(self.tamanho + n, self.janela))
+        self.total_processado += n
+        return n
+
+    # ------------------------------------------------------------------
+    # métricas
+    # ------------------------------------------------------------------
+    def auc(self) -> float:
+        """AUC aproximada pelos histogramas (empates dentro da faixa contam 1/2)"""
+        positivos, negativos = self.hist_pos.sum(), self.hist_neg.sum()
+        if positivos == 0 or negativos == 0:
+            return float("nan")
+        negativos_abaixo = np.cumsum(self.hist_neg) - self.hist_neg
+        return float((self.hist_pos * (negativos_abaixo + 0.5 * self.hist_neg)).sum() / (positivos * negativos))
+
+    def metricas(self) -> dict:
+        """F2/precisão/recall ponderados (como no treino) e AUC da janela atual"""
+        tp, fp, fn, tn = (float(v) for v in self.confusao)
+        positivos, negativos = tp + fn, tn + fp
+        total = positivos + negativos
+
+        def razao(a, b):
+            return a / b if b > 0 else 0.0
+
+        def f2(acertos, falsos_pos, falsos_neg):
+            return razao(5 * acertos, 5 * acertos + 4 * falsos_neg + falsos_pos)
+
+        def ponderada(classe_1, classe_0):
+            return razao(positivos * classe_1 + negativos * classe_0, total)
+
+        return {
+            "amostras": int(total),
+            "f2_score": ponderada(f2(tp, fp, fn), f2(tn, fn, fp)),
+            "precisão": ponderada(razao(tp, tp + fp), razao(tn, tn + fn)),
+            "recall": ponderada(razao(tp, positivos), razao(tn, negativos)),
+            "auc": self.auc(),
+            **{campo: int(valor) for campo, valor in zip(CAMPOS_CONFUSAO, self.confusao)},
+        }
+
+    # ------------------------------------------------------------------
+    # persistência
+    # ------------------------------------------------------------------
+    def salvar(self, caminho):
+        """Salva o estado de forma atômica (arquivo temporário + rename)"""
+        caminho = Path(caminho)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_name(caminho.name + ".tmp")
+        with open(temporario, "wb") as f:
+            np.savez(
+                f,
+                janela=self.janela, n_faixas=self.n_faixas,
+                ids=self.ids, proba=self.proba, rotulo=self.rotulo, previsto=self.previsto,
+                posicao=self.posicao, tamanho=self.tamanho, confusao=self.confusao,
+                hist_pos=self.hist_pos, hist_neg=self.hist_neg, total_processado=self.total_processado,
+            )
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho, janela: int = 10_000, n_faixas: int = 100) -> "MonitorOnline":
+        """Carrega o estado salvo (ou cria um monitor vazio se não houver estado compatível)"""
+        caminho = Path(caminho)
+        if not caminho.exists():
+            return cls(janela, n_faixas)
+        with np.load(caminho) as estado:
+            if int(estado["janela"]) != janela or int(estado["n_faixas"]) != n_faixas:
+                return cls(janela, n_faixas)
+            monitor = cls(janela, n_faixas)
+            for campo in ("ids", "proba", "rotulo", "previsto", "confusao", "hist_pos", "hist_neg"):
+                setattr(monitor, campo, estado[campo].copy())
+            monitor.posicao = int(estado["posicao"])
+            monitor.tamanho = int(estado["tamanho"])
+            monitor.total_processado = int(estado["total_processado"])
+        monitor._indexar()
+        return monitor
+
+
+def juntar_rotulos(predicoes: pd.Series, rotulos: pd.DataFrame, coluna_id="id_cliente", coluna_alvo="saiu"):
+    """
+    Junta rótulos às predições armazenadas pelo id do cliente
+
+    Args:
+        predicoes: probabilidades indexadas pelo id do cliente
+        rotulos: lote com as colunas de id e de rótulo
+
+    Returns:
+        (ids, proba, rotulo, n_sem_predicao)
+    """
+    proba = rotulos[coluna_id].map(predicoes)
+    encontrados = proba.notna().to_numpy()
+    return (
+        rotulos[coluna_id].to_numpy()[encontrados],
+        proba.to_numpy(dtype=float)[encontrados],
+        rotulos[coluna_alvo].to_numpy()[encontrados],
+        int((~encontrados).sum()),
+    )
+
+
+__all__ = ["MonitorOnline", "juntar_rotulos", "CAMPOS_CONFUSAO"]
@@ -0,0 +1,131 @@
+"""
+Módulo de controle de paralelismo do treinamento
+
+O pipeline tem níveis de paralelismo que, com `n_jobs=-1` em todos, se
+multiplicam: folds do `TunedThresholdClassifierCV` × árvores do RandomForest
+(+ threads BLAS/OpenMP das transformações numéricas), além dos candidatos da
+busca de hiperparâmetros. Este módulo divide um orçamento total de núcleos entre
+os níveis conforme a carga (árvores, folds, tarefas da busca), limita as threads
+BLAS/OpenMP e mede a utilização de CPU obtida:
+
+- floresta: até uma árvore por worker, min(orçamento, árvores). Depois dos folds,
+  o `TunedThresholdClassifierCV` reajusta a floresta nos dados completos fora do
+  CV, então a floresta tem prioridade sobre os folds
+- CV: folds em paralelo só com os núcleos que a floresta não consegue ocupar
+  (orçamento // floresta, até o número de folds)
+- busca: candidatos × folds da primeira rodada em paralelo (até o orçamento), com
+  a floresta de cada candidato em orçamento // busca workers (em geral 1). As
+  rodadas iniciais usam poucos dados ou poucas árvores, e paralelizar as árvores
+  ganha pouco nelas
+- transformadores: ColumnTransformers rodam fora do CV, com o orçamento inteiro
+- BLAS/OpenMP: núcleos que sobram por worker folha (orçamento // (CV × floresta))
+"""
+import os
+import resource
+import time
+
+from utils.logger import logger
+
+
+def nucleos_disponiveis() -> int:
+    """Núcleos que o processo pode usar (respeita afinidade/cgroups via sched_getaffinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def planejar_paralelismo(orcamento: int = None, n_transformadores: int = 3, n_arvores: int = 1000,
+                         n_folds: int = 5, tarefas_busca: int = 0) -> dict:
+    """
+    Divide o orçamento de núcleos entre os níveis do treinamento
+
+    Args:
+        orcamento: total de núcleos (None = todos os disponíveis)
+        n_transformadores: maior número de sub-transformers de um ColumnTransformer
+        n_arvores: árvores do RandomForest principal
+        n_folds: folds do `TunedThresholdClassifierCV`
+        tarefas_busca: candidatos × folds da primeira rodada da busca (0 = sem busca)
+
+    Returns:
+        Plano {orcamento, nucleos_disponiveis, cv, floresta, busca, floresta_busca, transformadores, blas}
+    """
+    disponiveis = nucleos_disponiveis()
+    orcamento = max(1, min(orcamento or disponiveis, disponiveis))
+
+    floresta = max(1, min(orcamento, n_arvores))
+    cv = max(1, min(n_folds, orcamento // floresta))
+    busca = max(1, min(orcamento, tarefas_busca))
+    return {
+        "orcamento": orcamento,
+        "nucleos_disponiveis": disponiveis,
+        "cv": cv,
+        "floresta": floresta,
+        "busca": busca,
+        "floresta_busca": max(1, orcamento // busca),
+        "transformadores": min(n_transformadores, orcamento),
+        "blas": max(1, orcamento // (cv * floresta)),
+    }
+
+
+def limitar_threads(plano: dict):
+    """
+    Limita as threads BLAS/OpenMP ao valor do plano
+
+    Aplica o limite no processo atual (threadpoolctl) e exporta as variáveis de
+    ambiente herdadas pelos workers loky criados pelo joblib.
+
+    Returns:
+        Objeto `threadpool_limits` (`restore_original_limits()` desfaz o limite no processo)
+    """
+    from threadpoolctl import threadpool_limits
+
+    for variavel in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variavel] = str(plano["blas"])
+    return threadpool_limits(limits=plano["blas"])
+
+
+class MedidorCPU:
+    """
+    Mede o tempo de CPU (processo + filhos) e a utilização do orçamento
+
+    Os workers loky do joblib são reutilizáveis e só entram em RUSAGE_CHILDREN
+    depois de encerrados; `finalizar()` encerra o executor antes da medição.
+    """
+
+    def __init__(self, orcamento: int):
+        self.orcamento = orcamento
+        self._inicio_parede = time.perf_counter()
+        self._inicio_cpu = self._tempo_cpu()
+
+    @staticmethod
+    def _tempo_cpu() -> float:
+        total = 0.0
+        for quem in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+            uso = resource.getrusage(quem)
+            total += uso.ru_utime + uso.ru_stime
+        return total
+
+    def finalizar(self) -> dict:
+        """
+        Returns:
+            {tempo_cpu_segundos, tempo_parede_segundos, nucleos_efetivos, utilizacao_orcamento}
+        """
+        try:
+            from joblib.externals.loky import get_reusable_executor
+            get_reusable_executor().shutdown(wait=True)
+        except Exception as e:
+            logger.debug(f"Não foi possível encerrar os workers loky: {e}")
+
+        parede = time.perf_counter() - self._inicio_parede
+        cpu = self._tempo_cpu() - self._inicio_cpu
+        nucleos_efetivos = cpu / parede if parede > 0 else 0.0
+        return {
+            "tempo_cpu_segundos": round(cpu, 2),
+            "tempo_parede_segundos": round(parede, 2),
+            "nucleos_efetivos": round(nucleos_efetivos, 2),
+            "utilizacao_orcamento": round(nucleos_efetivos / self.orcamento, 3),
+        }
+
+
+__all__ = ["nucleos_disponiveis", "planejar_paralelismo", "limitar_threads", "MedidorCPU"]
@@ -0,0 +1,167 @@
+"""
+Módulo de profiling sob demanda da API em execução
+
+`ProfilerAmostragem` é um profiler estatístico: uma thread daemon lê a pilha de
+todas as threads (`sys._current_frames()`) a cada intervalo, durante N segundos,
+e conta as pilhas no formato "collapsed" (uma linha `quadro;quadro;... contagem`),
+consumido por flamegraph.pl, speedscope e inferno.
+
+No modo memória, o tracemalloc fica ativo durante a sessão. Ele só guarda os
+blocos ainda vivos, então o resultado é a alocação líquida retida: a diferença
+entre o snapshot do fim e o do início da sessão, por pilha (bytes e blocos). Uma
+alocação feita e liberada dentro da sessão não aparece ali; o pico de memória
+rastreada (`pico_bytes`) mostra o quanto essas alocações transitórias pesaram.
+
+Nada é instalado no interpretador fora de uma sessão: sem thread, sem hooks e
+sem tracemalloc, ou seja, custo zero quando inativo.
+"""
+import collections
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from utils.logger import logger
+from utils.metrics import api_profiler_active, api_profiler_sessions_total
+
+MODOS = ("cpu", "memoria")
+
+
+def _quadro(frame) -> str:
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({Path(codigo.co_filename).name}:{frame.f_lineno})"
+
+
+def _pilha_colapsada(nome_thread: str, frame) -> str:
+    quadros = []
+    while frame is not None:
+        quadros.append(_quadro(frame))
+        frame = frame.f_back
+    quadros.append(nome_thread)
+    return ";".join(reversed(quadros))
+
+
+class SessaoEmAndamento(RuntimeError):
+    """Já existe uma sessão de profiling ativa"""
+
+
+class ProfilerAmostragem:
+    """
+    Profiler estatístico de todas as threads do processo (uma sessão por vez)
+
+    Args:
+        top_alocacoes: pontos de alocação retornados no modo memória
+        frames_alocacao: profundidade da pilha guardada pelo tracemalloc
+    """
+
+    def __init__(self, top_alocacoes: int = 25, frames_alocacao: int = 10):
+        self.top_alocacoes = top_alocacoes
+        self.frames_alocacao = frames_alocacao
+        self._trava = threading.Lock()
+        self._thread = None
+        self._parar = threading.Event()
+        self.resultado = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self, segundos: float, intervalo: float = 0.01, modo: str = "cpu"):
+        """Inicia uma sessão em segundo plano (SessaoEmAndamento se já houver uma ativa)"""
+        if modo not in MODOS:
+            raise ValueError(f"Modo inválido: {modo}. Use: {list(MODOS)}")
+        with self._trava:
+            if self.ativo:
+                raise SessaoEmAndamento("Sessão de profiling em andamento")
+            if modo == "memoria" and tracemalloc.is_tracing():
+                raise SessaoEmAndamento("tracemalloc já está ativo neste processo")
+            self._parar.clear()
+            self.resultado = None
+            self._thread = threading.Thread(
+                target=self._executar, args=(segundos, intervalo, modo), name="profiler-amostragem", daemon=True
+            )
+            api_profiler_active.set(1)
+            api_profiler_sessions_total.labels(mode=modo).inc()
+            self._thread.start()
+        logger.info(f"Profiler iniciado: modo {modo} | {segundos}s | intervalo {intervalo * 1000:.1f} ms")
+
+    def aguardar(self, timeout: float = None) -> dict:
+        """Espera a sessão terminar e retorna o resultado"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.resultado
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self, segundos: float, intervalo: float, modo: str):
+        pilhas = collections.Counter()
+        amostras, custo = 0, 0.0
+        proprio = threading.get_ident()
+        if modo == "memoria":
+            tracemalloc.start(self.frames_alocacao)
+            snapshot_inicial = tracemalloc.take_snapshot()
+        inicio = time.perf_counter()
+        try:
+            while not self._parar.is_set() and time.perf_counter() - inicio < segundos:
+                antes = time.perf_counter()
+                nomes = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident != proprio:
+                        pilhas[_pilha_colapsada(nomes.get(ident, f"thread-{ident}"), frame)] += 1
+                amostras += 1
+                custo += time.perf_counter() - antes
+                self._parar.wait(intervalo)
+
+            duracao = time.perf_counter() - inicio
+            self.resultado = {
+                "modo": modo,
+                "duracao_s": duracao,
+                "intervalo_s": intervalo,
+                "amostras": amostras,
+                # fração do tempo de parede gasto lendo pilhas (segura o GIL)
+                "custo_amostragem": custo / duracao if duracao > 0 else 0.0,
+                "pilhas": pilhas,
+            }
+            if modo == "memoria":
+                self.resultado["pico_bytes"] = tracemalloc.get_traced_memory()[1]
+                self.resultado["alocacoes_retidas"] = self._top_alocacoes(
+                    tracemalloc.take_snapshot(), snapshot_inicial
+                )
+        except Exception as e:
+            logger.exception(f"Erro no profiler: {e}")
+            self.resultado = {"modo": modo, "erro": str(e)}
+        finally:
+            if modo == "memoria":
+                tracemalloc.stop()
+            api_profiler_active.set(0)
+        logger.info(f"Profiler concluído: {amostras} amostras em {time.perf_counter() - inicio:.1f}s")
+
+    def _top_alocacoes(self, snapshot, snapshot_inicial) -> list:
+        """Pilhas com maior alocação líquida retida entre o início e o fim da sessão"""
+        filtros = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, __file__),
+        ]
+        diferencas = snapshot.filter_traces(filtros).compare_to(snapshot_inicial.filter_traces(filtros), "traceback")
+        # compare_to ordena pelo valor absoluto: as pilhas que liberaram memória saem antes do corte
+        retidas = [diferenca for diferenca in diferencas if diferenca.size_diff > 0]
+        return [
+            {
+                "bytes": diferenca.size_diff,
+                "blocos": diferenca.count_diff,
+                # da chamada mais externa ao ponto de alocação
+                "pilha": [f"{quadro.filename}:{quadro.lineno}" for quadro in diferenca.traceback],
+            }
+            for diferenca in retidas[:self.top_alocacoes]
+        ]
+
+
+def formatar_colapsado(pilhas: collections.Counter) -> str:
+    """Pilhas no formato collapsed (`quadro;quadro;... contagem`), das mais frequentes às menos"""
+    return "\n".join(f"{pilha} {contagem}" for pilha, contagem in pilhas.most_common()) + "\n"
+
+
+__all__ = ["ProfilerAmostragem", "SessaoEmAndamento", "formatar_colapsado", "MODOS"]
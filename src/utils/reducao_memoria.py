@@ -0,0 +1,56 @@
+"""
+Módulo de etapas do modo de treino com baixo uso de memória
+
+- `para_float32`: converte a saída das transformações para float32 antes do
+  PolynomialFeatures, que preserva o dtype; o RandomForest já trabalha
+  internamente em float32, então nenhuma cópia float64 é criada depois disso
+- `VarianceThreshold(0)`: remove, antes do SMOTE, colunas de variância zero
+  geradas pelo PolynomialFeatures (ex.: interações entre colunas one-hot da
+  mesma variável, que são sempre 0)
+- poda opcional por importância (`SelectFromModel` com uma floresta pequena)
+"""
+import numpy as np
+from sklearn.feature_selection import SelectFromModel, VarianceThreshold
+from sklearn.preprocessing import FunctionTransformer
+
+
+def para_float32(X):
+    """Converte o array/DataFrame para float32"""
+    return X.astype(np.float32)
+
+
+def etapas_conversao_float32():
+    """Etapa inserida antes do PolynomialFeatures"""
+    return [("float32", FunctionTransformer(para_float32, feature_names_out="one-to-one"))]
+
+
+def etapas_poda_colunas(poda_importancia: bool = False, limiar_importancia="median",
+                        random_state: int = 42, n_jobs=None):
+    """
+    Etapas inseridas entre o PolynomialFeatures e o SMOTE
+
+    Args:
+        poda_importancia: se True, mantém apenas colunas com importância >= limiar
+        limiar_importancia: limiar do SelectFromModel (ex.: "median", "mean", 0.001)
+        random_state: semente da floresta usada na poda por importância
+        n_jobs: paralelismo da floresta usada na poda por importância
+
+    Returns:
+        Lista de etapas (nome, transformer) para o Pipeline
+    """
+    etapas = [("poda_variancia", VarianceThreshold(threshold=0.0))]
+    if poda_importancia:
+        from sklearn.ensemble import RandomForestClassifier
+
+        floresta_poda = RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            class_weight="balanced",
+            random_state=random_state,
+            n_jobs=n_jobs,
+        )
+        etapas.append(("poda_importancia", SelectFromModel(floresta_poda, threshold=limiar_importancia)))
+    return etapas
+
+
+__all__ = ["para_float32", "etapas_conversao_float32", "etapas_poda_colunas"]
@@ -0,0 +1,222 @@
+"""
+Módulo de registro local de modelos e snapshots de predição
+
+Registro endereçado por conteúdo (sha256):
+
+    registry/
+        objetos/<sha256>            artefatos imutáveis (modelo, mmap, metadados, predições)
+        versoes/<id>.json           manifesto da entrada: {artefato: sha256} + metadados
+        ATUAL                       entrada atual (escrita atômica)
+        historico.jsonl             trocas do ponteiro ATUAL (permite voltar à anterior)
+
+Cada treino registra uma entrada com id = model_version. Cada predição registra
+um snapshot com id próprio (<model_version>@<data>), que referencia os artefatos
+do modelo que o gerou; assim, repontuar com o mesmo modelo não sobrescreve o
+snapshot anterior, e o rollback continua alcançando-o. A versão do modelo fica em
+`model_version` no manifesto.
+
+Artefatos idênticos são armazenados uma única vez. Trocar de entrada é apenas
+reescrever o ponteiro; nenhum artefato é recalculado.
+"""
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+from utils.logger import logger
+
+
+def _hash_arquivo(caminho: Path) -> str:
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _nome_seguro(versao: str) -> str:
+    # versões podem ter sufixos como ":compacto"
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in versao)
+
+
+def id_entrada(manifesto: dict) -> str:
+    """Id da entrada do registro (manifestos antigos usam a própria model_version)"""
+    return manifesto.get("id", manifesto["model_version"])
+
+
+def _escrever_atomico(caminho: Path, conteudo: str):
+    temporario = caminho.with_name(caminho.name + ".tmp")
+    temporario.write_text(conteudo, encoding="utf-8")
+    os.replace(temporario, caminho)
+
+
+class RegistroModelos:
+    """
+    Registro de versões de modelo e snapshots de predição
+
+    Args:
+        diretorio: raiz do registro
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = Path(diretorio)
+        self.objetos = self.diretorio / "objetos"
+        self.versoes_dir = self.diretorio / "versoes"
+        self.ponteiro = self.diretorio / "ATUAL"
+        self.historico_path = self.diretorio / "historico.jsonl"
+
+    # ------------------------------------------------------------------
+    # artefatos
+    # ------------------------------------------------------------------
+    def _armazenar(self, caminho) -> str:
+        """Copia o arquivo para objetos/<sha256> (se ainda não existir) e retorna o hash"""
+        caminho = Path(caminho)
+        digest = _hash_arquivo(caminho)
+        destino = self.objetos / digest
+        if not destino.exists():
+            self.objetos.mkdir(parents=True, exist_ok=True)
+            temporario = destino.with_name(digest + ".tmp")
+            shutil.copyfile(caminho, temporario)
+            os.replace(temporario, destino)
+        return digest
+
+    def _manifesto_path(self, versao: str) -> Path:
+        return self.versoes_dir / f"{_nome_seguro(versao)}.json"
+
+    def manifesto(self, versao: str) -> dict:
+        caminho = self._manifesto_path(versao)
+        if not caminho.exists():
+            raise KeyError(f"Versão não registrada: {versao}")
+        return json.loads(caminho.read_text(encoding="utf-8"))
+
+    def registrar(self, versao: str, artefatos: dict, metadata: dict = None) -> dict:
+        """
+        Registra (ou complementa) uma entrada
+
+        Args:
+            versao: id da entrada (para modelos, a própria model_version)
+            artefatos: {nome: caminho} (ex.: modelo, modelo_mmap, metadata, predicoes)
+            metadata: metadados adicionais da entrada
+
+        Returns:
+            Manifesto da entrada
+        """
+        try:
+            manifesto = self.manifesto(versao)
+        except KeyError:
+            manifesto = {
+                "id": versao,
+                "model_version": versao,
+                "criado_em": datetime.now().isoformat(),
+                "artefatos": {},
+            }
+
+        for nome, caminho in artefatos.items():
+            if caminho is not None and Path(caminho).exists():
+                manifesto["artefatos"][nome] = self._armazenar(caminho)
+        if metadata:
+            manifesto.setdefault("metadata", {}).update(metadata)
+        manifesto["atualizado_em"] = datetime.now().isoformat()
+
+        self.versoes_dir.mkdir(parents=True, exist_ok=True)
+        _escrever_atomico(self._manifesto_path(versao), json.dumps(manifesto, ensure_ascii=False, indent=2, default=str))
+        logger.info(f"Registro: {versao} (modelo {manifesto['model_version']}) | artefatos {sorted(manifesto['artefatos'])}")
+        return manifesto
+
+    def registrar_snapshot(self, model_version: str, artefatos: dict, metadata: dict = None) -> dict:
+        """
+        Registra um snapshot de predição com id próprio (<model_version>@<data>)
+
+        Os artefatos do modelo que gerou o snapshot (se registrado) são referenciados
+        pelo mesmo sha256, sem cópia: restaurar o snapshot restaura também o modelo.
+
+        Returns:
+            Manifesto do snapshot (o id está em manifesto["id"])
+        """
+        snapshot_id = f"{model_version}@{datetime.now():%Y%m%dT%H%M%S%f}"
+        try:
+            artefatos_modelo = self.manifesto(model_version)["artefatos"]
+        except KeyError:
+            artefatos_modelo = {}
+        manifesto = {
+            "id": snapshot_id,
+            "model_version": model_version,
+            "criado_em": datetime.now().isoformat(),
+            "artefatos": dict(artefatos_modelo),
+        }
+        self.versoes_dir.mkdir(parents=True, exist_ok=True)
+        _escrever_atomico(self._manifesto_path(snapshot_id), json.dumps(manifesto, ensure_ascii=False, indent=2))
+        return self.registrar(snapshot_id, artefatos, metadata)
+
+    def caminho_artefato(self, versao: str, nome: str) -> Path:
+        """Caminho do artefato armazenado (somente leitura)"""
+        artefatos = self.manifesto(versao)["artefatos"]
+        if nome not in artefatos:
+            raise KeyError(f"Versão {versao} não tem o artefato '{nome}'")
+        return self.objetos / artefatos[nome]
+
+    def restaurar(self, versao: str, destinos: dict):
+        """Copia artefatos da versão para os caminhos de trabalho ({nome: destino})"""
+        for nome, destino in destinos.items():
+            try:
+                origem = self.caminho_artefato(versao, nome)
+            except KeyError:
+                continue
+            Path(destino).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(origem, destino)
+            logger.info(f"Registro: {nome} da versão {versao} restaurado em {destino}")
+
+    # ------------------------------------------------------------------
+    # versões e ponteiro atual
+    # ------------------------------------------------------------------
+    def versoes(self) -> list:
+        """Manifestos de todas as versões, da mais antiga para a mais recente"""
+        if not self.versoes_dir.exists():
+            return []
+        manifestos = [json.loads(p.read_text(encoding="utf-8")) for p in self.versoes_dir.glob("*.json")]
+        return sorted(manifestos, key=lambda m: m["criado_em"])
+
+    def atual(self):
+        """Versão apontada por ATUAL (None se o registro estiver vazio)"""
+        if not self.ponteiro.exists():
+            return None
+        return self.ponteiro.read_text(encoding="utf-8").strip() or None
+
+    def definir_atual(self, versao: str, motivo: str = "promocao"):
+        """Aponta ATUAL para a versão (O(1)) e registra a troca no histórico"""
+        self.manifesto(versao)  # valida que a versão existe
+        anterior = self.atual()
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        _escrever_atomico(self.ponteiro, versao)
+        with open(self.historico_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "data": datetime.now().isoformat(), "de": anterior, "para": versao, "motivo": motivo
+            }, ensure_ascii=False) + "\n")
+
+    def anterior(self, com_artefato: str = None):
+        """
+        Última versão que esteve ATUAL antes da atual
+
+        Args:
+            com_artefato: considera apenas versões que tenham esse artefato (ex.: "predicoes")
+        """
+        atual = self.atual()
+        if not self.historico_path.exists():
+            return None
+        linhas = self.historico_path.read_text(encoding="utf-8").splitlines()
+        for linha in reversed(linhas):
+            versao = json.loads(linha)["para"]
+            if versao == atual:
+                continue
+            try:
+                artefatos = self.manifesto(versao)["artefatos"]
+            except KeyError:
+                continue
+            if com_artefato is None or com_artefato in artefatos:
+                return versao
+        return None
+
+
+__all__ = ["RegistroModelos", "id_entrada"]
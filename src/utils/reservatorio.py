@@ -0,0 +1,141 @@
+"""
+Módulo de reservatório persistente de linhas do histórico de treino
+
+`ReservatorioDoadores` mantém em disco uma amostra uniforme de tamanho fixo de
+todas as linhas já ingeridas (amostragem de reservatório, Algoritmo R). Cada lote
+novo atualiza a amostra em O(lote + tamanho), sem reler o histórico. O warm start
+usa essa amostra como doadores da imputação. O histórico só é percorrido uma vez,
+para construir o reservatório na primeira execução.
+
+Estrutura:
+    data/doadores/
+    ├── reservatorio.parquet   até `tamanho` linhas (índice incluído como coluna)
+    └── estado.json            {tamanho, vistos, lotes, indice}
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+
+
+class ReservatorioDoadores:
+    """
+    Amostra de reservatório de tamanho fixo, persistida e atualizada por lote
+
+    Args:
+        diretorio: diretório do reservatório
+        tamanho: número máximo de linhas mantidas
+        seed: semente; combinada com o total de linhas já vistas, cada lote tem
+            sorteios próprios e reprodutíveis sem guardar o estado do gerador
+    """
+
+    def __init__(self, diretorio, tamanho: int, seed: int = 42):
+        if tamanho <= 0:
+            raise ValueError("tamanho do reservatório deve ser > 0")
+        self.diretorio = Path(diretorio)
+        self.tamanho = tamanho
+        self.seed = seed
+        self.dados_path = self.diretorio / "reservatorio.parquet"
+        self.estado_path = self.diretorio / "estado.json"
+
+    def estado(self) -> dict:
+        """Estado persistido ({} se o reservatório ainda não existir)"""
+        if not self.estado_path.exists():
+            return {}
+        return json.loads(self.estado_path.read_text(encoding="utf-8"))
+
+    @property
+    def existe(self) -> bool:
+        """Reservatório construído com o tamanho configurado"""
+        estado = self.estado()
+        if estado and estado["tamanho"] != self.tamanho:
+            logger.warning(
+                f"Reservatório em {self.diretorio} tem tamanho {estado['tamanho']} "
+                f"(configurado: {self.tamanho}) - será reconstruído"
+            )
+            return False
+        return bool(estado) and self.dados_path.exists()
+
+    def carregar(self) -> pd.DataFrame:
+        """Amostra atual, com o índice original (None se o reservatório não existir)"""
+        if not self.existe:
+            return None
+        dados = pd.read_parquet(self.dados_path)
+        indice = self.estado().get("indice")
+        return dados.set_index(indice) if indice else dados
+
+    def _amostrar(self, atual: pd.DataFrame, lote: pd.DataFrame, vistos: int):
+        """Algoritmo R vetorizado: insere o lote em `atual` (sem índice) e retorna (amostra, aceitas)"""
+        rng = np.random.default_rng([self.seed, vistos])
+        k = np.arange(vistos, vistos + len(lote))
+        # posição no reservatório: preenchimento inicial ou sorteio j < N
+        posicoes = np.where(k < self.tamanho, k, rng.integers(0, k + 1))
+        aceitos = posicoes < self.tamanho
+        posicoes, linhas = posicoes[aceitos], np.flatnonzero(aceitos)
+
+        # posições repetidas no lote: vale a última linha (equivale ao sequencial)
+        _, ultimos = np.unique(posicoes[::-1], return_index=True)
+        ultimos = len(posicoes) - 1 - ultimos
+        posicoes, linhas = posicoes[ultimos], linhas[ultimos]
+
+        combinado = pd.concat([atual, lote], ignore_index=True) if atual is not None else lote
+        deslocamento = len(atual) if atual is not None else 0
+        selecao = np.arange(min(self.tamanho, vistos + len(lote)))
+        selecao[posicoes] = deslocamento + linhas
+        return combinado.iloc[selecao].reset_index(drop=True), len(linhas)
+
+    def _salvar(self, dados: pd.DataFrame, estado: dict):
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.dados_path.with_name(self.dados_path.name + ".tmp")
+        dados.to_parquet(temporario, index=False)
+        os.replace(temporario, self.dados_path)
+        temporario = self.estado_path.with_name(self.estado_path.name + ".tmp")
+        temporario.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+        os.replace(temporario, self.estado_path)
+
+    def atualizar(self, lote: pd.DataFrame) -> dict:
+        """
+        Insere um lote novo na amostra persistida (custo O(lote + tamanho))
+
+        Returns:
+            Estado atualizado, com `aceitas` = linhas do lote que entraram na amostra
+        """
+        if not self.existe:
+            return self.inicializar([lote])
+        return self._atualizar_lotes([lote], self.estado())
+
+    def inicializar(self, lotes) -> dict:
+        """Constrói o reservatório do zero a partir de um iterável de lotes (histórico completo)"""
+        return self._atualizar_lotes(lotes, {})
+
+    def _atualizar_lotes(self, lotes, estado: dict) -> dict:
+        atual = None
+        if estado:
+            atual = pd.read_parquet(self.dados_path)
+        vistos, n_lotes, indice, aceitas = estado.get("vistos", 0), estado.get("lotes", 0), estado.get("indice"), 0
+        for lote in lotes:
+            if lote.empty:
+                continue
+            indice = lote.index.name
+            lote = lote.reset_index() if indice is not None else lote.reset_index(drop=True)
+            atual, aceitas_lote = self._amostrar(atual, lote, vistos)
+            vistos += len(lote)
+            n_lotes += 1
+            aceitas += aceitas_lote
+
+        novo_estado = {"tamanho": self.tamanho, "vistos": vistos, "lotes": n_lotes, "indice": indice}
+        if atual is None:
+            return {**novo_estado, "aceitas": 0}
+        self._salvar(atual, novo_estado)
+        logger.info(
+            f"Reservatório de doadores: {len(atual)} linhas de {vistos} vistas "
+            f"({aceitas} linhas aceitas nesta atualização)"
+        )
+        return {**novo_estado, "aceitas": aceitas}
+
+
+__all__ = ["ReservatorioDoadores"]
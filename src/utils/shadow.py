@@ -0,0 +1,169 @@
+"""
+Módulo de shadow scoring: avaliação assíncrona de um modelo desafiante na API
+
+Uma fração amostrada das consultas servidas pelo modelo principal é enfileirada
+(fila asyncio limitada) e pontuada em segundo plano pelo modelo desafiante, fora
+do caminho da requisição:
+
+- `amostrar()` é O(1) e nunca bloqueia: se a fila estiver cheia, a amostra é
+  descartada e contabilizada
+- o worker drena a fila em lotes e roda `predict_proba` em uma thread, sem
+  ocupar o event loop; a decisão do desafiante é `proba >= limiar ajustado`, a
+  mesma regra usada pela API para o modelo principal
+- métricas: distribuição de scores por versão, discordância de decisão,
+  atraso na fila, tamanho da fila e descartes
+"""
+import asyncio
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from utils.metrics import (
+    shadow_score_distribution,
+    shadow_requests_scored_total,
+    shadow_disagreements_total,
+    shadow_disagreement_rate,
+    shadow_queue_lag_seconds,
+    shadow_queue_size,
+    shadow_dropped_total,
+)
+
+
+def limiar_decisao(modelo, padrao: float = 0.5) -> float:
+    """Limiar de decisão do modelo (TunedThresholdClassifierCV ou modelo compacto)"""
+    estimador = modelo.steps[-1][1] if hasattr(modelo, "steps") else modelo
+    return float(getattr(estimador, "best_threshold_", getattr(estimador, "limiar", padrao)))
+
+
+class AvaliadorSombra:
+    """
+    Pontua em segundo plano uma amostra das consultas com o modelo desafiante
+
+    Args:
+        modelo: pipeline desafiante (com predict_proba/predict)
+        features: features dos clientes indexadas por id_cliente
+        versao_desafiante: versão do modelo desafiante (rótulo das métricas)
+        versao_principal: versão do modelo principal (rótulo das métricas; a API a
+            atualiza quando troca o snapshot servido)
+        fracao: fração das consultas enviadas ao desafiante
+        tamanho_fila: capacidade da fila; amostras acima disso são descartadas
+        tamanho_lote: amostras pontuadas por chamada ao modelo
+    """
+
+    def __init__(self, modelo, features: pd.DataFrame, versao_desafiante: str, versao_principal: str,
+                 fracao: float = 0.1, tamanho_fila: int = 1000, tamanho_lote: int = 64):
+        self.modelo = modelo
+        self.features = features
+        self.versao_desafiante = versao_desafiante
+        self.versao_principal = versao_principal
+        self.limiar_desafiante = limiar_decisao(modelo)
+        self.fracao = fracao
+        self.tamanho_lote = tamanho_lote
+        self.fila = asyncio.Queue(maxsize=tamanho_fila)
+        self._tarefa = None
+        self.pontuadas = 0
+        self.discordancias = 0
+        self.descartadas = 0
+
+    def iniciar(self):
+        """Inicia o worker (deve ser chamado com o event loop rodando)"""
+        self._tarefa = asyncio.create_task(self._worker())
+        logger.info(
+            f"Shadow scoring ativo: desafiante {self.versao_desafiante} | fração {self.fracao:.0%} | "
+            f"fila {self.fila.maxsize}"
+        )
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def amostrar(self, id_cliente: int, score_principal: float, previsao_principal: int):
+        """Enfileira a consulta para o desafiante (amostrada; nunca bloqueia)"""
+        if random.random() >= self.fracao:
+            return
+        try:
+            self.fila.put_nowait(
+                (id_cliente, score_principal, previsao_principal, self.versao_principal, time.perf_counter())
+            )
+        except asyncio.QueueFull:
+            self.descartadas += 1
+            shadow_dropped_total.labels(reason="fila_cheia").inc()
+        shadow_queue_size.set(self.fila.qsize())
+
+    def _pontuar(self, X):
+        from sklearn import config_context
+
+        # a configuração do sklearn é por thread; o pipeline espera saída pandas
+        with config_context(transform_output="pandas"):
+            scores = self.modelo.predict_proba(X)[:, 1]
+        return scores, (scores >= self.limiar_desafiante).astype(np.int8)
+
+    async def _worker(self):
+        while True:
+            lote = [await self.fila.get()]
+            while len(lote) < self.tamanho_lote and not self.fila.empty():
+                lote.append(self.fila.get_nowait())
+            shadow_queue_size.set(self.fila.qsize())
+            try:
+                await self._processar(lote)
+            except Exception as e:
+                logger.exception(f"Erro no shadow scoring: {e}")
+                shadow_dropped_total.labels(reason="erro").inc(len(lote))
+
+    async def _processar(self, lote):
+        conhecidos = set(self.features.index.intersection([item[0] for item in lote]))
+        validos = [item for item in lote if item[0] in conhecidos]
+        if len(validos) < len(lote):
+            shadow_dropped_total.labels(reason="sem_features").inc(len(lote) - len(validos))
+        lote = validos
+        if not lote:
+            return
+
+        X = self.features.loc[[item[0] for item in lote]]
+        scores, previsoes = await asyncio.to_thread(self._pontuar, X)
+        agora = time.perf_counter()
+
+        for (_, score_principal, previsao_principal, versao_principal, enfileirado), score, previsao in zip(
+            lote, scores, previsoes
+        ):
+            shadow_queue_lag_seconds.observe(agora - enfileirado)
+            shadow_score_distribution.labels(model_version=versao_principal, role="principal").observe(score_principal)
+            shadow_score_distribution.labels(model_version=self.versao_desafiante, role="desafiante").observe(float(score))
+            if int(previsao) != int(previsao_principal):
+                self.discordancias += 1
+                shadow_disagreements_total.inc()
+
+        self.pontuadas += len(lote)
+        shadow_requests_scored_total.inc(len(lote))
+        shadow_disagreement_rate.set(self.discordancias / self.pontuadas)
+
+    def status(self) -> dict:
+        return {
+            "versao_principal": self.versao_principal,
+            "versao_desafiante": self.versao_desafiante,
+            "limiar_desafiante": self.limiar_desafiante,
+            "fracao": self.fracao,
+            "fila": self.fila.qsize(),
+            "capacidade_fila": self.fila.maxsize,
+            "pontuadas": self.pontuadas,
+            "discordancias": self.discordancias,
+            "taxa_discordancia": self.discordancias / self.pontuadas if self.pontuadas else None,
+            "descartadas": self.descartadas,
+        }
+
+
+def carregar_features(caminho, coluna_id="id_cliente", coluna_alvo="saiu") -> pd.DataFrame:
+    """Features dos clientes indexadas pelo id (sem a coluna alvo)"""
+    features = pd.read_csv(caminho, index_col=coluna_id)
+    return features.drop(columns=[coluna_alvo], errors="ignore")
+
+
+__all__ = ["AvaliadorSombra", "carregar_features", "limiar_decisao"]
@@ -0,0 +1,414 @@
+"""
+Módulo de tracing por requisição da API com exportação para arquivo OTLP/JSON
+
+- `MiddlewareRastreamento` (ASGI) abre o span raiz de cada requisição, com trace ID
+  próprio ou herdado do header W3C `traceparent`, e devolve o ID em `X-Trace-Id`
+- `span("nome")` abre spans filhos (lookup, serialização, métricas, logging); o
+  contexto é propagado por contextvars, então funciona entre awaits
+- amostragem: a decisão é tomada no início (taxa configurada). Requisições não
+  amostradas guardam só o span raiz, que ainda é exportado se a requisição for
+  lenta (>= lento_ms). Assim todo exemplar de requisição lenta aponta para um trace
+  existente
+- exportação em lote por uma thread daemon (fila limitada; descartes contados) para
+  um arquivo JSON Lines rotativo no formato OTLP (ExportTraceServiceRequest),
+  lido pelo receiver `otlpjsonfile` do OpenTelemetry Collector
+- custo: o tempo gasto pelo próprio tracing em cada requisição é medido, separado
+  em custo base (span raiz, pago por toda requisição) e custo das requisições
+  amostradas. A taxa de amostragem é recalculada para que a média esperada fique
+  dentro de `custo_maximo` (fração da latência)
+
+Sem tracing ativo, `span()` é uma leitura de contextvar que devolve um contexto nulo.
+"""
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from utils.admissao import template_rota
+from utils.logger import logger
+from utils.metrics import (
+    api_request_latency_seconds,
+    tracing_overhead_seconds,
+    tracing_overhead_ratio,
+    tracing_sample_rate,
+    tracing_spans_exported_total,
+    tracing_spans_dropped_total,
+    tracing_export_queue_size,
+)
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_ERRO = 2
+# versão-trace_id-pai_id-flags (W3C Trace Context); qualquer outro formato inicia um trace novo
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_trace_atual: ContextVar = ContextVar("trace_atual", default=None)
+_span_atual: ContextVar = ContextVar("span_atual", default=None)
+
+
+def _novo_id(bytes_: int) -> str:
+    return f"{random.getrandbits(bytes_ * 8):0{bytes_ * 2}x}"
+
+
+def _valor_otlp(valor) -> dict:
+    if isinstance(valor, bool):
+        return {"boolValue": valor}
+    if isinstance(valor, int):
+        return {"intValue": str(valor)}
+    if isinstance(valor, float):
+        return {"doubleValue": valor}
+    return {"stringValue": str(valor)}
+
+
+def _atributos_otlp(atributos: dict) -> list:
+    return [{"key": chave, "value": _valor_otlp(valor)} for chave, valor in atributos.items()]
+
+
+class Span:
+    """Intervalo de tempo nomeado dentro de um trace"""
+
+    __slots__ = ("trace_id", "span_id", "pai_id", "nome", "tipo", "inicio_ns", "fim_ns", "atributos", "erro")
+
+    def __init__(self, trace_id: str, pai_id: str, nome: str, tipo: int = SPAN_KIND_INTERNAL, atributos: dict = None):
+        self.trace_id = trace_id
+        self.span_id = _novo_id(8)
+        self.pai_id = pai_id
+        self.nome = nome
+        self.tipo = tipo
+        self.inicio_ns = time.time_ns()
+        self.fim_ns = None
+        self.atributos = atributos or {}
+        self.erro = None
+
+    def para_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.nome,
+            "kind": self.tipo,
+            "startTimeUnixNano": str(self.inicio_ns),
+            "endTimeUnixNano": str(self.fim_ns or time.time_ns()),
+            "attributes": _atributos_otlp(self.atributos),
+            "status": {"code": STATUS_ERRO, "message": self.erro} if self.erro else {},
+        }
+        if self.pai_id:
+            span["parentSpanId"] = self.pai_id
+        return span
+
+
+class _Trace:
+    __slots__ = ("trace_id", "amostrado", "spans", "max_spans", "custo_ns")
+
+    def __init__(self, trace_id: str, amostrado: bool, max_spans: int):
+        self.trace_id = trace_id
+        self.amostrado = amostrado
+        self.spans = []
+        self.max_spans = max_spans
+        self.custo_ns = 0
+
+
+class _SpanNulo:
+    """Contexto sem efeito, usado fora de traces amostrados"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *_):
+        return False
+
+
+_NULO = _SpanNulo()
+
+
+class _ContextoSpan:
+    __slots__ = ("trace", "nome", "atributos", "span", "token")
+
+    def __init__(self, trace: _Trace, nome: str, atributos: dict):
+        self.trace = trace
+        self.nome = nome
+        self.atributos = atributos
+
+    def __enter__(self):
+        inicio = time.perf_counter_ns()
+        pai = _span_atual.get()
+        self.span = Span(self.trace.trace_id, pai.span_id if pai else None, self.nome, atributos=self.atributos)
+        self.token = _span_atual.set(self.span)
+        self.trace.custo_ns += time.perf_counter_ns() - inicio
+        return self.span
+
+    def __exit__(self, tipo, excecao, _):
+        inicio = time.perf_counter_ns()
+        self.span.fim_ns = time.time_ns()
+        if excecao is not None:
+            self.span.erro = repr(excecao)
+        _span_atual.reset(self.token)
+        if len(self.trace.spans) < self.trace.max_spans:
+            self.trace.spans.append(self.span)
+        else:
+            tracing_spans_dropped_total.labels(reason="limite_por_trace").inc()
+        self.trace.custo_ns += time.perf_counter_ns() - inicio
+        return False
+
+
+def span(nome: str, **atributos):
+    """Abre um span filho do span atual (sem efeito fora de um trace amostrado)"""
+    trace = _trace_atual.get()
+    if trace is None or not trace.amostrado:
+        return _NULO
+    return _ContextoSpan(trace, nome, atributos)
+
+
+def trace_id_atual():
+    """Trace ID da requisição em andamento (None fora de uma requisição rastreada)"""
+    trace = _trace_atual.get()
+    return trace.trace_id if trace is not None else None
+
+
+class ExportadorArquivoOTLP:
+    """
+    Exporta spans em lote para um arquivo JSON Lines rotativo (OTLP/JSON)
+
+    Cada linha é um ExportTraceServiceRequest. O arquivo é rotacionado por tamanho
+    (`spans.jsonl` -> `spans.jsonl.1` -> ... -> `spans.jsonl.<arquivos_mantidos>`).
+
+    Args:
+        caminho: arquivo de saída
+        tamanho_maximo_bytes: tamanho que dispara a rotação
+        arquivos_mantidos: arquivos rotacionados mantidos
+        tamanho_lote: spans por escrita
+        intervalo: espera máxima (s) para completar um lote
+        tamanho_fila: traces aguardando exportação; acima disso são descartados
+        nome_servico: atributo service.name do recurso
+    """
+
+    def __init__(self, caminho, tamanho_maximo_bytes: int = 50 * 1024 ** 2, arquivos_mantidos: int = 5,
+                 tamanho_lote: int = 512, intervalo: float = 1.0, tamanho_fila: int = 10_000,
+                 nome_servico: str = "api-churn"):
+        self.caminho = Path(caminho)
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self.arquivos_mantidos = arquivos_mantidos
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self.recurso = {"attributes": _atributos_otlp({"service.name": nome_servico})}
+        self._parar = threading.Event()
+        self._thread = None
+        self._trava = threading.Lock()
+
+    def _garantir_thread(self):
+        if self._thread is None:
+            with self._trava:
+                if self._thread is None:
+                    self.caminho.parent.mkdir(parents=True, exist_ok=True)
+                    self._thread = threading.Thread(target=self._executar, name="exportador-spans", daemon=True)
+                    self._thread.start()
+
+    def enviar(self, spans: list):
+        """Enfileira os spans de um trace (nunca bloqueia)"""
+        self._garantir_thread()
+        try:
+            self.fila.put_nowait(spans)
+        except queue.Full:
+            tracing_spans_dropped_total.labels(reason="fila_cheia").inc(len(spans))
+
+    def parar(self, timeout: float = 5.0):
+        """Exporta o que estiver na fila e encerra a thread"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not (self._parar.is_set() and self.fila.empty()):
+            lote = []
+            prazo = time.monotonic() + self.intervalo
+            while len(lote) < self.tamanho_lote:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.extend(self.fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+            tracing_export_queue_size.set(self.fila.qsize())
+            if lote:
+                try:
+                    self._gravar(lote)
+                except Exception as e:
+                    logger.exception(f"Erro ao exportar spans: {e}")
+                    tracing_spans_dropped_total.labels(reason="erro_exportacao").inc(len(lote))
+
+    def _gravar(self, spans: list):
+        requisicao = {
+            "resourceSpans": [{
+                "resource": self.recurso,
+                "scopeSpans": [{"scope": {"name": "api_churn"}, "spans": [s.para_otlp() for s in spans]}],
+            }]
+        }
+        linha = json.dumps(requisicao, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._rotacionar(len(linha.encode("utf-8")))
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(linha)
+        tracing_spans_exported_total.inc(len(spans))
+
+    def _rotacionar(self, bytes_novos: int):
+        if not self.caminho.exists() or self.caminho.stat().st_size + bytes_novos <= self.tamanho_maximo_bytes:
+            return
+        for i in range(self.arquivos_mantidos - 1, 0, -1):
+            origem = self.caminho.with_name(f"{self.caminho.name}.{i}")
+            if origem.exists():
+                os.replace(origem, self.caminho.with_name(f"{self.caminho.name}.{i + 1}"))
+        os.replace(self.caminho, self.caminho.with_name(f"{self.caminho.name}.1"))
+
+
+class Rastreador:
+    """
+    Amostragem, limites de custo e conclusão dos traces de requisição
+
+    Args:
+        exportador: destino dos spans (ExportadorArquivoOTLP)
+        taxa_amostragem: fração das requisições com spans detalhados
+        lento_ms: requisições a partir desta latência sempre exportam o span raiz
+        custo_maximo: fração máxima da latência gasta com tracing (média móvel)
+        max_spans: spans filhos guardados por trace
+    """
+
+    JANELA_AJUSTE = 200  # requisições entre ajustes da taxa de amostragem
+
+    def __init__(self, exportador, taxa_amostragem: float = 0.05, lento_ms: float = 250.0,
+                 custo_maximo: float = 0.05, max_spans: int = 64):
+        self.exportador = exportador
+        self.taxa_configurada = taxa_amostragem
+        self.taxa = taxa_amostragem
+        self.lento_s = lento_ms / 1000
+        self.custo_maximo = custo_maximo
+        self.max_spans = max_spans
+        # médias móveis da fração da latência gasta com tracing
+        self.custo_base = 0.0
+        self.custo_amostrado = 0.0
+        self._requisicoes = 0
+        tracing_sample_rate.set(self.taxa)
+
+    def novo_trace(self, traceparent: str = None):
+        """Cria o trace da requisição (herda trace ID e decisão de amostragem do traceparent)"""
+        trace_id, pai_id, amostrado = None, None, None
+        campos = TRACEPARENT.match(traceparent.strip()) if traceparent else None
+        # IDs só com zeros são inválidos pela especificação
+        if campos and campos[1].strip("0") and campos[2].strip("0"):
+            trace_id, pai_id = campos[1], campos[2]
+            amostrado = bool(int(campos[3], 16) & 1)
+        if amostrado is None:
+            amostrado = random.random() < self.taxa
+        return _Trace(trace_id or _novo_id(16), amostrado, self.max_spans), pai_id
+
+    def concluir(self, trace: _Trace, raiz: Span, duracao: float, endpoint: str):
+        """Decide a exportação, registra a latência (com exemplar) e o custo do tracing"""
+        inicio = time.perf_counter_ns()
+        exemplar = None
+        if trace.amostrado or duracao >= self.lento_s:
+            self.exportador.enviar([raiz, *trace.spans] if trace.amostrado else [raiz])
+            exemplar = {"trace_id": trace.trace_id}
+        api_request_latency_seconds.labels(endpoint=endpoint).observe(duracao, exemplar=exemplar)
+
+        custo = (trace.custo_ns + time.perf_counter_ns() - inicio) / 1e9
+        tracing_overhead_seconds.observe(custo)
+        self._ajustar_taxa(custo / duracao if duracao > 0 else 0.0, trace.amostrado)
+
+    def _ajustar_taxa(self, fracao_custo: float, amostrado: bool):
+        if amostrado:
+            self.custo_amostrado += 0.05 * (fracao_custo - self.custo_amostrado)
+        else:
+            self.custo_base += 0.01 * (fracao_custo - self.custo_base)
+        self._requisicoes += 1
+        if self._requisicoes % self.JANELA_AJUSTE:
+            return
+
+        # custo esperado = base + taxa * (amostrado - base); o custo base não depende da taxa
+        extra = self.custo_amostrado - self.custo_base
+        tracing_overhead_ratio.set(self.custo_base + self.taxa * max(extra, 0.0))
+        taxa_limite = (self.custo_maximo - self.custo_base) / extra if extra > 0 else self.taxa_configurada
+        nova_taxa = min(self.taxa_configurada, max(taxa_limite, 0.001))
+        if abs(nova_taxa - self.taxa) > 0.1 * self.taxa:
+            logger.info(
+                f"Tracing: custo base {self.custo_base:.2%}, amostrado {self.custo_amostrado:.2%} - "
+                f"taxa de amostragem {self.taxa:.3f} -> {nova_taxa:.3f}"
+            )
+            self.taxa = nova_taxa
+            tracing_sample_rate.set(self.taxa)
+
+
+class MiddlewareRastreamento:
+    """
+    Middleware ASGI: span raiz por requisição HTTP e header X-Trace-Id na resposta
+
+    Args:
+        app: aplicação ASGI
+        rastreador: controlador de amostragem e exportação
+        rotas: rotas da aplicação (`app.routes`), usadas para achar o template da rota
+            das respostas que não chegam ao roteador (304 do cache, 503 da admissão)
+    """
+
+    def __init__(self, app, rastreador: Rastreador, rotas=()):
+        self.app = app
+        self.rastreador = rastreador
+        self.rotas = rotas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio_custo = time.perf_counter_ns()
+        traceparent = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"traceparent"), None)
+        trace, pai_id = self.rastreador.novo_trace(traceparent)
+        raiz = Span(trace.trace_id, pai_id, f"{scope['method']} {scope['path']}", SPAN_KIND_SERVER, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        token_trace, token_span = _trace_atual.set(trace), _span_atual.set(raiz)
+        status = {"codigo": 500}
+        cabecalho = (b"x-trace-id", trace.trace_id.encode("ascii"))
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status["codigo"] = mensagem["status"]
+                mensagem["headers"] = [*mensagem.get("headers", []), cabecalho]
+            await send(mensagem)
+
+        trace.custo_ns += time.perf_counter_ns() - inicio_custo
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        except Exception as e:
+            raiz.erro = repr(e)
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            inicio_custo = time.perf_counter_ns()
+            _span_atual.reset(token_span)
+            _trace_atual.reset(token_trace)
+            # o roteador do Starlette grava a rota encontrada no scope; respostas
+            # curto-circuitadas pelos middlewares internos não passam por ele
+            rota = getattr(scope.get("route"), "path", None) or template_rota(self.rotas, scope)
+            raiz.nome = f"{scope['method']} {rota}"
+            raiz.fim_ns = time.time_ns()
+            raiz.atributos["http.route"] = rota
+            raiz.atributos["http.status_code"] = status["codigo"]
+            if status["codigo"] >= 500 and raiz.erro is None:
+                raiz.erro = f"HTTP {status['codigo']}"
+            trace.custo_ns += time.perf_counter_ns() - inicio_custo
+            self.rastreador.concluir(trace, raiz, duracao, rota)
+
+
+__all__ = [
+    "Span",
+    "span",
+    "trace_id_atual",
+    "ExportadorArquivoOTLP",
+    "Rastreador",
+    "MiddlewareRastreamento",
+]
@@ -0,0 +1,241 @@
+"""
+Módulo de cache das etapas de pré-processamento do pipeline de treino
+
+Implementa a interface `joblib.Memory` aceita pelo parâmetro `memory` do
+`imblearn.pipeline.Pipeline`: cada transformer/sampler ajustado é memorizado em
+disco pela combinação (parâmetros da etapa, fingerprint dos dados de entrada).
+Etapas inalteradas são reutilizadas entre execuções e entre os ajustes do mesmo
+treino, e cada acerto/erro de cache é contabilizado por etapa. Opcionalmente,
+registra também o pico de memória de cada etapa, em duas medidas:
+
+- `pico_memoria_mb`: alocações Python (tracemalloc), apenas do processo pai
+- `pico_rss_mb`: RSS do processo pai somado ao dos workers do joblib (loky),
+  amostrado em segundo plano via /proc (onde o RandomForest e os
+  ColumnTransformers paralelos de fato alocam)
+"""
+import functools
+import os
+import threading
+import time
+import tracemalloc
+
+from utils.logger import logger
+
+
+def rotulo_etapa(transformer) -> str:
+    """
+    Gera um rótulo legível para uma etapa do pipeline
+
+    ColumnTransformers e Pipelines aninhados são identificados pelos nomes dos
+    seus sub-transformers, para diferenciar etapas de mesma classe.
+    """
+    nome = type(transformer).__name__
+    filhos = getattr(transformer, "transformers", None) or getattr(transformer, "steps", None)
+    if filhos:
+        nome += "[" + ",".join(str(filho[0]) for filho in filhos) + "]"
+    return nome
+
+
+def rss_arvore_mb(pid: int = None):
+    """RSS (MB) do processo somado ao de todos os descendentes (None sem /proc)"""
+    pendentes, total = [pid or os.getpid()], 0
+    pagina = os.sysconf("SC_PAGE_SIZE")
+    try:
+        while pendentes:
+            atual = pendentes.pop()
+            try:
+                with open(f"/proc/{atual}/statm") as f:
+                    total += int(f.read().split()[1]) * pagina
+                for tarefa in os.listdir(f"/proc/{atual}/task"):
+                    with open(f"/proc/{atual}/task/{tarefa}/children") as f:
+                        pendentes.extend(int(filho) for filho in f.read().split())
+            except (FileNotFoundError, ProcessLookupError):
+                continue  # processo encerrado durante a leitura
+    except OSError:
+        return None
+    return total / 1024 ** 2
+
+
+class AmostradorRSS:
+    """
+    Pico do RSS do processo + workers, amostrado por uma thread em segundo plano
+
+    Args:
+        intervalo: segundos entre amostras
+    """
+
+    def __init__(self, intervalo: float = 0.05):
+        self.intervalo = intervalo
+        self.pico = rss_arvore_mb()
+        self.disponivel = self.pico is not None
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        if self.disponivel:
+            threading.Thread(target=self._amostrar, name="amostrador-rss", daemon=True).start()
+
+    def _amostrar(self):
+        while not self._parar.is_set():
+            rss = rss_arvore_mb()
+            with self._trava:
+                self.pico = max(self.pico, rss or 0.0)
+            self._parar.wait(self.intervalo)
+
+    def parar(self):
+        """Encerra a thread de amostragem"""
+        self._parar.set()
+
+    def reiniciar_pico(self) -> float:
+        """Retorna o pico desde a última chamada e reinicia a medição no RSS atual"""
+        atual = rss_arvore_mb() or 0.0
+        with self._trava:
+            pico, self.pico = max(self.pico, atual), atual
+        return pico
+
+
+class CacheEtapasPipeline:
+    """
+    Cache em disco das etapas do pipeline com estatísticas de acerto
+
+    Args:
+        location: diretório do cache (None desativa o cache, mantendo as medições)
+        verbose: verbosidade do joblib.Memory
+        medir_memoria: se True, mede o pico de memória de cada etapa (tracemalloc no
+            processo pai e RSS do processo pai + workers)
+    """
+
+    def __init__(self, location=None, verbose: int = 0, medir_memoria: bool = False):
+        from joblib import Memory
+
+        self.location = str(location) if location is not None else None
+        self._memory = Memory(location=self.location, verbose=verbose)
+        self.medir_memoria = medir_memoria
+        self.estatisticas = {}
+        self._amostrador_rss = None
+        self._tracemalloc_proprio = False
+
+    def __deepcopy__(self, memo):
+        # clone() do sklearn faz deepcopy de parâmetros que não são estimadores;
+        # compartilhar a instância mantém as estatísticas agregadas
+        return self
+
+    def __getstate__(self):
+        # o amostrador de RSS (thread + trava) e o tracemalloc pertencem ao processo atual
+        estado = self.__dict__.copy()
+        estado["_amostrador_rss"] = None
+        estado["_tracemalloc_proprio"] = False
+        return estado
+
+    def _registro(self, rotulo: str) -> dict:
+        return self.estatisticas.setdefault(rotulo, {
+            "hits": 0,
+            "misses": 0,
+            "tempo_ajuste_segundos": 0.0,
+            "tempo_economizado_segundos": 0.0,
+        })
+
+    def registrar_pico_memoria(self, rotulo: str):
+        """
+        Registra o pico de memória desde a última etapa medida e reinicia o pico
+
+        Usado para etapas fora do cache (ex.: o classificador final, ajustado
+        depois do último transformer/sampler).
+        """
+        if not self.medir_memoria or not tracemalloc.is_tracing():
+            return
+        pico_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        registro = self._registro(rotulo)
+        registro["pico_memoria_mb"] = max(registro.get("pico_memoria_mb", 0.0), pico_mb)
+        tracemalloc.reset_peak()
+        if self._amostrador_rss is not None and self._amostrador_rss.disponivel:
+            pico_rss = self._amostrador_rss.reiniciar_pico()
+            registro["pico_rss_mb"] = max(registro.get("pico_rss_mb", 0.0), pico_rss)
+
+    def _iniciar_medicao(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_proprio = True
+        if self._amostrador_rss is None:
+            self._amostrador_rss = AmostradorRSS()
+        tracemalloc.reset_peak()
+        if self._amostrador_rss.disponivel:
+            self._amostrador_rss.reiniciar_pico()
+
+    def finalizar(self):
+        """
+        Encerra as medições de memória (thread de RSS e tracemalloc iniciado aqui)
+
+        Chamado ao fim das etapas medidas, para que o restante do treino (exportação,
+        bootstrap) não pague o custo do tracemalloc. Uma nova medição reinicia ambos.
+        """
+        if self._amostrador_rss is not None:
+            self._amostrador_rss.parar()
+            self._amostrador_rss = None
+        if self._tracemalloc_proprio:
+            tracemalloc.stop()
+            self._tracemalloc_proprio = False
+
+    def cache(self, func):
+        """Retorna `func` memorizada e instrumentada (interface joblib.Memory)"""
+        memorizada = self._memory.cache(func)
+
+        def executar(rotulo, *args, **kwargs):
+            registro = self._registro(rotulo)
+            inicio = time.perf_counter()
+
+            if self.location is not None and memorizada.check_call_in_cache(*args, **kwargs):
+                resultado = memorizada.call_and_shelve(*args, **kwargs)
+                saida = resultado.get()
+                gasto = time.perf_counter() - inicio
+                registro["hits"] += 1
+                registro["tempo_economizado_segundos"] += max((resultado.duration or 0.0) - gasto, 0.0)
+                return saida
+
+            saida = memorizada(*args, **kwargs)
+            registro["misses"] += 1
+            registro["tempo_ajuste_segundos"] += time.perf_counter() - inicio
+            return saida
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rotulo = rotulo_etapa(args[0])
+            if self.medir_memoria:
+                self._iniciar_medicao()
+            try:
+                return executar(rotulo, *args, **kwargs)
+            finally:
+                self.registrar_pico_memoria(rotulo)
+
+        return wrapper
+
+    def relatorio(self) -> dict:
+        """
+        Loga e retorna as estatísticas de cache por etapa
+
+        Returns:
+            Dicionário {etapa: {hits, misses, tempo_ajuste_segundos, tempo_economizado_segundos}}
+        """
+        if not self.estatisticas:
+            logger.info("Cache do pipeline: nenhuma etapa executada")
+            return {}
+
+        total_hits = sum(e["hits"] for e in self.estatisticas.values())
+        total_chamadas = total_hits + sum(e["misses"] for e in self.estatisticas.values())
+        economizado = sum(e["tempo_economizado_segundos"] for e in self.estatisticas.values())
+
+        logger.info(
+            f"Cache do pipeline ({self.location or 'desativado'}): "
+            f"{total_hits}/{total_chamadas} acertos | {economizado:.2f}s economizados"
+        )
+        for etapa, e in self.estatisticas.items():
+            memoria = f" | pico Python (pai) {e['pico_memoria_mb']:.1f} MB" if "pico_memoria_mb" in e else ""
+            if "pico_rss_mb" in e:
+                memoria += f" | pico RSS (pai + workers) {e['pico_rss_mb']:.1f} MB"
+            logger.info(
+                f"  {etapa}: hits={e['hits']} misses={e['misses']} | "
+                f"ajuste {e['tempo_ajuste_segundos']:.2f}s | economizado {e['tempo_economizado_segundos']:.2f}s"
+                f"{memoria}"
+            )
+        return self.estatisticas
+
+
+__all__ = ["CacheEtapasPipeline", "AmostradorRSS", "rotulo_etapa", "rss_arvore_mb"]
@@ -0,0 +1,180 @@
+"""
+Módulo de seleção do conjunto de treino
+
+Aplica uma política de custo limitado sobre os dados armazenados, em uma única
+passada streaming (lotes de linhas), para que o tempo de treino não cresça
+indefinidamente conforme novos dados são acumulados:
+
+- "todos": todos os dados (comportamento original)
+- "janela": janela deslizante das últimas N linhas e/ou dos últimos D dias
+- "reservatorio": amostra de reservatório estratificada de tamanho fixo,
+  preservando a proporção da variável alvo
+"""
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+POLITICAS = ("todos", "janela", "reservatorio")
+
+
+def iterar_csv(path, chunksize: int = 100_000, index_col="id_cliente"):
+    """Itera sobre um CSV em lotes de `chunksize` linhas"""
+    yield from pd.read_csv(path, index_col=index_col, chunksize=chunksize)
+
+
+def _janela(lotes, janela_linhas=None, janela_dias=None, coluna_tempo=None):
+    """Mantém apenas os lotes necessários para a janela (memória limitada)"""
+    corte = None
+    if janela_dias is not None:
+        corte = datetime.now() - timedelta(days=janela_dias)
+
+    mantidos = deque()
+    total = 0
+    for lote in lotes:
+        if corte is not None:
+            if coluna_tempo not in lote.columns:
+                raise ValueError(f"Coluna de tempo '{coluna_tempo}' não encontrada nos dados")
+            lote = lote[pd.to_datetime(lote[coluna_tempo]) >= corte]
+        if lote.empty:
+            continue
+        mantidos.append(lote)
+        total += len(lote)
+        # descartar lotes antigos que já não alcançam a janela de linhas
+        while janela_linhas is not None and total - len(mantidos[0]) >= janela_linhas:
+            total -= len(mantidos.popleft())
+
+    if not mantidos:
+        return None
+    dados = pd.concat(list(mantidos))
+    return dados.tail(janela_linhas) if janela_linhas is not None else dados
+
+
+def _reservatorio_estratificado(lotes, tamanho_amostra, coluna_alvo, seed):
+    """
+    Amostragem de reservatório (Algoritmo R) por classe, vetorizada por lote
+
+    Mantém um reservatório de até `tamanho_amostra` linhas por classe; ao final,
+    cada classe é sub-amostrada proporcionalmente à sua frequência observada.
+    """
+    rng = np.random.default_rng(seed)
+    reservatorios = {}  # classe -> {coluna: ndarray}
+    vistos = {}  # classe -> linhas da classe já vistas
+    colunas, dtypes, nome_indice = None, None, None
+
+    for lote in lotes:
+        if colunas is None:
+            nome_indice = lote.index.name
+            dtypes = lote.reset_index().dtypes
+            colunas = list(dtypes.index)
+        lote = lote.reset_index()
+
+        for classe, grupo in lote.groupby(coluna_alvo, sort=False):
+            t = vistos.get(classe, 0)
+            k = np.arange(t, t + len(grupo))
+            vistos[classe] = t + len(grupo)
+
+            # posição no reservatório: preenchimento inicial ou sorteio j < N
+            posicoes = np.where(k < tamanho_amostra, k, rng.integers(0, k + 1))
+            aceitos = posicoes < tamanho_amostra
+            posicoes, linhas = posicoes[aceitos], np.flatnonzero(aceitos)
+
+            # posições repetidas no lote: vale a última linha (equivale ao sequencial)
+            _, ultimos = np.unique(posicoes[::-1], return_index=True)
+            ultimos = len(posicoes) - 1 - ultimos
+            posicoes, linhas = posicoes[ultimos], linhas[ultimos]
+
+            if classe not in reservatorios:
+                reservatorios[classe] = {
+                    col: np.empty(tamanho_amostra, dtype=object) for col in colunas
+                }
+            for col in colunas:
+                reservatorios[classe][col][posicoes] = grupo[col].to_numpy()[linhas]
+
+    if not reservatorios:
+        return None, {}
+
+    total = sum(vistos.values())
+    partes = []
+    alocacao = {}
+    for classe, reservatorio in reservatorios.items():
+        preenchidos = min(vistos[classe], tamanho_amostra)
+        n_classe = min(preenchidos, int(round(tamanho_amostra * vistos[classe] / total)))
+        escolhidos = rng.choice(preenchidos, size=n_classe, replace=False)
+        partes.append(pd.DataFrame({col: valores[escolhidos] for col, valores in reservatorio.items()}))
+        alocacao[str(classe)] = n_classe
+
+    dados = pd.concat(partes, ignore_index=True)
+    for col, dtype in dtypes.items():
+        try:
+            dados[col] = dados[col].astype(dtype)
+        except (ValueError, TypeError):
+            # ex.: coluna inteira no primeiro lote que recebeu NaN depois (vira float)
+            if dtype.kind in "iuf":
+                dados[col] = pd.to_numeric(dados[col])
+    if nome_indice is not None:
+        dados = dados.set_index(nome_indice)
+    return dados, alocacao
+
+
+def carregar_dados_treino(lotes, politica: str = "todos", janela_linhas=None, janela_dias=None,
+                          coluna_tempo=None, tamanho_amostra=None, coluna_alvo: str = "saiu",
+                          seed: int = 42):
+    """
+    Seleciona o conjunto de treino conforme a política configurada
+
+    Args:
+        lotes: iterável de DataFrames (ex.: iterar_csv(...)) - lido uma única vez
+        politica: "todos", "janela" ou "reservatorio"
+        janela_linhas: tamanho da janela em linhas (política "janela")
+        janela_dias: tamanho da janela em dias, usando `coluna_tempo` (política "janela")
+        coluna_tempo: coluna de data/hora usada pela janela em dias
+        tamanho_amostra: tamanho da amostra (política "reservatorio")
+        coluna_alvo: variável alvo usada na estratificação
+        seed: semente da amostragem
+
+    Returns:
+        Tupla (DataFrame selecionado, dicionário com informações da política)
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política inválida: {politica}. Use: {list(POLITICAS)}")
+
+    # contar linhas lidas e distribuição do alvo durante a passada
+    contagem = {"linhas": 0, "positivos": 0}
+
+    def _contar(iteravel):
+        for lote in iteravel:
+            contagem["linhas"] += len(lote)
+            contagem["positivos"] += int(lote[coluna_alvo].sum())
+            yield lote
+
+    info = {"politica": politica}
+    if politica == "todos":
+        dados = pd.concat(list(_contar(lotes)))
+    elif politica == "janela":
+        if janela_linhas is None and janela_dias is None:
+            raise ValueError("Política 'janela' requer janela_linhas e/ou janela_dias")
+        dados = _janela(_contar(lotes), janela_linhas, janela_dias, coluna_tempo)
+        info.update({"janela_linhas": janela_linhas, "janela_dias": janela_dias})
+    else:
+        if not tamanho_amostra or tamanho_amostra <= 0:
+            raise ValueError("Política 'reservatorio' requer tamanho_amostra > 0")
+        dados, alocacao = _reservatorio_estratificado(
+            _contar(lotes), tamanho_amostra, coluna_alvo, seed
+        )
+        info.update({"tamanho_amostra": tamanho_amostra, "alocacao_por_classe": alocacao, "seed": seed})
+
+    if dados is None or dados.empty:
+        raise ValueError("Nenhum dado selecionado pela política de treino")
+
+    info.update({
+        "linhas_lidas": contagem["linhas"],
+        "linhas_selecionadas": int(len(dados)),
+        "proporcao_alvo_original": contagem["positivos"] / max(contagem["linhas"], 1),
+        "proporcao_alvo_selecionada": float(dados[coluna_alvo].mean()),
+    })
+    return dados, info
+
+
+__all__ = ["POLITICAS", "iterar_csv", "carregar_dados_treino"]